@@ -2,13 +2,15 @@
 """The main module for the HBnB API"""
 import os
 import flask
-from flask import jsonify
+from flask import g, jsonify, request
 from flask_cors import CORS
 from models import storage
 from api.v1.views import app_views
 
 HBNB_API_HOST = os.getenv("HBNB_API_HOST", "0.0.0.0")
 HBNB_API_PORT = int(os.getenv("HBNB_API_PORT", 5000))
+# key of the WSGI environment of a request with its unit of work open
+UNIT_OF_WORK = "hbnb.unit_of_work"
 
 app = flask.Flask(__name__)
 cors = CORS(app, resources={r"/api/*": {"origins": "0.0.0.0"}})
@@ -16,6 +18,48 @@ app.url_map.strict_slashes = False
 app.register_blueprint(app_views)
 
 
+@app.before_request
+def refresh_storage():
+    """See the objects other processes saved since the last request.
+
+    The request is then a unit of work: its saves are deferred to the end
+    of the request, which writes them at once. The sub-requests of POST
+    /api/v1/batch are dispatched within it and share its storage: their
+    units are savepoints of its own.
+    """
+    if not g.get("units"):
+        storage.close()
+    storage.begin()
+    g.units = g.get("units", 0) + 1
+    request.environ[UNIT_OF_WORK] = True
+
+
+def _close_unit():
+    """Returns True if the request still had its unit of work open."""
+    if not request.environ.pop(UNIT_OF_WORK, False):
+        return False
+    g.units -= 1
+    return True
+
+
+@app.after_request
+def commit_storage(response):
+    """Write the changes of a successful request, undo those of an error."""
+    if _close_unit():
+        if response.status_code < 400:
+            storage.commit()
+        else:
+            storage.rollback()
+    return response
+
+
+@app.teardown_request
+def rollback_storage(exception):
+    """Undo the changes of a request which failed before its response."""
+    if _close_unit():
+        storage.rollback()
+
+
 @app.teardown_appcontext
 def close_storage(exception):
     """Close the current SQLAlchemy session."""
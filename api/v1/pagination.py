@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""Pages of the list views of the API"""
+import os
+from flask import Response, abort, current_app, request, \
+    stream_with_context, url_for
+from models import storage
+
+# objects of a page without limit, and the greatest limit
+PAGE_SIZE = int(os.getenv("HBNB_API_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("HBNB_API_MAX_PAGE_SIZE", 1000))
+
+
+def paginate(cls, **filters):
+    """Returns the response of a page of the objects of cls
+
+    The page is given by the limit and cursor query parameters. The cursor
+    of the next page is sent in the X-Next-Cursor header, with its URL in
+    the Link header, and they are left out on the last page. With
+    limit=all, every object after the cursor is sent.
+    """
+    limit = request.args.get("limit", PAGE_SIZE)
+    cursor = request.args.get("cursor")
+    if limit == "all":
+        try:
+            return stream(storage.export(cls, cursor, **filters))
+        except ValueError:
+            abort(400, "Invalid cursor")
+    try:
+        limit = int(limit)
+    except ValueError:
+        abort(400, "Invalid limit")
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        abort(400, "Invalid limit")
+    try:
+        objs, cursor = storage.paginate(cls, limit, cursor, **filters)
+    except ValueError:
+        abort(400, "Invalid cursor")
+
+    response = stream(objs)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = '<{}>; rel="next"'.format(url_for(
+            request.endpoint, limit=limit, cursor=cursor,
+            **request.view_args
+        ))
+    return response
+
+
+def stream(objs):
+    """Returns a response sending the JSON array of objs as it is written
+
+    Each object is serialized when the previous one has been sent, so the
+    first bytes go out at once and the list is never held as a whole.
+    """
+    dumps = current_app.json.dumps
+
+    def generate():
+        """yields the array one object at a time"""
+        yield "["
+        for i, obj in enumerate(objs):
+            yield ("," if i else "") + dumps(obj.to_dict())
+        yield "]\n"
+    return Response(stream_with_context(generate()),
+                    mimetype="application/json")
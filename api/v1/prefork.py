@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""Runs the HBnB API in several processes sharing the listening socket
+
+Usage: HBNB_API_WORKERS=<n> python3 -m api.v1.prefork
+
+The app is imported once, then HBNB_API_WORKERS processes (one per CPU by
+default) are forked to accept the connections. A worker that dies is
+replaced, and SIGINT or SIGTERM stops them all. FileStorage is switched to
+HBNB_FILE_SHARED=1 so that the workers see each other's writes.
+"""
+import os
+import signal
+import socket
+import sys
+
+os.environ.setdefault("HBNB_FILE_SHARED", "1")
+
+from werkzeug.serving import make_server  # noqa: E402
+from api.v1.app import app, HBNB_API_HOST, HBNB_API_PORT  # noqa: E402
+
+HBNB_API_WORKERS = int(os.getenv("HBNB_API_WORKERS", os.cpu_count() or 1))
+
+
+def serve(sock):
+    """Serve requests on sock until the process is terminated."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server = make_server(HBNB_API_HOST, HBNB_API_PORT, app, threaded=True,
+                         fd=sock.fileno())
+    server.serve_forever()
+
+
+def spawn(sock):
+    """Fork a worker serving sock and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            serve(sock)
+        except SystemExit as e:
+            code = e.code or 0
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main():
+    """Fork the workers and replace the ones that die until stopped."""
+    sock = socket.create_server((HBNB_API_HOST, HBNB_API_PORT))
+    sock.set_inheritable(True)
+    workers = set()
+    stopping = []
+
+    def stop(signum, frame):
+        """Terminate the workers."""
+        stopping.append(signum)
+        for pid in workers:
+            os.kill(pid, signal.SIGTERM)
+
+    for _ in range(HBNB_API_WORKERS):
+        workers.add(spawn(sock))
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    while workers:
+        pid, status = os.wait()
+        workers.discard(pid)
+        if not stopping:
+            workers.add(spawn(sock))
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
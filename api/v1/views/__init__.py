@@ -14,3 +14,4 @@ if app_views:
     from api.v1.views.amenities import *
     from api.v1.views.places_reviews import *
     from api.v1.views.places_amenities import *
+    from api.v1.views.batch import *
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Amenities view module"""
 from models import storage
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import abort, request, jsonify
 
@@ -8,8 +9,7 @@ from flask import abort, request, jsonify
 @app_views.route('/amenities')
 def get_amenities():
     """Get all amenities"""
-    amenities = storage.all("Amenity").values()
-    return [amenity.to_dict() for amenity in amenities]
+    return paginate("Amenity")
 
 
 @app_views.route('/amenities/<amenity_id>')
@@ -0,0 +1,173 @@
+#!/usr/bin/python3
+"""Batch view module"""
+import hashlib
+import os
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from api.v1.views import app_views
+from flask import abort, current_app, jsonify, request
+from werkzeug.test import EnvironBuilder
+
+# objects, or requests, of the greatest batch
+MAX_BATCH_SIZE = int(os.getenv("HBNB_API_MAX_BATCH_SIZE", 10000))
+
+# class, required attributes and class of the objects the ids refer to
+_RESOURCES = {
+    "amenities": (Amenity, ("name",), {}),
+    "cities": (City, ("state_id", "name"), {"state_id": State}),
+    "places": (Place, ("city_id", "user_id", "name"),
+               {"city_id": City, "user_id": User}),
+    "reviews": (Review, ("place_id", "user_id", "text"),
+                {"place_id": Place, "user_id": User}),
+    "states": (State, ("name",), {}),
+    "users": (User, ("email", "password"), {}),
+}
+
+# methods of the requests of POST /api/v1/batch
+_METHODS = ("GET", "POST", "PUT", "DELETE")
+
+
+def _exists(cls, obj_id, found):
+    """Returns True if the object of cls and obj_id exists
+
+    found caches the answers of the batch, as many objects usually refer
+    to the same ones.
+    """
+    key = (cls, obj_id)
+    if key not in found:
+        found[key] = isinstance(obj_id, str) and \
+            storage.get(cls, obj_id) is not None
+    return found[key]
+
+
+def _build(resource, payload, found):
+    """Returns (object, None) for payload, or (None, (status, error))"""
+    cls, required, refs = _RESOURCES[resource]
+    if not isinstance(payload, dict):
+        return None, (400, "Not a JSON")
+    for key in required:
+        if key not in payload:
+            return None, (400, "Missing " + key)
+    for key, ref_cls in refs.items():
+        if not _exists(ref_cls, payload[key], found):
+            return None, (404, "Not found")
+    obj = cls(**payload)
+    if cls is User:
+        obj.password = hashlib.md5(str(obj.password).encode()).hexdigest()
+    return obj, None
+
+
+@app_views.route(
+    '/<any({}):resource>/batch'.format(", ".join(_RESOURCES)),
+    methods=['POST']
+)
+def create_batch(resource):
+    """Creates the objects of a JSON array, in a single save
+
+    Each item is validated as by the view creating a single object. The
+    valid ones are created and the results are sent in the order of the
+    array: {"status": 201, "object": {...}} or {"status": 400 or 404,
+    "error": "..."}. The status of the response is 201 if every object was
+    created, 207 if only some were, and 400 if none was.
+    """
+    try:
+        payload = request.get_json()
+    except Exception:
+        abort(400, 'Not a JSON')
+    if not isinstance(payload, list):
+        abort(400, 'Not a JSON')
+    if len(payload) > MAX_BATCH_SIZE:
+        abort(400, 'Too many objects')
+
+    found = {}
+    objs = []
+    results = []
+    for item in payload:
+        obj, error = _build(resource, item, found)
+        if obj is None:
+            results.append({"status": error[0], "error": error[1]})
+            continue
+        objs.append(obj)
+        results.append({"status": 201, "object": obj})
+    if objs:
+        storage.new_all(objs)
+        storage.save()
+
+    for result in results:
+        if "object" in result:
+            result["object"] = result["object"].to_dict()
+    if len(objs) == len(payload):
+        status = 201
+    else:
+        status = 207 if objs else 400
+    return jsonify(results), status
+
+
+def _result(status, body, headers=()):
+    """Returns the result of a request of a batch"""
+    return {"status": status, "headers": dict(headers), "body": body}
+
+
+def _dispatch(item):
+    """Returns the result of the request item of a batch
+
+    The request runs in a request context of its own, with the hooks of
+    the app, so it is a unit of work nested in the one of the batch.
+    """
+    if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+        return _result(400, {"error": "Missing path"})
+    method = item.get("method", "GET")
+    if method not in _METHODS:
+        return _result(400, {"error": "Invalid method"})
+    path = item["path"]
+    if not path.startswith(app_views.url_prefix + "/") or \
+            path.partition("?")[0].rstrip("/") == request.path.rstrip("/"):
+        return _result(400, {"error": "Invalid path"})
+
+    app = current_app._get_current_object()
+    builder = EnvironBuilder(
+        path=path, method=method,
+        base_url=request.host_url.rstrip("/") + request.script_root,
+        **({"json": item["body"]} if "body" in item else {})
+    )
+    with app.request_context(builder.get_environ()):
+        try:
+            response = app.full_dispatch_request()
+            if response.is_json:
+                body = response.get_json(silent=True)
+            else:
+                body = response.get_data(as_text=True)
+        except Exception:
+            # the unit of the request is rolled back by its teardown
+            app.logger.exception("%s %s failed in a batch", method, path)
+            return _result(500, {"error": "Internal Server Error"})
+    return _result(response.status_code, body, response.headers)
+
+
+@app_views.route('/batch', methods=['POST'])
+def dispatch_batch():
+    """Runs the requests of a JSON array, in a single round trip
+
+    Each item is {"method": "GET", "path": "/api/v1/...", "body": ...},
+    the method defaulting to GET and the body to none. The requests are
+    dispatched in order to the views of the API, without the network, and
+    share the storage session and the unit of work of the batch: each one
+    is rolled back alone if it fails, and the changes of the others are
+    written once at the end. The responses are sent in the same order as
+    {"status": 200, "headers": {...}, "body": ...}, with the body parsed
+    if it is JSON.
+    """
+    try:
+        payload = request.get_json()
+    except Exception:
+        abort(400, 'Not a JSON')
+    if not isinstance(payload, list):
+        abort(400, 'Not a JSON')
+    if len(payload) > MAX_BATCH_SIZE:
+        abort(400, 'Too many requests')
+    return jsonify([_dispatch(item) for item in payload])
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Cities view module"""
 from models import storage
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import request, jsonify, abort
 
@@ -11,7 +12,7 @@ def get_cities(state_id):
     state = storage.get("State", state_id)
     if state is None:
         abort(404)
-    return [city.to_dict() for city in state.cities]
+    return paginate("City", state_id=state_id)
 
 
 @app_views.route('/cities/<city_id>')
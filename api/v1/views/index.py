@@ -25,4 +25,20 @@ def stats():
         "amenities": "Amenity",
     }
 
-    return {key: storage.count(value) for key, value in classes.items()}
+    stats = {key: storage.count(value) for key, value in classes.items()}
+    if hasattr(storage, "skipped_reloads"):
+        stats["reloads_skipped"] = storage.skipped_reloads()
+    return stats
+
+
+@app_views.route('/metrics')
+def metrics():
+    """Return the statistics of the storage engine"""
+    from models import storage
+
+    metrics = {"storage": type(storage).__name__}
+    if hasattr(storage, "pool_stats"):
+        metrics["pool"] = storage.pool_stats()
+    if hasattr(storage, "skipped_reloads"):
+        metrics["reloads_skipped"] = storage.skipped_reloads()
+    return metrics
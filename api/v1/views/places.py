@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Places view module"""
 from models import storage
+from api.v1.pagination import paginate, stream
 from api.v1.views import app_views
 from flask import abort, request, jsonify
 
@@ -14,9 +15,7 @@ def city_places(city_id):
     if not city:
         abort(404)
 
-    places_list = [place.to_dict() for place in city.places]
-
-    return jsonify(places_list), 200
+    return paginate("Place", city_id=city_id)
 
 
 @app_views.route("/places/<place_id>")
@@ -103,11 +102,40 @@ def delete_place(place_id):
         abort(404)
 
     place.delete()
-    storage.save()
 
     return jsonify({}), 200
 
 
+@app_views.route("/places_search", methods=["POST"])
+def places_search():
+    """Returns the places of some states and cities with some amenities"""
+
+    try:
+        search = request.get_json()
+    except Exception as e:
+        abort(400, description="Not a JSON")
+    if not isinstance(search, dict):
+        abort(400, description="Not a JSON")
+
+    ids = {}
+    for key in ("states", "cities", "amenities"):
+        ids[key] = search.get(key) or []
+        if not isinstance(ids[key], list) or \
+                not all(isinstance(i, str) for i in ids[key]):
+            abort(400, description="Invalid " + key)
+    states, cities, amenities = ids["states"], ids["cities"], ids["amenities"]
+
+    city_ids = None
+    if states or cities:
+        city_ids = set(cities)
+        for state_id in states:
+            state = storage.get("State", state_id)
+            if state:
+                city_ids.update(city.id for city in state.cities)
+
+    return stream(storage.search_places(city_ids, amenities))
+
+
 # @app_views.route('/cities/<city_id>/places')
 # def get_places(city_id):
 #     """Get all places"""
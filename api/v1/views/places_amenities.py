@@ -1,7 +1,140 @@
 #!/usr/bin/python3
 """Places amenities view module"""
-from models import storage
+from models import storage, storage_type
 from models.place import Place
 from models.amenity import Amenity
+from api.v1.pagination import stream
 from api.v1.views import app_views
 from flask import request, abort, jsonify
+
+
+def _get_place_or_404(place_id):
+    """Returns the place of place_id, aborts with 404 if there is none"""
+    place = storage.get(Place, place_id)
+    if place is None:
+        abort(404)
+    return place
+
+
+def _linked(place, amenity):
+    """Returns True if amenity is linked to place"""
+    if storage_type == 'db':
+        return amenity in place.amenities
+    return amenity.id in place.amenity_ids
+
+
+def _link(place, amenities):
+    """Links amenities to place without saving
+
+    The links are rows of place_amenity in DB mode, and the amenity_ids of
+    the place otherwise.
+    """
+    for amenity in amenities:
+        if _linked(place, amenity):
+            continue
+        if storage_type == 'db':
+            place.amenities.append(amenity)
+        else:
+            place.amenities = amenity
+
+
+def _unlink(place, amenities):
+    """Unlinks amenities from place, without saving"""
+    if storage_type == 'db':
+        for amenity in amenities:
+            if amenity in place.amenities:
+                place.amenities.remove(amenity)
+    else:
+        ids = {amenity.id for amenity in amenities}
+        place.amenity_ids = [
+            amenity_id for amenity_id in place.amenity_ids
+            if amenity_id not in ids
+        ]
+
+
+def _requested_amenities():
+    """Returns the amenities of the amenity_ids list of the request
+
+    Aborts with 400 if the body is not a JSON object with a list of ids,
+    and with 404 if any amenity does not exist.
+    """
+    try:
+        payload = request.get_json()
+    except Exception:
+        abort(400, 'Not a JSON')
+    if not isinstance(payload, dict):
+        abort(400, 'Not a JSON')
+    amenity_ids = payload.get("amenity_ids")
+    if not isinstance(amenity_ids, list) or \
+            not all(isinstance(i, str) for i in amenity_ids):
+        abort(400, 'Missing amenity_ids')
+    amenities = []
+    for amenity_id in dict.fromkeys(amenity_ids):
+        amenity = storage.get(Amenity, amenity_id)
+        if amenity is None:
+            abort(404)
+        amenities.append(amenity)
+    return amenities
+
+
+@app_views.route('/places/<place_id>/amenities')
+def get_place_amenities(place_id):
+    """Get the amenities of a place"""
+    place = _get_place_or_404(place_id)
+    return stream(place.amenities)
+
+
+@app_views.route('/places/<place_id>/amenities/<amenity_id>',
+                 methods=['POST'])
+def link_place_amenity(place_id, amenity_id):
+    """Links an amenity to a place"""
+    place = _get_place_or_404(place_id)
+    amenity = storage.get(Amenity, amenity_id)
+    if amenity is None:
+        abort(404)
+
+    if _linked(place, amenity):
+        return jsonify(amenity.to_dict()), 200
+    _link(place, [amenity])
+    storage.new(place)
+    storage.save()
+    return jsonify(amenity.to_dict()), 201
+
+
+@app_views.route('/places/<place_id>/amenities/<amenity_id>',
+                 methods=['DELETE'])
+def unlink_place_amenity(place_id, amenity_id):
+    """Unlinks an amenity from a place"""
+    place = _get_place_or_404(place_id)
+    amenity = storage.get(Amenity, amenity_id)
+    if amenity is None or not _linked(place, amenity):
+        abort(404)
+
+    _unlink(place, [amenity])
+    storage.new(place)
+    storage.save()
+    return jsonify({}), 200
+
+
+@app_views.route('/places/<place_id>/amenities', methods=['POST'])
+def link_place_amenities(place_id):
+    """Links the amenities of amenity_ids to a place, in a single save"""
+    place = _get_place_or_404(place_id)
+    amenities = _requested_amenities()
+
+    _link(place, amenities)
+    storage.new(place)
+    storage.save()
+    return stream(place.amenities)
+
+
+@app_views.route('/places/<place_id>/amenities', methods=['DELETE'])
+def unlink_place_amenities(place_id):
+    """Unlinks the amenities of amenity_ids from a place, in a single save"""
+    place = _get_place_or_404(place_id)
+    amenities = _requested_amenities()
+
+    _unlink(place, amenities)
+    storage.new(place)
+    storage.save()
+    return stream(place.amenities)
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Places reviews view module"""
 from models import storage
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import request, jsonify, abort
 
@@ -12,7 +13,7 @@ def get_reviews(place_id):
     if place is None:
         abort(404)
 
-    return [review.to_dict() for review in place.reviews]
+    return paginate("Review", place_id=place_id)
 
 
 @app_views.route('/reviews/<review_id>')
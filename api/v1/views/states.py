@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """States view module"""
 from models import storage
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import jsonify, request, abort
 
@@ -8,8 +9,7 @@ from flask import jsonify, request, abort
 @app_views.route('/states')
 def get_states():
     """Get all states"""
-    states = storage.all("State").values()
-    return [state.to_dict() for state in states]
+    return paginate("State")
 
 
 @app_views.route('/states/<state_id>')
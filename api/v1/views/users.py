@@ -7,6 +7,7 @@
 # #!/usr/bin/python3
 # """This module handles all default RESTFul APIs for User object"""
 
+from api.v1.pagination import paginate
 from api.v1.views import app_views
 from flask import abort, jsonify, request
 from models import storage
@@ -18,9 +19,7 @@ import hashlib
 def users_list():
     """Returns a list of all User objects in a json representation"""
 
-    users = storage.all(User)
-    user_list = [user.to_dict() for user in users.values()]
-    return jsonify(user_list)
+    return paginate(User)
 
 
 @app_views.route("/users/<user_id>")
@@ -86,14 +85,14 @@ def update_user(user_id):
 
     try:
         data = request.get_json()
-        if not data:
-            abort(400, "Not a JSON")
     except Exception as e:
         abort(400, "Not a JSON")
+    if not isinstance(data, dict):
+        abort(400, "Not a JSON")
 
-    if 'password' in user:
-        encoded_password = hashlib.md5(user.password.encode()).hexdigest()
-        user.password = encoded_password
+    if 'password' in data:
+        data['password'] = hashlib.md5(
+            str(data['password']).encode()).hexdigest()
 
     for key, value in data.items():
         if key not in ['id', 'created_at', 'updated_at', 'email']:
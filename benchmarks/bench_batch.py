@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Compares creating states one POST at a time and with a batch
+
+Usage: ./benchmarks/bench_batch.py [states ...]
+
+For each number of states, they are created by POST /api/v1/states, one
+request each, then by a single POST /api/v1/states/batch, in a temporary
+directory with the engine chosen by HBNB_TYPE_STORAGE. Prints the time
+taken and the objects created per second.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SIZES = (100, 1000, 5000)
+
+
+def main(sizes):
+    """times both ways of creating each number of states"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ.setdefault("HBNB_SQLITE_PATH", "hbnb.db")
+    from api.v1.app import app
+    from models import storage
+
+    client = app.test_client()
+    print("{} storage".format(type(storage).__name__))
+    print("{:>8} {:>8} {:>10} {:>12}".format(
+        "states", "requests", "total ms", "objects/s"))
+    for size in sizes:
+        states = [{"name": "S{}".format(i)} for i in range(size)]
+
+        def single():
+            """posts each state"""
+            for state in states:
+                client.post("/api/v1/states", json=state)
+
+        def batch():
+            """posts every state at once"""
+            client.post("/api/v1/states/batch", json=states)
+        for requests, func in ((size, single), (1, batch)):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            print("{:>8} {:>8} {:>10.1f} {:>12.0f}".format(
+                size, requests, elapsed * 1000, size / elapsed))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
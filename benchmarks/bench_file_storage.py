@@ -0,0 +1,305 @@
+#!/usr/bin/python3
+"""
+Micro benchmarks for the FileStorage engine
+
+Usage: ./benchmarks/bench_file_storage.py <benchmark> [size ...]
+
+where <benchmark> is one of the keys of BENCHMARKS.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.file_storage import FileStorage, classes  # noqa: E402
+from models.engine.mmap_storage import MmapStorage  # noqa: E402
+from models.engine.serializers import formats  # noqa: E402
+from models.state import State  # noqa: E402
+from models.user import User  # noqa: E402
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+
+def populate(storage, size):
+    """fills storage with size objects, half States and half Users"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__index = {}
+    FileStorage._FileStorage__raw = {}
+    FileStorage._FileStorage__changes = {}
+    ids = []
+    for i in range(size):
+        obj = State() if i % 2 else User()
+        storage.new(obj)
+        ids.append((type(obj), obj.id))
+    return ids
+
+
+def bench_lookup(sizes):
+    """times get() and all(cls) as the number of stored objects grows"""
+    storage = FileStorage()
+    print("{:>10} {:>14} {:>18}".format("objects", "get() us", "all(cls) ms"))
+    for size in sizes:
+        ids = populate(storage, size)
+        probes = ids[::max(1, len(ids) // 1000)]
+        loops = 100000
+        get_time = timeit.timeit(
+            "for cls, obj_id in probes: storage.get(cls, obj_id)",
+            globals={"probes": probes, "storage": storage},
+            number=max(1, loops // len(probes)),
+        )
+        get_us = get_time / (max(1, loops // len(probes)) * len(probes)) * 1e6
+        all_time = timeit.timeit(
+            lambda: storage.all(State), number=5
+        ) / 5 * 1e3
+        print("{:>10} {:>14.3f} {:>18.3f}".format(size, get_us, all_time))
+
+
+def bench_save(sizes):
+    """times save() after changing one object, snapshot vs journal"""
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    FileStorage._FileStorage__compact_every = float("inf")
+    print("{:>10} {:>14} {:>14}".format(
+        "objects", "snapshot ms", "journal ms"))
+    for size in sizes:
+        ids = populate(storage, size)
+        obj = storage.get(*ids[0])
+        times = []
+        for journal in (False, True):
+            FileStorage._FileStorage__journal = journal
+
+            def change_one():
+                obj.name = "changed"
+                storage.new(obj)
+                storage.save()
+            number = 3 if not journal else 100
+            times.append(timeit.timeit(change_one, number=number) / number)
+        print("{:>10} {:>14.3f} {:>14.3f}".format(
+            size, times[0] * 1e3, times[1] * 1e3))
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+
+
+def bench_dirty(sizes):
+    """times a snapshot save() with a single changed object"""
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    print("{:>10} {:>14} {:>14}".format(
+        "objects", "first save ms", "1 dirty ms"))
+    for size in sizes:
+        ids = populate(storage, size)
+        FileStorage._FileStorage__serialized = {}
+        first = timeit.timeit(storage.save, number=1)
+        obj = storage.get(*ids[0])
+
+        def change_one():
+            obj.name = "changed"
+            storage.save()
+        dirty = timeit.timeit(change_one, number=3) / 3
+        print("{:>10} {:>14.3f} {:>14.3f}".format(
+            size, first * 1e3, dirty * 1e3))
+    os.remove(FileStorage._FileStorage__file_path)
+    os.rmdir(tmp)
+
+
+def bench_group(sizes, threads=16, saves=20):
+    """measures concurrent save() throughput with fsync on every write
+
+    Each thread creates an object and saves it, like concurrent POSTs.
+    """
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    FileStorage._FileStorage__fsync = "always"
+    print("{:>10} {:>10} {:>10} {:>12}".format(
+        "objects", "window ms", "saves/s", "disk writes"))
+    for size in sizes:
+        for window in (0, 2):
+            populate(storage, size)
+            storage.save()
+            FileStorage._FileStorage__commit_window = window / 1000
+            writes = FileStorage._FileStorage__disk_writes
+
+            def post():
+                for _ in range(saves):
+                    storage.new(State(name="bench"))
+                    storage.save()
+            workers = [threading.Thread(target=post) for _ in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+            print("{:>10} {:>10} {:>10.0f} {:>12}".format(
+                size, window, threads * saves / elapsed,
+                FileStorage._FileStorage__disk_writes - writes))
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+
+
+def bench_reload(sizes):
+    """measures wall time and peak memory of reload()
+
+    The streaming reload() is compared with loading the whole file with
+    json.load() before instantiating the objects.
+    """
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    FileStorage._FileStorage__file_path = path
+
+    def json_load():
+        with open(path, 'r') as f:
+            jo = json.load(f)
+        for key in jo:
+            storage.new(classes[jo[key]["__class__"]](**jo[key]))
+
+    def streaming():
+        FileStorage._FileStorage__file_stat = None
+        storage.reload()
+
+    print("{:>10} {:>10} {:>10} {:>12}".format(
+        "objects", "parser", "time s", "peak MiB"))
+    for size in sizes:
+        populate(storage, size)
+        storage.save()
+        for name, load in (("json.load", json_load), ("stream", streaming)):
+            populate(storage, 0)
+            elapsed = timeit.timeit(load, number=1)
+            populate(storage, 0)
+            tracemalloc.start()
+            load()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("{:>10} {:>10} {:>10.2f} {:>12.1f}".format(
+                size, name, elapsed, peak / (1 << 20)))
+    populate(storage, 0)
+    os.remove(path)
+    os.rmdir(tmp)
+
+
+def bench_lazy(sizes):
+    """measures the cold start of reload(), eager or lazy, and a first get"""
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "file.json")
+    FileStorage._FileStorage__file_path = path
+    print("{:>10} {:>8} {:>12} {:>16}".format(
+        "objects", "mode", "reload s", "first get us"))
+    for size in sizes:
+        ids = populate(storage, size)
+        storage.save()
+        for lazy in (False, True):
+            FileStorage._FileStorage__lazy = lazy
+            populate(storage, 0)
+            FileStorage._FileStorage__file_stat = None
+            elapsed = timeit.timeit(storage.reload, number=1)
+            first = timeit.timeit(lambda: storage.get(*ids[-1]), number=1)
+            print("{:>10} {:>8} {:>12.3f} {:>16.1f}".format(
+                size, "lazy" if lazy else "eager", elapsed, first * 1e6))
+    populate(storage, 0)
+    os.remove(path)
+    os.rmdir(tmp)
+
+
+def bench_format(sizes):
+    """compares the file formats: save(), reload() and file size"""
+    storage = FileStorage()
+    tmp = tempfile.mkdtemp()
+    print("{:>10} {:>8} {:>10} {:>10} {:>10}".format(
+        "objects", "format", "save s", "reload s", "size MiB"))
+    for size in sizes:
+        for name, fmt in formats.items():
+            path = os.path.join(tmp, "file" + fmt.extension)
+            FileStorage._FileStorage__file_path = path
+            FileStorage._FileStorage__format = fmt
+            populate(storage, size)
+            FileStorage._FileStorage__serialized = {}
+            saving = timeit.timeit(storage.save, number=1)
+            populate(storage, 0)
+            FileStorage._FileStorage__file_stat = None
+            loading = timeit.timeit(storage.reload, number=1)
+            print("{:>10} {:>8} {:>10.3f} {:>10.3f} {:>10.1f}".format(
+                size, name, saving, loading,
+                os.path.getsize(path) / (1 << 20)))
+            os.remove(path)
+    os.rmdir(tmp)
+
+
+def bench_mmap(sizes):
+    """compares MmapStorage with the lazy FileStorage
+
+    Times the cold start of a process (reload() then a first get()), a warm
+    get() of objects not decoded yet and save() after changing one object.
+    """
+    tmp = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(tmp, "file.json")
+    FileStorage._FileStorage__lazy = True
+    print("{:>10} {:>8} {:>12} {:>10} {:>12}".format(
+        "objects", "engine", "cold start s", "get us", "1 save ms"))
+    for size in sizes:
+        ids = populate(FileStorage(), size)
+        FileStorage().save()
+        mmap = MmapStorage(os.path.join(tmp, "file.mmap"))
+        mmap.reload()
+        for cls, obj_id in ids:
+            mmap.new(FileStorage().get(cls, obj_id))
+        mmap.save()
+        probes = ids[::max(1, len(ids) // 1000)]
+        for engine in ("file", "mmap"):
+            def start():
+                if engine == "file":
+                    populate(FileStorage(), 0)
+                    FileStorage._FileStorage__file_stat = None
+                    storage = FileStorage()
+                else:
+                    storage = MmapStorage(os.path.join(tmp, "file.mmap"))
+                storage.reload()
+                storage.get(*ids[-1])
+                return storage
+            cold = timeit.timeit(start, number=1)
+            storage = start()
+            warm = timeit.timeit(
+                lambda: [storage.get(*probe) for probe in probes], number=1)
+            obj = storage.get(*ids[0])
+
+            def change_one():
+                obj.name = "changed"
+                storage.new(obj)
+                storage.save()
+            number = 3 if engine == "file" else 100
+            save = timeit.timeit(change_one, number=number) / number
+            print("{:>10} {:>8} {:>12.3f} {:>10.1f} {:>12.3f}".format(
+                size, engine, cold, warm / len(probes) * 1e6, save * 1e3))
+        for name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+
+
+BENCHMARKS = {
+    "lookup": bench_lookup,
+    "save": bench_save,
+    "dirty": bench_dirty,
+    "group": bench_group,
+    "reload": bench_reload,
+    "lazy": bench_lazy,
+    "format": bench_format,
+    "mmap": bench_mmap,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        sys.exit("Usage: {} <{}> [size ...]".format(
+            sys.argv[0], "|".join(BENCHMARKS)))
+    BENCHMARKS[sys.argv[1]]([int(arg) for arg in sys.argv[2:]] or SIZES)
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+Times storage.search_places() against going through every place
+
+Usage: ./benchmarks/bench_places_search.py [places]
+
+Creates 100 states of 10 cities, 50 amenities and the places (100000 by
+default) with up to 5 amenities each, in a temporary directory, with the
+engine chosen by HBNB_TYPE_STORAGE. Then searches the places of 10 states
+with 2 amenities, of 5 cities, and with 1 amenity, first by a loop over the
+places of each city as the clients did, then with search_places().
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+PLACES = 100000
+SEARCHES = 5
+
+
+def main(size):
+    """creates the objects then times each search"""
+    os.chdir(tempfile.mkdtemp())
+    os.environ.setdefault("HBNB_SQLITE_PATH", "hbnb.db")
+    from models import storage, storage_type
+    from models.amenity import Amenity
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+
+    rand = random.Random(0)
+    user = User(email="a@hbnb.io", password="pwd")
+    storage.new(user)
+    amenities = [Amenity(name="A{}".format(i)) for i in range(50)]
+    states = [State(name="S{}".format(i)) for i in range(100)]
+    cities = [City(name="C{}".format(i), state_id=states[i // 10].id)
+              for i in range(1000)]
+    for obj in amenities + states + cities:
+        storage.new(obj)
+    for i in range(size):
+        place = Place(name="P{}".format(i), user_id=user.id,
+                      city_id=rand.choice(cities).id)
+        linked = rand.sample(amenities, rand.randint(0, 5))
+        if storage_type == 'db':
+            place.amenities = linked
+        else:
+            place.amenity_ids = [amenity.id for amenity in linked]
+        storage.new(place)
+    storage.save()
+
+    def amenity_ids(place):
+        """returns the ids of the amenities of place"""
+        if storage_type == 'db':
+            return {amenity.id for amenity in place.amenities}
+        return set(place.amenity_ids)
+
+    def crawl(city_ids, wanted):
+        """finds the places by checking each one, city by city if given"""
+        places = storage.all(Place).values()
+        if city_ids is None:
+            return [place for place in places
+                    if wanted.issubset(amenity_ids(place))]
+        found = []
+        for city_id in city_ids:
+            for place in places:
+                if place.city_id == city_id and \
+                        wanted.issubset(amenity_ids(place)):
+                    found.append(place)
+        return found
+
+    searches = (
+        ("10 states, 2 amenities",
+         [c.id for c in cities[:100]], {a.id for a in amenities[:2]}),
+        ("5 cities", [c.id for c in cities[500:505]], set()),
+        ("1 amenity", None, {amenities[7].id}),
+    )
+    print("{} places, {} storage".format(size, type(storage).__name__))
+    print("{:>24} {:>8} {:>10} {:>10}".format(
+        "search", "places", "loop ms", "index ms"))
+    for name, city_ids, wanted in searches:
+        timings = []
+        for func in (crawl, storage.search_places):
+            start = time.perf_counter()
+            for _ in range(SEARCHES):
+                found = func(city_ids, wanted)
+            timings.append((time.perf_counter() - start) * 1000 / SEARCHES)
+        print("{:>24} {:>8} {:>10.1f} {:>10.1f}".format(
+            name, len(found), *timings))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PLACES)
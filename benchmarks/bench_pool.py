@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""
+Load test of the connection pool of DBStorage
+
+Usage: ./benchmarks/bench_pool.py [pool size ...]
+
+Threads send a mix of reads and writes to the API on the SQLite engine,
+which stands for MySQL, with each pool size and no overflow. Prints the
+requests per second and the pool statistics of /api/v1/metrics.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SIZES = (1, 2, 4, 16)
+THREADS = 16
+REQUESTS = 50
+
+
+def run():
+    """runs the load in this process, prints the results as JSON"""
+    from api.v1.app import app
+
+    prefix = "/api/v1"
+    res = app.test_client().post(prefix + "/states", json={"name": "S"})
+    state_id = res.get_json()["id"]
+
+    def load():
+        """sends REQUESTS requests, one write for four reads"""
+        client = app.test_client()
+        for i in range(REQUESTS):
+            if i % 5 == 0:
+                client.post(prefix + "/states/{}/cities".format(state_id),
+                            json={"name": "C"})
+            else:
+                client.get(prefix + "/states/" + state_id)
+    threads = [threading.Thread(target=load) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pool = app.test_client().get(prefix + "/metrics").get_json()["pool"]
+    print(json.dumps({"rps": THREADS * REQUESTS / elapsed, "pool": pool}))
+
+
+def main(sizes):
+    """runs the load with each pool size in its own process"""
+    print("{:>6} {:>8} {:>10} {:>10} {:>12} {:>12} {:>9}".format(
+        "pool", "req/s", "checkouts", "max out", "wait ms", "max wait ms",
+        "timeouts"))
+    for size in sizes:
+        tmp = tempfile.mkdtemp()
+        env = dict(os.environ, HBNB_TYPE_STORAGE="db",
+                   HBNB_DB_ENGINE="sqlite", HBNB_SQLITE_PATH="hbnb.db",
+                   HBNB_SQLITE_POOL_SIZE=str(size),
+                   HBNB_SQLITE_MAX_OVERFLOW="0")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run"],
+            cwd=tmp, env=env, capture_output=True, text=True)
+        result = json.loads(out.stdout)
+        pool = result["pool"]
+        print("{:>6} {:>8.0f} {:>10} {:>10} {:>12.1f} {:>12.1f} {:>9}".format(
+            size, result["rps"], pool["checkouts"], pool["max_checked_out"],
+            pool["wait_ms"], pool["max_wait_ms"], pool["timeouts"]))
+        for file_name in os.listdir(tmp):
+            os.remove(os.path.join(tmp, file_name))
+        os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run()
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+"""
+Runs the same API workload on each storage engine
+
+Usage: ./benchmarks/bench_storage_api.py [states ...]
+
+For each number of states, the states are created with two cities each
+through the API, then every state and its cities are read back, then
+every state is renamed. Each engine runs in its own process, since the
+engine is chosen when models is imported. MySQL is only used when
+HBNB_MYSQL_DB is set.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SIZES = (100, 1000, 2000)
+ENGINES = {
+    "file": {},
+    "file+journal": {"HBNB_FILE_JOURNAL": "1"},
+    "mmap": {"HBNB_TYPE_STORAGE": "mmap"},
+    "sqlite": {"HBNB_TYPE_STORAGE": "db", "HBNB_DB_ENGINE": "sqlite"},
+    "mysql": {"HBNB_TYPE_STORAGE": "db"},
+}
+
+
+def run(size):
+    """creates, reads then updates size states, prints requests/s"""
+    from api.v1.app import app
+
+    client = app.test_client()
+    prefix = "/api/v1"
+    timings = []
+    start = time.perf_counter()
+    ids = []
+    for i in range(size):
+        res = client.post(prefix + "/states", json={"name": "S{}".format(i)})
+        ids.append(res.get_json()["id"])
+        for j in range(2):
+            client.post(prefix + "/states/{}/cities".format(ids[-1]),
+                        json={"name": "C{}".format(j)})
+    timings.append(size * 3 / (time.perf_counter() - start))
+    start = time.perf_counter()
+    for state_id in ids:
+        client.get(prefix + "/states/" + state_id)
+        client.get(prefix + "/states/{}/cities".format(state_id))
+    timings.append(size * 2 / (time.perf_counter() - start))
+    start = time.perf_counter()
+    for state_id in ids:
+        client.put(prefix + "/states/" + state_id, json={"name": "R"})
+    timings.append(size / (time.perf_counter() - start))
+    print(" ".join("{:.0f}".format(t) for t in timings))
+
+
+def main(sizes):
+    """runs the workload of each size on each engine"""
+    print("{:>8} {:>14} {:>12} {:>12} {:>12}".format(
+        "states", "engine", "create/s", "read/s", "update/s"))
+    for size in sizes:
+        for name, env in ENGINES.items():
+            if name == "mysql" and not os.getenv("HBNB_MYSQL_DB"):
+                continue
+            tmp = tempfile.mkdtemp()
+            env = dict(os.environ, HBNB_SQLITE_PATH="hbnb.db", **env)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run",
+                 str(size)],
+                cwd=tmp, env=env, capture_output=True, text=True)
+            result = out.stdout.split() or ["error"] * 3
+            print("{:>8} {:>14} {:>12} {:>12} {:>12}".format(
+                size, name, *result))
+            for file_name in os.listdir(tmp):
+                os.remove(os.path.join(tmp, file_name))
+            os.rmdir(tmp)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(int(sys.argv[2]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
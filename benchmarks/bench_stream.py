@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Compares sending a list of users whole and streamed
+
+Usage: ./benchmarks/bench_stream.py [users ...]
+
+For each number of users, the export of every user is built with jsonify()
+as the list views did, then streamed by GET /api/v1/users?limit=all.
+Prints the time until the first bytes can be sent, the total time, and
+the peak of the memory allocated while the response is written.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SIZES = (1000, 10000, 50000)
+
+
+def measure(func):
+    """returns the ms to the first chunk of func(), in total, and peak KiB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = iter(func())
+    next(chunks)
+    first = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    total = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first * 1000, total * 1000, peak / 1024
+
+
+def main(sizes):
+    """measures the two responses for each number of users"""
+    os.chdir(tempfile.mkdtemp())
+    from api.v1.app import app
+    from flask import jsonify
+    from models import storage
+    from models.user import User
+
+    client = app.test_client()
+    print("{:>8} {:>9} {:>10} {:>10} {:>10}".format(
+        "users", "response", "first ms", "total ms", "peak KiB"))
+    count = 0
+    for size in sizes:
+        for i in range(count, size):
+            storage.new(User(email="{}@hbnb.io".format(i), password="pwd"))
+        storage.save()
+        count = size
+
+        def whole():
+            """builds the whole list then sends it in one chunk"""
+            with app.test_request_context():
+                users = storage.all(User)
+                response = jsonify([u.to_dict() for u in users.values()])
+                return [response.get_data()]
+
+        def streamed():
+            """sends the chunks of the streamed response"""
+            response = client.get("/api/v1/users?limit=all", buffered=False)
+            return response.response
+        for name, func in (("whole", whole), ("streamed", streamed)):
+            print("{:>8} {:>9} {:>10.1f} {:>10.1f} {:>10.0f}".format(
+                size, name, *measure(func)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
@@ -104,8 +104,7 @@ class HBNBCommand(cmd.Cmd):
             if len(args) > 1:
                 key = args[0] + "." + args[1]
                 if key in models.storage.all():
-                    models.storage.all().pop(key)
-                    models.storage.save()
+                    models.storage.delete(models.storage.all()[key])
                 else:
                     print("** no instance found **")
             else:
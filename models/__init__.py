@@ -3,11 +3,22 @@
 import os
 
 storage_type = os.getenv('HBNB_TYPE_STORAGE')
+# loading strategy of the relationships in db storage: select (lazy),
+# selectin or joined
+db_loading = os.getenv('HBNB_DB_LOADING', 'select')
 
-if storage_type == 'db':
+if storage_type == 'db' and os.getenv('HBNB_DB_ENGINE') == 'sqlite':
+    from models.engine.sqlite_storage import SQLiteStorage
+
+    storage = SQLiteStorage()
+elif storage_type == 'db':
     from models.engine.db_storage import DBStorage
 
     storage = DBStorage()
+elif storage_type == 'mmap':
+    from models.engine.mmap_storage import MmapStorage
+
+    storage = MmapStorage()
 else:
     from models.engine.file_storage import FileStorage
 
@@ -3,10 +3,12 @@
 import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 from models import storage_type
 
 Base = object
+DATETIME = DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
 if storage_type == 'db':
     Base = declarative_base()
 
@@ -18,12 +20,19 @@ class BaseModel:
         id (uuid): Unique identifier for the model instance.
         created_at: Timestamp indicating when the instance was created.
         updated_at: Timestamp indicating when the instance was updated.
+        _dirty (bool): True if the instance changed since it was last saved,
+            kept in a slot so that it is not part of __dict__.
     """
 
+    __slots__ = ("__dict__", "__weakref__", "_dirty")
+
     if storage_type == 'db':
         id = Column(String(60), primary_key=True)
-        created_at = Column(DateTime, default=datetime.now(), nullable=False)
-        updated_at = Column(DateTime, default=datetime.now(), nullable=False)
+        # microseconds are kept by MySQL too, the pages of paginate() are
+        # ordered by created_at
+        created_at = Column(DATETIME, default=datetime.now, nullable=False,
+                            index=True)
+        updated_at = Column(DATETIME, default=datetime.now, nullable=False)
 
     def __init__(self, *args, **kwargs):
         """Initializes a new BaseModel instance.
@@ -39,19 +48,51 @@ class BaseModel:
                     setattr(self, key, value)
             if not kwargs.get("id"):
                 self.id = str(uuid.uuid4())
-            if kwargs.get("created_at") and type(self.created_at) is str:
-                self.created_at = datetime.now()
-            else:
-                self.created_at = datetime.now()
-            if kwargs.get("updated_at") and type(self.updated_at) is str:
-                self.updated_at = datetime.now()
-            else:
-                self.updated_at = self.created_at
+            self.created_at = self.__datetime(kwargs.get("created_at")) \
+                or datetime.now()
+            self.updated_at = self.__datetime(kwargs.get("updated_at")) \
+                or self.created_at
         else:
             self.id = str(uuid.uuid4())
             self.created_at = datetime.now()
             self.updated_at = self.created_at
 
+    @staticmethod
+    def __datetime(value):
+        """Returns value as a datetime, None if it is not a valid one."""
+        if type(value) is str:
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if isinstance(value, datetime):
+            return value
+        return None
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and marks the instance as changed.
+
+        The storage is told the previous value of the attribute too, which
+        its units of work restore on a rollback.
+        """
+        # the foreign keys are reported each time, storages index them
+        if name.startswith("_") or (
+            self.is_dirty() and not name.endswith(("_id", "_ids"))
+        ):
+            super().__setattr__(name, value)
+            return
+        previous = {name: self.__dict__[name]} if name in self.__dict__ \
+            else {}
+        super().__setattr__(name, value)
+        from models import storage
+
+        self._dirty = True
+        storage.touch(self, name, previous)
+
+    def is_dirty(self):
+        """Returns True if the instance changed since it was last saved."""
+        return getattr(self, "_dirty", False)
+
     def __str__(self):
         """Returns a string representation of the BaseModel instance."""
         return "[{}] ({}) {}".format(
@@ -74,6 +115,9 @@ class BaseModel:
         _dict['updated_at'] = _dict['updated_at'].isoformat()
         if '_sa_instance_state' in _dict:
             del _dict['_sa_instance_state']
+            # related objects loaded by the session are not attributes
+            for key in self.__mapper__.relationships.keys():
+                _dict.pop(key, None)
         return _dict
 
     def delete(self):
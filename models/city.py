@@ -3,7 +3,7 @@
 from models.base_model import BaseModel, Base
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String, ForeignKey
-from models import storage_type
+from models import db_loading, storage_type
 
 
 class City(BaseModel, Base):
@@ -12,8 +12,18 @@ class City(BaseModel, Base):
     if storage_type == 'db':
         __tablename__ = 'cities'
         name = Column(String(128), nullable=False)
-        state_id = Column(String(60), ForeignKey('states.id'), nullable=False)
-        places = relationship('Place', backref='cities', cascade='all, delete')
+        state_id = Column(String(60), ForeignKey('states.id'),
+                          nullable=False, index=True)
+        places = relationship('Place', backref='cities', cascade='all, delete',
+                              lazy=db_loading)
     else:
         state_id = ""
         name = ""
+
+        @property
+        def places(self):
+            """getter for list of place instances related to the city"""
+            from models import storage
+            from models.place import Place
+
+            return storage.find(Place, "city_id", self.id)
@@ -4,17 +4,25 @@ Contains the class DBStorage
 """
 
 import models
+import threading
+import time
 from models.amenity import Amenity
 from models.base_model import BaseModel, Base
 from models.city import City
+from models.engine import pagination
+from models.engine.pool import TimedQueuePool
+from models.engine import unit_of_work
+from models.engine.unit_of_work import UnitOfWork
 from models.place import Place
 from models.review import Review
 from models.state import State
 from models.user import User
-from os import getenv
+from os import getenv, register_at_fork
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, func, insert, or_, \
+    select
+from sqlalchemy.orm import configure_mappers, joinedload, scoped_session, \
+    selectinload, sessionmaker
 
 classes = {
     "Amenity": Amenity,
@@ -34,25 +42,78 @@ class DBStorage:
 
     def __init__(self):
         """Instantiate a DBStorage object"""
+        HBNB_ENV = getenv('HBNB_ENV')
+        self.__engine = self._create_engine()
+        # seconds the counts of count() are reused, 0 to count every time
+        self.__count_ttl = float(getenv('HBNB_COUNT_CACHE_TTL', '0'))
+        self.__counts = None
+        self.__counted_at = 0.0
+        # incremented by new() and delete() to drop the counts
+        self.__count_version = 0
+        self.__counts_lock = threading.Lock()
+        # the units of work of each thread, see begin()
+        self.__unit = UnitOfWork()
+        if HBNB_ENV == "test":
+            Base.metadata.drop_all(self.__engine)
+        register_at_fork(after_in_child=self.__after_fork)
+
+    def _create_engine(self):
+        """returns the engine of the MySQL database"""
         HBNB_MYSQL_USER = getenv('HBNB_MYSQL_USER')
         HBNB_MYSQL_PWD = getenv('HBNB_MYSQL_PWD')
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
-        HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine(
+        return create_engine(
             'mysql+mysqldb://{}:{}@{}/{}'.format(
                 HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST, HBNB_MYSQL_DB
-            )
+            ),
+            **self._pool_options('HBNB_MYSQL')
         )
-        if HBNB_ENV == "test":
-            Base.metadata.drop_all(self.__engine)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    @staticmethod
+    def _pool_options(prefix, size=5, overflow=10, recycle=3600,
+                      pre_ping='1'):
+        """returns the arguments of create_engine() for the pool
+
+        Each one can be set with an environment variable: <prefix>_POOL_SIZE,
+        <prefix>_MAX_OVERFLOW, <prefix>_POOL_TIMEOUT (seconds to wait for a
+        connection), <prefix>_POOL_RECYCLE (seconds after which a connection
+        is replaced) and <prefix>_POOL_PRE_PING (1 to test connections when
+        they are checked out).
+        """
+        return {
+            'poolclass': TimedQueuePool,
+            'pool_size': int(getenv(prefix + '_POOL_SIZE', size)),
+            'max_overflow': int(getenv(prefix + '_MAX_OVERFLOW', overflow)),
+            'pool_timeout': float(getenv(prefix + '_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(getenv(prefix + '_POOL_RECYCLE', recycle)),
+            'pool_pre_ping':
+                getenv(prefix + '_POOL_PRE_PING', pre_ping) == '1',
+        }
+
+    def pool_stats(self):
+        """returns the statistics of the connection pool"""
+        pool = self.__engine.pool
+        if hasattr(pool, 'stats'):
+            return pool.stats()
+        return {}
+
+    def __after_fork(self):
+        """drops the connections inherited from the parent process"""
+        self.__engine.dispose(close=False)
+
+    def all(self, cls=None, load=()):
+        """query on the current database session
+
+        load names the relationships to load with the objects, see
+        _load_options(), for the views which go through them.
+        """
         new_dict = {}
         for clss in classes:
             if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
+                objs = self.__session.query(classes[clss]).options(
+                    *self._load_options(classes[clss], load)
+                ).all()
                 for obj in objs:
                     key = obj.__class__.__name__ + '.' + obj.id
                     new_dict[key] = obj
@@ -61,49 +122,297 @@ class DBStorage:
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
+        self.__count_version += 1
+
+    def new_all(self, objs):
+        """inserts objs in the current database session, in bulk
+
+        The objects of each class are inserted by a single executemany
+        INSERT, without going through the unit of work of the session:
+        they are not tracked by it afterwards, and their relationships are
+        not inserted. The columns left to None get their defaults.
+        """
+        rows = {}
+        for obj in objs:
+            mapper = sqlalchemy.inspect(type(obj))
+            rows.setdefault(type(obj), []).append({
+                attr.key: getattr(obj, attr.key)
+                for attr in mapper.column_attrs
+                if getattr(obj, attr.key) is not None
+            })
+        for cls, values in rows.items():
+            self.__session.execute(insert(cls), values)
+        self.__count_version += len(objs)
+
+    def touch(self, obj, name=None, previous=None):
+        """nothing to do, the session tracks changes to its objects"""
+
+    def dirty(self):
+        """returns the objects added, changed or deleted in the session
+
+        Returns:
+            dict: The objects by <class name>.id, None for deleted ones.
+        """
+        objs = {}
+        for obj in list(self.__session.new) + list(self.__session.dirty):
+            objs[obj.__class__.__name__ + '.' + obj.id] = obj
+        for obj in self.__session.deleted:
+            objs[obj.__class__.__name__ + '.' + obj.id] = None
+        return objs
 
     def save(self):
-        """commit all changes of the current database session"""
-        self.__session.commit()
+        """commit all changes of the current database session
+
+        In a unit of work, see begin(), the commit waits for commit().
+        """
+        if not self.__unit.defer():
+            self.__session.commit()
+
+    def begin(self):
+        """opens a unit of work in the current thread
+
+        Until the unit is committed or rolled back, the save() calls of the
+        thread, and those of delete(), are deferred so that the session is
+        committed once, with every change of the unit or none. A unit
+        opened in another one is a SAVEPOINT of the session.
+        """
+        savepoint = None
+        if self.__unit.active:
+            savepoint = self.__session.begin_nested()
+        self.__unit.begin(savepoint)
+
+    def commit(self):
+        """closes the innermost unit of work, committing if outermost
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        saves, savepoint = self.__unit.commit()
+        if savepoint is not None:
+            savepoint.commit()
+        elif saves:
+            self.__session.commit()
+
+    def rollback(self):
+        """closes the innermost unit of work, undoing its changes
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        _, savepoint = self.__unit.rollback()
+        if savepoint is not None:
+            # the objects kept by get() may be gone with the savepoint
+            self.__session.info.pop('objects', None)
+            savepoint.rollback()
+        else:
+            self.__session.rollback()
+
+    def transaction(self):
+        """returns a context manager running its block in a unit of work
+
+        The unit is committed if the block completes and rolled back if it
+        raises, see begin().
+        """
+        return unit_of_work.transaction(self)
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
-            self.__session.delete(obj)
+            self.__session.info.get('objects', {}).pop(
+                obj.__class__.__name__ + '.' + obj.id, None
+            )
+            if obj in self.__session.new:
+                # added since the last commit, in a unit of work
+                self.__session.expunge(obj)
+            else:
+                self.__session.delete(obj)
+            self.__count_version += 1
             self.save()
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+
+        @event.listens_for(sess_factory, 'after_rollback')
+        def forget(session):
+            """drops the objects kept by get(), they may not exist"""
+            session.info.pop('objects', None)
         Session = scoped_session(sess_factory)
         self.__session = Session
 
     def close(self):
-        """call remove() method on the private session attribute"""
+        """call remove() method on the private session attribute
+
+        The objects kept by get() go with the session.
+        """
         self.__session.remove()
 
-    def get(self, cls, id):
+    def get(self, cls, id, load=()):
         """
         Retrieves a single model object from the database.
 
+        The object is looked up by its primary key in the session first,
+        and kept until close(), so that getting it again during a request
+        does not query the database.
+
         Args:
             cls (class | str): The class name
             id (str): The object id
+            load (tuple): The relationships to load, see _load_options()
 
         Returns:
             object: The model object if found, otherwise None.
         """
-        if not id or not cls:
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if not id or cls not in classes.values() or not self.__session:
             return
-        for clss in classes:
-            if cls is classes[clss] or cls == clss:
-                if self.__session:
-                    return (
-                        self.__session.query(classes[clss])
-                        .filter_by(id=id)
-                        .first()
-                    )
+        key = cls.__name__ + '.' + str(id)
+        objs = self.__session.info.setdefault('objects', {})
+        obj = objs.get(key)
+        if obj is None:
+            obj = self.__session.get(
+                cls, id, options=self._load_options(cls, load)
+            )
+            if obj is not None:
+                objs[key] = obj
+        return obj
+
+    def paginate(self, cls, limit, cursor=None, **filters):
+        """
+        Retrieves a page of the objects of a class, by (created_at, id).
+
+        The database starts the page after the cursor with the index of
+        created_at, so a page costs the same wherever it is.
+
+        Args:
+            cls (class | str): The class name
+            limit (int): The greatest number of objects of the page
+            cursor (str): The cursor of the previous page, None for the
+                first one
+            **filters: The values of the columns of the objects
+
+        Returns:
+            tuple: The objects of the page, and the cursor of the next one
+            or None if it is the last page.
+
+        Raises:
+            ValueError: If cursor is not valid.
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return [], None
+        query = self.__session.query(cls).filter_by(**filters)
+        if cursor:
+            created_at, obj_id = pagination.decode_cursor(cursor)
+            query = query.filter(or_(
+                cls.created_at > created_at,
+                and_(cls.created_at == created_at, cls.id > obj_id),
+            ))
+        objs = query.order_by(cls.created_at, cls.id).limit(limit + 1).all()
+        if len(objs) > limit:
+            return objs[:limit], pagination.encode_cursor(objs[limit - 1])
+        return objs, None
+
+    def export(self, cls, cursor=None, **filters):
+        """
+        Retrieves every object of a class after a cursor, by (created_at, id).
+
+        The objects are queried page by page with paginate(), so that the
+        session does not load them all at once.
+
+        Args:
+            cls (class | str): The class name
+            cursor (str): The cursor of a page, None for every object
+            **filters: The values of the columns of the objects
+
+        Returns:
+            iterator: The objects after the cursor.
+
+        Raises:
+            ValueError: If cursor is not valid.
+        """
+        return pagination.pages(self.paginate, cls, cursor, **filters)
+
+    def find(self, cls, attribute, value):
+        """
+        Retrieves the objects of a class with a value of a column.
+
+        Args:
+            cls (class | str): The class name
+            attribute (str): The name of the column
+            value: The value of the column
+
+        Returns:
+            list: The objects found, by creation.
+        """
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls not in classes.values():
+            return []
+        return (
+            self.__session.query(cls)
+            .filter(getattr(cls, attribute) == value)
+            .order_by(cls.created_at, cls.id)
+            .all()
+        )
+
+    def search_places(self, city_ids=None, amenity_ids=()):
+        """
+        Retrieves the places of some cities which have some amenities.
+
+        The database finds them in one query, with the indexes of
+        places.city_id and of place_amenity.
+
+        Args:
+            city_ids (iterable): The ids of the cities, None for any city
+            amenity_ids (iterable): The ids of the amenities every place
+                must have
+
+        Returns:
+            list: The places found.
+        """
+        query = self.__session.query(Place)
+        if city_ids is not None:
+            query = query.filter(Place.city_id.in_(set(city_ids)))
+        amenity_ids = set(amenity_ids)
+        if amenity_ids:
+            place_amenity = Base.metadata.tables['place_amenity']
+            query = query.filter(Place.id.in_(
+                select(place_amenity.c.place_id)
+                .where(place_amenity.c.amenity_id.in_(amenity_ids))
+                .group_by(place_amenity.c.place_id)
+                .having(func.count() == len(amenity_ids))
+            ))
+        return query.all()
+
+    @staticmethod
+    def _load_options(cls, load):
+        """returns the options of a query of cls loading the relationships
+
+        Each relationship of load is a path from cls, like "cities" or
+        "places.reviews", and is loaded by one more query for all the
+        objects (selectin), or in the same query when HBNB_DB_LOADING is
+        joined, instead of one query for each object when it is used.
+        """
+        loader = joinedload if models.db_loading == 'joined' else selectinload
+        options = []
+        if load:
+            # the backrefs, like Place.user, only exist once configured
+            configure_mappers()
+        for path in load:
+            option, owner = None, cls
+            for name in path.split('.'):
+                attr = getattr(owner, name)
+                if option is None:
+                    option = loader(attr)
+                else:
+                    option = getattr(option, loader.__name__)(attr)
+                owner = attr.property.mapper.class_
+            options.append(option)
+        return options
 
     def count(self, cls=None):
         """
@@ -115,6 +424,40 @@ class DBStorage:
                 objects from all registered model classes.
 
         Returns:
-            int: The number of objects in storage.
+            int: The number of objects in storage, counted by the database
+            in a single query. With HBNB_COUNT_CACHE_TTL, the counts are
+            reused for that many seconds.
+        """
+        names = [
+            clss for clss in classes
+            if cls is None or cls is classes[clss] or cls == clss
+        ]
+        if not names:
+            return 0
+        if self.__count_ttl:
+            counts = self.__cached_counts()
+        else:
+            counts = self.__count_rows(names)
+        return sum(counts[name] for name in names)
+
+    def __count_rows(self, names):
+        """returns the number of rows of each class in names, in one query"""
+        row = self.__session.execute(select(*[
+            select(func.count()).select_from(classes[name]).scalar_subquery()
+            for name in names
+        ])).one()
+        return dict(zip(names, row))
+
+    def __cached_counts(self):
+        """returns the counts of every class, queried at most every TTL
+
+        new() and delete() drop the counts, so that the changes of this
+        process are seen at once, and the others after the TTL.
         """
-        return len(self.all(cls))
+        with self.__counts_lock:
+            version = self.__count_version
+            if self.__counts is None or self.__counts[0] != version or \
+                    time.monotonic() - self.__counted_at > self.__count_ttl:
+                self.__counts = (version, self.__count_rows(list(classes)))
+                self.__counted_at = time.monotonic()
+            return self.__counts[1]
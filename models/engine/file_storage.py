@@ -3,10 +3,22 @@
 Contains the FileStorage class
 """
 
+import bisect
+from contextlib import contextmanager
+import fcntl
 import json
+import os
+import struct
+import threading
+import time
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
+from models.engine import pagination
+from models.engine.rwlock import ReadWriteLock
+from models.engine.serializers import formats, iter_records
+from models.engine import unit_of_work
+from models.engine.unit_of_work import Holds, UnitOfWork
 from models.place import Place
 from models.review import Review
 from models.state import State
@@ -26,76 +38,1038 @@ classes = {
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
-    # string - path to the JSON file
-    __file_path = "file.json"
+    # serializer - the format of the file, HBNB_FILE_FORMAT: json or binary
+    __format = formats[os.getenv("HBNB_FILE_FORMAT", "json")]
+    # string - path to the JSON file, file.bin in the binary format
+    __file_path = "file" + __format.extension
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - the same objects grouped as {<class name>: {id: obj}}
+    __index = {}
+    # boolean - keep the records read by reload() as dictionaries and only
+    # instantiate them when they are first accessed
+    __lazy = os.getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - records not instantiated yet as {<class name>: {id: dict}}
+    __raw = {}
+    # tuple - stats of the JSON file and its journal when last read or written
+    __file_stat = None
+    # integer - reload() calls skipped because the file had not changed
+    __skipped_reloads = 0
+    # boolean - append changes to a journal instead of rewriting the file
+    __journal = os.getenv("HBNB_FILE_JOURNAL") == "1"
+    # integer - journal entries after which the journal is compacted
+    __compact_every = int(os.getenv("HBNB_FILE_COMPACT_EVERY", "1000"))
+    # integer - entries appended to the journal since the last compaction
+    __journal_entries = 0
+    # dictionary - objects changed since the last save by <class name>.id,
+    # None for the objects that were deleted
+    __changes = {}
+    # dictionary - the changes being written by save(), which reload() must
+    # not undo before they are on disk
+    __unwritten = {}
+    # dictionary - (object, encoded object) of the objects as they were
+    # last written, reused by save() for the objects left unchanged
+    __serialized = {}
+    # lock - guards __objects, __index and __changes: many threads may read
+    # them at once but a single thread may change them
+    __rwlock = ReadWriteLock()
+    # lock - serializes writes to the journal and its rotation
+    __lock = threading.Lock()
+    # lock - held by the thread compacting the journal
+    __compacting = threading.Lock()
+    # lock - held while the journal is rotated and folded into the JSON file,
+    # and while reload() reads the files, so that it never reads them in
+    # between
+    __folding = threading.Lock()
+    # string - when to fsync written files: "always", "never" or at most
+    # once every given number of milliseconds
+    __fsync = os.getenv("HBNB_FILE_FSYNC", "always")
+    # float - time.monotonic() of the last fsync
+    __synced_at = 0.0
+    # Timer - pending fsync when the last one was too recent
+    __sync_timer = None
+    # float - seconds a save() waits for concurrent saves to join its write
+    __commit_window = float(os.getenv("HBNB_FILE_COMMIT_WINDOW", "0")) / 1000
+    # condition - coordinates the save() calls of concurrent threads
+    __commit = threading.Condition()
+    # integer - save() calls so far, and how many of them are on disk
+    __requested = 0
+    __written = 0
+    # boolean - a thread is writing on behalf of the pending save() calls
+    __writing = False
+    # integer - writes made by save(), each covering one or more calls
+    __disk_writes = 0
+    # boolean - other processes read and write the same files: their writes
+    # are serialized by a lock file holding a generation counter, which each
+    # write increments so that reload() sees it
+    __shared = os.getenv("HBNB_FILE_SHARED") == "1"
+    # integer - bytes of the journal already read or written
+    __journal_offset = 0
+    # dictionary - the attributes indexed by value for each class name, the
+    # values of a list attribute are indexed one by one
+    __indexed = {
+        "City": ("state_id",),
+        "Place": ("city_id", "user_id", "amenity_ids"),
+        "Review": ("place_id", "user_id"),
+    }
+    # dictionary - ids of the objects by value of an indexed attribute, as
+    # {(<class name>, attribute): {value: set of ids}}
+    __refs = {}
+    # dictionary - the values each object is indexed under by <class
+    # name>.id, as ((attribute, values), ...)
+    __ref_values = {}
+    # dictionary - the (created_at, id) positions of the objects and
+    # records of a class, sorted, with the position of each id, as
+    # {<class name>: (list, {id: position})}, made by paginate()
+    __order = {}
+    # UnitOfWork - the units of work of each thread, see begin()
+    __unit = UnitOfWork()
+    # Holds - the keys changed in the open units of every thread, written
+    # as they were before until the units are committed
+    __holds = Holds()
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name of cls, which is a class or a string"""
+        return cls if isinstance(cls, str) else getattr(cls, "__name__", None)
+
+    @staticmethod
+    def __stat(path):
+        """returns the (inode, size, mtime) of path, None if missing"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def __stats(self):
+        """returns the stats of the JSON file and of its journals
+
+        The generation of the lock file is added when the files are shared.
+        """
+        journal = self.__file_path + ".journal"
+        stats = (
+            self.__stat(self.__file_path),
+            self.__stat(journal + ".old"),
+            self.__stat(journal),
+        )
+        if self.__shared:
+            try:
+                with open(self.__file_path + ".lock", 'rb') as f:
+                    data = f.read(8)
+            except IOError:
+                data = b""
+            stats += (struct.unpack("<Q", data)[0] if len(data) == 8 else 0,)
+        return stats
+
+    @contextmanager
+    def __file_lock(self, flag):
+        """holds the lock file with flag when the files are shared
+
+        Yields:
+            int: The descriptor of the lock file, None if not shared.
+        """
+        if not self.__shared:
+            yield None
+            return
+        fd = os.open(self.__file_path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, flag)
+            yield fd
+        finally:
+            os.close(fd)
+
+    @contextmanager
+    def __exclusive(self):
+        """lets a single process write the files
+
+        The writes of the other processes are read first, so that they are
+        not overwritten, and the generation is incremented before writing.
+        """
+        with self.__file_lock(fcntl.LOCK_EX) as fd:
+            if fd is not None:
+                with self.__rwlock.writing():
+                    if self.__stats() != self.__file_stat:
+                        self.__read()
+                data = os.pread(fd, 8, 0)
+                generation = struct.unpack("<Q", data)[0] if data else 0
+                os.pwrite(fd, struct.pack("<Q", generation + 1), 0)
+            yield
+
+    def __add(self, obj):
+        """puts obj in __objects and in the class index"""
+        name = obj.__class__.__name__
+        self.__objects[name + "." + obj.id] = obj
+        self.__index.setdefault(name, {})[obj.id] = obj
+        self.__raw.get(name, {}).pop(obj.id, None)
+        self.__link(name, obj.id, obj)
+        self.__place(name, obj.id, pagination.sort_key(obj))
+
+    def __place(self, name, obj_id, position):
+        """moves obj_id to position in the order of name, if it is made"""
+        order = self.__order.get(name)
+        if order is None:
+            return
+        positions, by_id = order
+        previous = by_id.get(obj_id)
+        if previous == position:
+            return
+        if previous is not None:
+            del positions[bisect.bisect_left(positions, previous)]
+        bisect.insort(positions, position)
+        by_id[obj_id] = position
+
+    def __displace(self, name, obj_id):
+        """removes obj_id from the order of name, if it is made"""
+        order = self.__order.get(name)
+        if order is not None:
+            previous = order[1].pop(obj_id, None)
+            if previous is not None:
+                del order[0][bisect.bisect_left(order[0], previous)]
+
+    def __sorted(self, name):
+        """returns the sorted positions of the objects of name
+
+        The order is made on the first call, then kept by __add() and
+        __remove().
+        """
+        order = self.__order.get(name)
+        if order is None:
+            with self.__rwlock.writing():
+                order = self.__order.get(name)
+                if order is None:
+                    by_id = {
+                        obj_id: pagination.sort_key(obj)
+                        for obj_id, obj in self.__index.get(name, {}).items()
+                    }
+                    by_id.update(
+                        (obj_id, pagination.record_key(record))
+                        for obj_id, record in self.__raw.get(name, {}).items()
+                    )
+                    order = (sorted(by_id.values()), by_id)
+                    self.__order[name] = order
+        return order[0]
+
+    def __link(self, name, obj_id, obj):
+        """indexes the object or record obj by its indexed attributes"""
+        key = name + "." + obj_id
+        self.__unlink(key)
+        attributes = self.__indexed.get(name)
+        if not attributes:
+            return
+        indexed = []
+        for attribute in attributes:
+            if isinstance(obj, dict):
+                value = obj.get(attribute)
+            else:
+                value = getattr(obj, attribute, None)
+            values = tuple(value) if isinstance(value, list) else (value,)
+            refs = self.__refs.setdefault((name, attribute), {})
+            for value in values:
+                refs.setdefault(value, set()).add(obj_id)
+            indexed.append((attribute, values))
+        self.__ref_values[key] = tuple(indexed)
+
+    def __unlink(self, key):
+        """removes the object stored under key from the indexes"""
+        indexed = self.__ref_values.pop(key, None)
+        if indexed is None:
+            return
+        name, _, obj_id = key.partition(".")
+        for attribute, values in indexed:
+            refs = self.__refs.get((name, attribute), {})
+            for value in values:
+                ids = refs.get(value)
+                if ids is not None:
+                    ids.discard(obj_id)
+                    if not ids:
+                        del refs[value]
+
+    def __find(self, name, attribute, values):
+        """returns the ids of the objects of name with attribute in values"""
+        with self.__rwlock.reading():
+            refs = self.__refs.get((name, attribute), {})
+            ids = set()
+            for value in values:
+                ids.update(refs.get(value, ()))
+            return ids
+
+    def __remove(self, key):
+        """removes the object stored under key, returns True if it was in"""
+        name, _, obj_id = key.partition(".")
+        self.__unlink(key)
+        self.__displace(name, obj_id)
+        if self.__raw.get(name, {}).pop(obj_id, None) is not None:
+            return True
+        obj = self.__objects.pop(key, None)
+        if obj is None:
+            return False
+        self.__index.get(name, {}).pop(obj_id, None)
+        return True
+
+    def __put(self, key, record):
+        """stores the object of the record read from the files under key"""
+        if self.__lazy:
+            self.__remove(key)
+            name, _, obj_id = key.partition(".")
+            self.__raw.setdefault(name, {})[obj_id] = record
+            self.__link(name, obj_id, record)
+            self.__place(name, obj_id, pagination.record_key(record))
+        else:
+            obj = classes[record["__class__"]](**record)
+            obj._dirty = False
+            self.__add(obj)
+
+    def __hydrate(self, name, obj_id=None):
+        """instantiates the records of class name, or only the one of obj_id
+
+        Returns:
+            object: The object of obj_id, if given and found.
+        """
+        with self.__rwlock.writing():
+            records = self.__raw.get(name, {})
+            ids = list(records) if obj_id is None else [obj_id]
+            for record_id in ids:
+                record = records.get(record_id)
+                if record is not None:
+                    obj = classes[record["__class__"]](**record)
+                    obj._dirty = False
+                    self.__add(obj)
+            if obj_id is not None:
+                return self.__index.get(name, {}).get(obj_id)
+
+    def __records(self):
+        """yields (key, dictionary) from the JSON file then its journals
+
+        The file, in any format, is parsed incrementally, one object at a
+        time. Deletions found in the journals are yielded as (key, None).
+        """
+        try:
+            with open(self.__file_path, 'rb') as f:
+                yield from iter_records(f)
+        except IOError:
+            pass
+        journal = self.__file_path + ".journal"
+        yield from self.__journal_records(journal + ".old")
+        FileStorage.__journal_offset = 0
+        yield from self.__journal_records(journal)
+
+    def __journal_records(self, path, offset=0):
+        """yields (key, dictionary) from the entries of a journal
+
+        The entries are read from offset on and __journal_offset is moved
+        past each one read, so that reload() can go on from there when
+        only entries were appended since.
+        """
+        try:
+            f = open(path, 'rb')
+        except IOError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete entry")
+                    entry = json.loads(line)
+                except ValueError:
+                    # an entry cut short by a crash while it was written
+                    break
+                FileStorage.__journal_offset += len(line)
+                yield entry["key"], entry.get("obj")
+
+    def __held(self, key):
+        """returns the record of a key held by a unit of work, see Holds
+
+        The record is the one of the key before the unit changed it, None
+        if the key had no object.
+        """
+        stored, attributes = self.__holds.get(key)[:2]
+        if stored is None or isinstance(stored, dict):
+            return stored
+        return unit_of_work.copy(stored, attributes).to_dict()
+
+    def __take_changes(self):
+        """returns the changes since the last save and starts a new record
+
+        The keys held by a unit of work stay in the new record, and the
+        ones changed before the unit are taken as they were then.
+        """
+        with self.__rwlock.writing():
+            changes = self.__changes
+            held = [key for key in changes if key in self.__holds]
+            FileStorage.__changes = {key: changes.pop(key) for key in held}
+            for key in held:
+                if self.__holds.get(key)[2]:
+                    changes[key] = self.__held(key)
+            FileStorage.__unwritten = changes
+            for key, obj in changes.items():
+                if obj is None or isinstance(obj, dict):
+                    continue
+                name = obj.__class__.__name__
+                if key in self.__ref_values:
+                    self.__link(name, obj.id, obj)
+                # created_at may have changed after the first change
+                self.__place(name, obj.id, pagination.sort_key(obj))
+        return changes
+
+    def __dump(self, changes):
+        """returns the content of the file, encoded by __format
+
+        Only the objects in changes or never written are passed to to_dict()
+        again, the others are taken from __serialized. The keys held by a
+        unit of work are written as they were before it.
+        """
+        serialized = {}
+        with self.__rwlock.reading():
+            for key, obj in self.__objects.items():
+                if key in self.__holds:
+                    continue
+                entry = self.__serialized.get(key)
+                if entry is None or entry[0] is not obj or key in changes:
+                    obj._dirty = False
+                    entry = (obj, self.__format.encode(key, obj.to_dict()))
+                serialized[key] = entry
+            for name, records in self.__raw.items():
+                for obj_id, record in records.items():
+                    key = name + "." + obj_id
+                    if key in self.__holds:
+                        continue
+                    entry = self.__serialized.get(key)
+                    if entry is None or entry[0] is not record:
+                        entry = (record, self.__format.encode(key, record))
+                    serialized[key] = entry
+            for key in self.__holds.entries:
+                record = self.__held(key)
+                if record is not None:
+                    serialized[key] = (
+                        record, self.__format.encode(key, record)
+                    )
+        FileStorage.__serialized = serialized
+        return self.__format.join(entry[1] for entry in serialized.values())
+
+    def all(self, cls=None, load=()):
+        """returns the dictionary __objects
+
+        With cls, returns a new dictionary of the objects of that class.
+        Without, __objects itself is returned: other threads may change it
+        while it is iterated, and it must only be changed through new() and
+        delete(). Records not instantiated yet are instantiated first.
+        load is ignored, the related objects are already in memory.
+        """
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = self.__class_name(cls)
+            if self.__raw.get(name):
+                self.__hydrate(name)
+            with self.__rwlock.reading():
+                return {
+                    name + "." + obj_id: obj
+                    for obj_id, obj in self.__index.get(name, {}).items()
+                }
+        for name in list(self.__raw):
+            if self.__raw[name]:
+                self.__hydrate(name)
         return self.__objects
 
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            self.new_all((obj,))
+
+    def new_all(self, objs):
+        """sets in __objects every object of objs, see new()
+
+        The lock is taken once for all of them.
+        """
+        with self.__rwlock.writing():
+            for obj in objs:
+                key = obj.__class__.__name__ + "." + obj.id
+                self.__before(key)
+                self.__add(obj)
+                obj._dirty = True
+                self.__changes[key] = obj
+
+    def touch(self, obj, name=None, previous=None):
+        """records that obj, if it is stored, changed since the last save
+
+        name is the attribute which changed and previous holds its value
+        before the change, if it had one, for the undo log of a unit of
+        work.
+        """
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", ""))
+        if self.__objects.get(key) is not obj:
+            # not stored, such as an object being built
+            return
+        with self.__rwlock.writing():
+            if self.__objects.get(key) is obj:
+                self.__before(key, name, previous)
+                self.__changes[key] = obj
+                if key in self.__ref_values:
+                    self.__link(obj.__class__.__name__, obj.id, obj)
+                if name == "created_at":
+                    self.__place(obj.__class__.__name__, obj.id,
+                                 pagination.sort_key(obj))
+
+    def dirty(self):
+        """returns the objects changed since the last save
+
+        Returns:
+            dict: The objects by <class name>.id, None for deleted ones.
+        """
+        with self.__rwlock.reading():
+            return dict(self.__changes)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects:
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f)
+        """serializes __objects to the JSON file (path: __file_path)
 
-    def reload(self):
-        """deserializes the JSON file to __objects"""
+        With HBNB_FILE_JOURNAL=1 only the objects changed since the last
+        save are appended to the journal, one JSON line each, and the
+        journal is folded back into the JSON file in the background every
+        HBNB_FILE_COMPACT_EVERY entries.
+
+        Concurrent calls are committed together: one thread writes while
+        the others wait, and a single write covers every call made before
+        it started. HBNB_FILE_COMMIT_WINDOW milliseconds can be spent
+        waiting for more calls to join.
+
+        In a unit of work, see begin(), the save waits for commit().
+        """
+        if not self.__unit.defer():
+            self.__save()
+
+    def __save(self):
+        """writes the changes, together with the concurrent save() calls"""
+        with self.__commit:
+            FileStorage.__requested += 1
+            ticket = self.__requested
+            while self.__writing and self.__written < ticket:
+                self.__commit.wait()
+            if self.__written >= ticket:
+                return
+            FileStorage.__writing = True
+        covered = self.__written
         try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except IOError:
+            if self.__commit_window:
+                time.sleep(self.__commit_window)
+            with self.__commit:
+                covered = self.__requested
+            self.__write()
+            FileStorage.__disk_writes += 1
+        finally:
+            with self.__commit:
+                FileStorage.__writing = False
+                FileStorage.__written = max(self.__written, covered)
+                self.__commit.notify_all()
+
+    def __write(self):
+        """writes the pending changes to the journal or the JSON file"""
+        try:
+            if self.__journal:
+                self.__append()
+                return
+            with self.__lock, self.__exclusive():
+                data = self.__dump(self.__take_changes())
+                self.__replace(self.__file_path, data)
+                journal = self.__file_path + ".journal"
+                for path in (journal + ".old", journal):
+                    if os.path.exists(path):
+                        os.remove(path)
+                FileStorage.__file_stat = self.__stats()
+        finally:
+            with self.__rwlock.writing():
+                FileStorage.__unwritten = {}
+
+    def __append(self):
+        """appends the changes since the last save to the journal"""
+        with self.__lock, self.__exclusive():
+            changes = self.__take_changes()
+            if not changes:
+                return
+            lines = []
+            for key, obj in changes.items():
+                if obj is None:
+                    self.__serialized.pop(key, None)
+                    entry = {"op": "delete", "key": key}
+                    lines.append(json.dumps(entry) + "\n")
+                    continue
+                if isinstance(obj, dict):
+                    obj_dict = obj
+                else:
+                    obj._dirty = False
+                    obj_dict = obj.to_dict()
+                self.__serialized[key] = (
+                    obj, self.__format.encode(key, obj_dict)
+                )
+                entry = {"op": "set", "key": key, "obj": obj_dict}
+                lines.append(json.dumps(entry) + "\n")
+            with open(self.__file_path + ".journal", 'ab') as f:
+                f.write("".join(lines).encode("utf-8"))
+                self.__sync(f)
+                FileStorage.__journal_offset = f.tell()
+            FileStorage.__journal_entries += len(lines)
+            FileStorage.__file_stat = self.__stats()
+            if self.__journal_entries < self.__compact_every:
+                return
+        if not self.__compacting.locked():
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def compact(self):
+        """writes every object to the JSON file and drops the journal
+
+        The journal is first renamed to <journal>.old so that saves can go
+        on while the JSON file is written; reload() replays the old journal
+        if the process stops before the compaction completes. When the
+        files are shared, other processes wait for the whole compaction,
+        and reload() waits for it in this process.
+        """
+        with self.__compacting, self.__folding:
+            with self.__lock, self.__exclusive():
+                journal = self.__file_path + ".journal"
+                if os.path.exists(journal):
+                    os.replace(journal, journal + ".old")
+                FileStorage.__journal_entries = 0
+                FileStorage.__journal_offset = 0
+                data = self.__dump(self.__changes)
+                if self.__shared:
+                    self.__fold(data)
+                    return
+            self.__fold(data)
+
+    def __fold(self, data):
+        """replaces the JSON file with data and drops the old journal"""
+        journal = self.__file_path + ".journal"
+        self.__replace(self.__file_path, data)
+        if os.path.exists(journal + ".old"):
+            os.remove(journal + ".old")
+        FileStorage.__file_stat = self.__stats()
+
+    def __replace(self, path, data):
+        """atomically replaces the content of path with the bytes data
+
+        data goes to a temporary file renamed over path, so a crash leaves
+        either the old or the new content, never a truncated file. The
+        temporary file is always synced before the rename, unless fsync is
+        "never": an interval only delays the fsync of the directory.
+        """
+        with open(path + ".tmp", 'wb') as f:
+            f.write(data)
+            if self.__fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        if self.__due():
+            self.__sync_dir()
+
+    def __due(self):
+        """returns True if an fsync is to be made now, see __sync()
+
+        When the last one was too recent, it is scheduled instead.
+        """
+        if self.__fsync == "never":
+            return False
+        if self.__fsync != "always":
+            interval = float(self.__fsync) / 1000
+            delay = self.__synced_at + interval - time.monotonic()
+            if delay > 0:
+                self.__sync_later(delay)
+                return False
+        FileStorage.__synced_at = time.monotonic()
+        return True
+
+    def __sync(self, f):
+        """flushes the open file f to disk according to HBNB_FILE_FSYNC"""
+        if self.__fsync == "never":
+            return
+        f.flush()
+        if self.__due():
+            os.fsync(f.fileno())
+
+    def __sync_dir(self):
+        """fsyncs the directory of the JSON file, so that renames persist"""
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.__file_path)),
+                         0)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError:
             pass
 
+    def __sync_later(self, delay):
+        """fsyncs the journal and the directory in delay seconds"""
+        timer = self.__sync_timer
+        if timer is not None and timer.is_alive():
+            return
+
+        def sync():
+            """fsyncs the journal, if it exists, and the directory"""
+            try:
+                with open(self.__file_path + ".journal", 'rb') as f:
+                    os.fsync(f.fileno())
+            except OSError:
+                pass
+            self.__sync_dir()
+            FileStorage.__synced_at = time.monotonic()
+        timer = threading.Timer(delay, sync)
+        timer.daemon = True
+        FileStorage.__sync_timer = timer
+        timer.start()
+
+    def reload(self):
+        """deserializes the JSON file and its journal to __objects
+
+        The files are only parsed again when their inode, size or mtime
+        changed since they were last read or written by this process. Each
+        object is instantiated as soon as it is read, so the parsed file
+        is never held in memory as a whole.
+
+        With HBNB_FILE_LAZY=1 the records are only indexed, and get() and
+        all() instantiate them when they are first accessed.
+
+        With HBNB_FILE_SHARED=1 the objects saved by other processes since
+        the last reload() are read, without the ones changed here and not
+        saved yet. When only the journal grew, only the new entries are.
+        """
+        file_stat = self.__stats()
+        if any(file_stat) and file_stat == self.__file_stat:
+            FileStorage.__skipped_reloads += 1
+            return
+        with self.__folding, self.__file_lock(fcntl.LOCK_SH), \
+                self.__rwlock.writing():
+            self.__read()
+
+    def __read(self):
+        """reads the files changed since __file_stat into __objects"""
+        file_stat = self.__stats()
+        previous = self.__file_stat or (None,) * len(file_stat)
+        if previous[:2] == file_stat[:2] and previous[2] and file_stat[2] \
+                and previous[2][0] == file_stat[2][0]:
+            # same JSON file and same journal, which may only have grown
+            seen = None
+            records = self.__journal_records(
+                self.__file_path + ".journal", self.__journal_offset
+            )
+        else:
+            seen = set()
+            records = self.__records()
+            # made again by paginate() rather than kept record by record
+            FileStorage.__order = {}
+        FileStorage.__file_stat = file_stat
+        for key, record in records:
+            if seen is not None:
+                seen.add(key)
+            if key in self.__changes or key in self.__unwritten:
+                # changed here since: save() writes it over
+                continue
+            if record is None:
+                self.__remove(key)
+            else:
+                self.__put(key, record)
+        if self.__shared and seen is not None and any(file_stat[:3]):
+            # deleted from the files by another process
+            stored = list(self.__objects) + [
+                name + "." + obj_id
+                for name, records in self.__raw.items()
+                for obj_id in records
+            ]
+            for key in stored:
+                if key not in seen and key not in self.__changes and \
+                        key not in self.__unwritten:
+                    self.__remove(key)
+
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
             key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            with self.__rwlock.writing():
+                self.__before(key)
+                removed = self.__remove(key)
+                if removed:
+                    obj._dirty = True
+                    self.__changes[key] = None
+            if removed:
                 self.save()
 
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
         self.reload()
 
-    def get(self, cls, id):
+    def begin(self):
+        """opens a unit of work in the current thread
+
+        Until the unit is committed or rolled back, the save() calls of the
+        thread, and those of delete(), are deferred so that the changes of
+        the unit are written at once. Each change is undone by rollback().
+        A unit opened in another one is a savepoint within it.
+
+        The objects are shared by the threads. Until the unit is committed
+        the save() of another thread writes the objects it changed as they
+        were before it, see Holds. The changes made to an object before
+        begin() and not saved yet are not undone.
+        """
+        with self.__rwlock.writing():
+            changed = self.__unit.keys()
+            self.__unit.begin()
+            for key in changed:
+                self.__before(key)
+
+    def commit(self):
+        """closes the innermost unit of work, writing once if outermost
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        keys = self.__unit.keys()
+        saves, _ = self.__unit.commit()
+        with self.__rwlock.writing():
+            self.__holds.release(keys - self.__unit.keys())
+        if saves:
+            self.__save()
+
+    def rollback(self):
+        """closes the innermost unit of work, undoing its changes
+
+        The objects are restored in memory from the undo log of the unit.
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        keys = self.__unit.keys()
+        undo, _ = self.__unit.rollback()
+        with self.__rwlock.writing():
+            for key, entry in undo.items():
+                self.__undo(key, *entry)
+            self.__holds.release(keys - self.__unit.keys())
+
+    def transaction(self):
+        """returns a context manager running its block in a unit of work
+
+        The unit is committed if the block completes and rolled back if it
+        raises, see begin().
+        """
+        return unit_of_work.transaction(self)
+
+    def __before(self, key, name=None, previous=None):
+        """records the undo entry of key before it changes, in a unit
+
+        The entry holds what is stored under key, an object or a record,
+        the attributes of the object, see unit_of_work.snapshot(), and
+        whether key was in __changes with its change.
+        """
+        if not self.__unit.tracks(key):
+            return
+        stored = self.__objects.get(key)
+        attributes = None
+        if stored is not None:
+            attributes = unit_of_work.snapshot(stored, name, previous)
+        else:
+            cls_name, _, obj_id = key.partition(".")
+            stored = self.__raw.get(cls_name, {}).get(obj_id)
+        entry = (
+            stored, attributes, key in self.__changes,
+            self.__changes.get(key)
+        )
+        self.__unit.record(key, entry)
+        self.__holds.hold(key, entry)
+
+    def __undo(self, key, stored, attributes, changed, change):
+        """restores key as recorded by __before()"""
+        # written since by the save() of another thread, to write again
+        written = key not in self.__changes
+        self.__remove(key)
+        if isinstance(stored, dict):
+            self.__put(key, stored)
+            if written:
+                name, _, obj_id = key.partition(".")
+                stored = self.__hydrate(name, obj_id)
+        elif stored is not None:
+            unit_of_work.restore(stored, attributes)
+            stored._dirty = changed
+            self.__add(stored)
+        if changed:
+            self.__changes[key] = change
+        elif written:
+            self.__changes[key] = stored
+        else:
+            self.__changes.pop(key, None)
+
+    def skipped_reloads(self):
+        """returns how many reloads were skipped since the process started"""
+        return self.__skipped_reloads
+
+    def get(self, cls, id, load=()):
         """
         Retrieve an object based on class name and id
 
         Args:
         -   cls (str | class): The class name.
         -   id (str): The object id.
+        -   load (tuple): Ignored, see all().
 
         Returns:
         -   object: The object if found, otherwise None.
         """
         if (cls in classes.values() or cls in classes) and id:
-            data = self.all(cls)
-            for key, value in data.items():
-                if key.split(".")[1] == id:
-                    return value
+            name = self.__class_name(cls)
+            with self.__rwlock.reading():
+                obj = self.__index.get(name, {}).get(id)
+                if obj is not None or id not in self.__raw.get(name, {}):
+                    return obj
+            return self.__hydrate(name, id)
 
     def count(self, cls=None):
         """
         Count the number of objects in storage
         """
-        return len(self.all(cls))
+        with self.__rwlock.reading():
+            if cls is None:
+                return len(self.__objects) + sum(
+                    len(records) for records in self.__raw.values()
+                )
+            name = self.__class_name(cls)
+            return len(self.__index.get(name, {})) + len(
+                self.__raw.get(name, {})
+            )
+
+    def paginate(self, cls, limit, cursor=None, **filters):
+        """
+        Retrieve a page of the objects of a class, by (created_at, id)
+
+        Args:
+        -   cls (str | class): The class name.
+        -   limit (int): The greatest number of objects of the page.
+        -   cursor (str): The cursor of the previous page, None for the
+            first one.
+        -   **filters: The values of the attributes of the objects, the
+            objects are taken from the index of an indexed one.
+
+        Without an indexed filter, the page starts at the cursor in the
+        sorted positions of the class, so its cost does not depend on the
+        number of objects before it.
+
+        Returns:
+        -   tuple: The objects of the page, and the cursor of the next one
+            or None if it is the last page.
+
+        Raises:
+        -   ValueError: If cursor is not valid.
+        """
+        name = self.__class_name(cls)
+        after = pagination.decode_cursor(cursor) if cursor else None
+        for attribute, value in filters.items():
+            if attribute in self.__indexed.get(name, ()):
+                objs = self.find(name, attribute, value)
+                return pagination.page(objs, limit, cursor, **filters)
+        return pagination.take(
+            self.__ordered(name, after, limit + 1), limit, **filters
+        )
+
+    def export(self, cls, cursor=None, **filters):
+        """
+        Retrieve every object of a class after a cursor, by (created_at, id)
+
+        Args:
+        -   cls (str | class): The class name.
+        -   cursor (str): The cursor of a page, None for every object.
+        -   **filters: The values of the attributes of the objects, the
+            objects are taken from the index of an indexed one.
+
+        Without an indexed filter, the objects are read from the sorted
+        positions of the class as the iterator is consumed.
+
+        Returns:
+        -   iterator: The objects after the cursor.
+
+        Raises:
+        -   ValueError: If cursor is not valid.
+        """
+        name = self.__class_name(cls)
+        after = pagination.decode_cursor(cursor) if cursor else None
+        objs = None
+        for attribute, value in filters.items():
+            if attribute in self.__indexed.get(name, ()):
+                objs = self.find(name, attribute, value)
+                break
+        if objs is None:
+            objs = self.__ordered(name, after, pagination.EXPORT_SIZE)
+        return (
+            obj for obj in objs
+            if (after is None or pagination.sort_key(obj) > after) and
+            pagination.matches(obj, filters)
+        )
+
+    def __ordered(self, name, after, size):
+        """yields the objects of name after the position after, in order
+
+        The positions are read size at a time, each time from the last one
+        read, so that the objects added or removed in between are seen.
+        """
+        while True:
+            positions = self.__sorted(name)
+            with self.__rwlock.reading():
+                start = 0 if after is None else \
+                    bisect.bisect_right(positions, after)
+                chunk = positions[start:start + size]
+            if not chunk:
+                return
+            for after in chunk:
+                obj = self.get(name, after[1])
+                if obj is not None:
+                    yield obj
+
+    def find(self, cls, attribute, value):
+        """
+        Retrieve the objects of a class with a value of an attribute
+
+        The foreign keys of the cities, places and reviews are indexed, so
+        their objects are found without going through the others, which
+        makes the relationships of the models as fast as their size.
+
+        Args:
+        -   cls (str | class): The class name.
+        -   attribute (str): The name of the attribute.
+        -   value: The value of the attribute, or one of the values of a
+            list attribute.
+
+        Returns:
+        -   list: The objects found, by creation.
+        """
+        name = self.__class_name(cls)
+        if attribute in self.__indexed.get(name, ()):
+            objs = (self.get(name, obj_id)
+                    for obj_id in self.__find(name, attribute, (value,)))
+            objs = [obj for obj in objs if obj is not None]
+        else:
+            objs = [
+                obj for obj in self.all(cls).values()
+                if getattr(obj, attribute, None) == value
+            ]
+        return sorted(objs, key=pagination.sort_key)
+
+    def search_places(self, city_ids=None, amenity_ids=()):
+        """
+        Retrieve the places of some cities which have some amenities
+
+        The places are found in the indexes of their city and of their
+        amenities, from the smallest set of places, instead of going
+        through every place.
+
+        Args:
+        -   city_ids (iterable): The ids of the cities, None for any city.
+        -   amenity_ids (iterable): The ids of the amenities every place
+            must have.
+
+        Returns:
+        -   list: The places found.
+        """
+        sets = [self.__find("Place", "amenity_ids", (amenity_id,))
+                for amenity_id in set(amenity_ids)]
+        if city_ids is not None:
+            sets.append(self.__find("Place", "city_id", set(city_ids)))
+        if not sets:
+            return list(self.all("Place").values())
+        sets.sort(key=len)
+        ids = sets[0].intersection(*sets[1:])
+        places = (self.get("Place", place_id) for place_id in ids)
+        return [place for place in places if place is not None]
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+Contains the iter_object function
+"""
+
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_object(f, chunk_size=1 << 16):
+    """yields the (key, value) members of the JSON object read from f
+
+    The file is read chunk_size characters at a time and each value is
+    decoded as soon as it is complete, so only one member is held in memory
+    instead of the whole document.
+
+    Args:
+        f (file): A text file open for reading.
+        chunk_size (int): The number of characters read at a time.
+
+    Raises:
+        ValueError: If the content of f is not a JSON object.
+    """
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        """drops what was decoded and reads the next chunk"""
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def skip():
+        """moves pos to the next significant character, '' at the end"""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return buf[pos:pos + 1]
+
+    def decode():
+        """decodes the JSON value at pos"""
+        nonlocal pos
+        skip()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buf, pos)
+            except ValueError:
+                if fill():
+                    continue
+                raise
+            if end == len(buf) and fill():
+                # a number may go on in the next chunk
+                continue
+            pos = end
+            return value
+
+    if skip() != "{":
+        raise ValueError("Expecting '{' at the start of the file")
+    pos += 1
+    if skip() == "}":
+        return
+    while True:
+        key = decode()
+        if not isinstance(key, str) or skip() != ":":
+            raise ValueError("Expecting a string key followed by ':'")
+        pos += 1
+        yield key, decode()
+        sep = skip()
+        pos += 1
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError("Expecting ',' or '}' after a value")
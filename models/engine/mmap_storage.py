@@ -0,0 +1,656 @@
+#!/usr/bin/python3
+"""
+Contains the MmapStorage class
+"""
+
+import bisect
+import fcntl
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import weakref
+from models.amenity import Amenity
+from models.base_model import BaseModel
+from models.city import City
+from models.engine import pagination
+from models.engine.rwlock import ReadWriteLock
+from models.engine import unit_of_work
+from models.engine.unit_of_work import Holds, UnitOfWork
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+
+classes = {
+    "Amenity": Amenity,
+    "BaseModel": BaseModel,
+    "City": City,
+    "Place": Place,
+    "Review": Review,
+    "State": State,
+    "User": User,
+}
+
+
+class MmapStorage:
+    """stores objects in a memory-mapped data file with an offset index
+
+    The data file only grows: save() appends the JSON of every changed object
+    to it. The index file holds one entry per write, the offset and length
+    of the JSON of the object in the data file, or a length of 0 once the
+    object is deleted, followed by the length of its key and the key. The
+    last entry of a key wins.
+
+    reload() only reads the index entries it has not seen yet, and get()
+    decodes a single record from the mapping, so every process using the
+    same files shares their pages through the OS page cache. The decoded
+    instances are only referenced weakly, unless they are changed or in
+    the undo log of a unit of work, so they are not held once the callers
+    drop them.
+    """
+
+    MAGIC = b"HBNBMAP2"
+    # header - magic and generation of the data file
+    HEADER = struct.Struct("<8sQ")
+    # entry - offset and length of a record, and length of the key after it
+    ENTRY = struct.Struct("<QII")
+
+    def __init__(self, path=None):
+        """Instantiate a MmapStorage object
+
+        Args:
+            path (str): The prefix of the files, HBNB_MMAP_PATH or
+                file.mmap by default.
+        """
+        self.__path = path or os.getenv("HBNB_MMAP_PATH", "file.mmap")
+        self.__index_path = self.__path + ".idx"
+        self.__lock = ReadWriteLock()
+        # guards __instances, which readers add to
+        self.__mutex = threading.Lock()
+        # the units of work of each thread, see begin()
+        self.__unit = UnitOfWork()
+        # the keys changed in the open units of every thread, appended as
+        # they were before until the units are committed
+        self.__holds = Holds()
+        self.__reset()
+
+    def __reset(self):
+        """forgets everything read from the files"""
+        # dictionary - (offset, length) of the saved objects by class and id
+        self.__offsets = {}
+        # dictionary - the instances in use by <class name>.id, saved or
+        # not, so that each object has a single instance
+        self.__instances = weakref.WeakValueDictionary()
+        # dictionary - objects changed since the last save, None if deleted
+        self.__changes = {}
+        # dictionary - the sorted (created_at, id) positions of the saved
+        # objects of a class, with the position of each id, as
+        # {<class name>: (list, {id: position})}, made by paginate()
+        self.__order = {}
+        # dictionary - ids saved since by class, to place in __order
+        self.__unplaced = {}
+        # inode and generation of the index, and bytes of it read
+        self.__index_stat = None
+        self.__generation = None
+        self.__index_read = self.HEADER.size
+        self.__map = None
+        self.__mapped = 0
+        self.__data = None
+
+    def __data_path(self, generation):
+        """returns the path of the data file of generation"""
+        return "{}.{}".format(self.__path, generation)
+
+    @staticmethod
+    def __class_name(cls):
+        """returns the class name of cls, which is a class or a string"""
+        return cls if isinstance(cls, str) else getattr(cls, "__name__", None)
+
+    @classmethod
+    def __entry(cls, key, offset, length):
+        """returns the index entry of key"""
+        key = key.encode("utf-8")
+        return cls.ENTRY.pack(offset, length, len(key)) + key
+
+    def __locked(self, flag):
+        """returns the index file, created if needed, locked with flag"""
+        fd = os.open(self.__index_path, os.O_RDWR | os.O_CREAT, 0o644)
+        f = os.fdopen(fd, "r+b")
+        fcntl.flock(f, flag)
+        if os.fstat(fd).st_size == 0:
+            f.write(self.HEADER.pack(self.MAGIC, 0))
+            f.flush()
+        return f
+
+    def __remap(self):
+        """maps the current data file again after it grew"""
+        if self.__data is None:
+            self.__data = open(self.__data_path(self.__generation), "a+b")
+        size = os.fstat(self.__data.fileno()).st_size
+        if size > self.__mapped:
+            if self.__map is not None:
+                self.__map.close()
+            self.__map = mmap.mmap(
+                self.__data.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self.__mapped = size
+
+    def __read_index(self, f):
+        """applies the index entries of f not read yet"""
+        st = os.fstat(f.fileno())
+        f.seek(0)
+        magic, generation = self.HEADER.unpack(f.read(self.HEADER.size))
+        if magic != self.MAGIC:
+            raise ValueError("{} is not an index".format(self.__index_path))
+        if (st.st_ino, generation) != (self.__index_stat, self.__generation):
+            # compacted by another process: start over
+            if self.__data is not None:
+                if self.__map is not None:
+                    self.__map.close()
+                self.__data.close()
+            changes = self.__changes
+            self.__reset()
+            self.__changes = changes
+            self.__index_stat = st.st_ino
+            self.__generation = generation
+        f.seek(self.__index_read)
+        data = f.read()
+        start = 0
+        # an entry torn by a crash at the end is left out
+        while start + self.ENTRY.size <= len(data):
+            offset, length, size = self.ENTRY.unpack_from(data, start)
+            end = start + self.ENTRY.size + size
+            if end > len(data):
+                break
+            key = data[start + self.ENTRY.size:end].decode("utf-8")
+            if key not in self.__changes:
+                # written by another process
+                self.__instances.pop(key, None)
+            self.__apply(key, offset, length)
+            start = end
+        self.__index_read += start
+        self.__remap()
+
+    def __apply(self, key, offset, length):
+        """records the index entry of key"""
+        name, _, obj_id = key.partition(".")
+        if length:
+            self.__offsets.setdefault(name, {})[obj_id] = (offset, length)
+        else:
+            self.__offsets.get(name, {}).pop(obj_id, None)
+        order = self.__order.get(name)
+        if order is not None:
+            # the record may not be mapped yet, it is placed by __sorted()
+            previous = order[1].pop(obj_id, None)
+            if previous is not None:
+                del order[0][bisect.bisect_left(order[0], previous)]
+            if length:
+                self.__unplaced.setdefault(name, set()).add(obj_id)
+
+    def __position(self, name, obj_id):
+        """returns the (created_at, id) position of a saved object"""
+        offset, length = self.__offsets[name][obj_id]
+        return pagination.record_key(
+            json.loads(self.__map[offset:offset + length])
+        )
+
+    def __sorted(self, name):
+        """returns the sorted positions of the saved objects of name
+
+        The order is made on the first call, by reading each record once,
+        then the records saved since are placed in it.
+        """
+        if name in self.__order and not self.__unplaced.get(name):
+            return self.__order[name][0]
+        with self.__lock.writing():
+            order = self.__order.get(name)
+            if order is None:
+                by_id = {
+                    obj_id: self.__position(name, obj_id)
+                    for obj_id in self.__offsets.get(name, {})
+                }
+                order = (sorted(by_id.values()), by_id)
+                self.__order[name] = order
+            else:
+                for obj_id in self.__unplaced.get(name, ()):
+                    if obj_id in self.__offsets.get(name, {}):
+                        position = self.__position(name, obj_id)
+                        bisect.insort(order[0], position)
+                        order[1][obj_id] = position
+            self.__unplaced.pop(name, None)
+            return order[0]
+
+    def __load(self, name, obj_id):
+        """returns the instance of a saved object, decoded from the map
+
+        The instance in use is returned if there is one. Readers only
+        hold the lock for reading, __mutex serializes the additions.
+        """
+        key = name + "." + obj_id
+        obj = self.__instances.get(key)
+        if obj is None:
+            offset, length = self.__offsets[name][obj_id]
+            record = json.loads(self.__map[offset:offset + length])
+            obj = classes[record["__class__"]](**record)
+            obj._dirty = False
+            with self.__mutex:
+                obj = self.__instances.setdefault(key, obj)
+        return obj
+
+    def all(self, cls=None, load=()):
+        """returns a dictionary of the objects, of class cls if given
+
+        load is ignored, the related objects are found through all().
+        """
+        names = [self.__class_name(cls)] if cls is not None else None
+        with self.__lock.reading():
+            objs = {}
+            for name, ids in self.__offsets.items():
+                if names is None or name in names:
+                    for obj_id in ids:
+                        key = name + "." + obj_id
+                        if key not in self.__changes:
+                            objs[key] = self.__load(name, obj_id)
+            for key, obj in self.__changes.items():
+                if obj is not None and (
+                    names is None or obj.__class__.__name__ in names
+                ):
+                    objs[key] = obj
+            return objs
+
+    def new(self, obj):
+        """adds obj to the objects to write on the next save"""
+        if obj is not None:
+            self.new_all((obj,))
+
+    def new_all(self, objs):
+        """adds every object of objs, see new()"""
+        keys = [obj.__class__.__name__ + "." + obj.id for obj in objs]
+        with self.__lock.writing():
+            for key, obj in zip(keys, objs):
+                self.__before(key)
+                obj._dirty = True
+                self.__instances[key] = obj
+                self.__changes[key] = obj
+
+    def touch(self, obj, name=None, previous=None):
+        """records that obj, if it is stored, changed since the last save
+
+        name and previous are the attribute which changed and its value
+        before, kept by the units of work, see begin().
+        """
+        key = obj.__class__.__name__ + "." + str(getattr(obj, "id", ""))
+        if self.__instances.get(key) is not obj:
+            # not stored, or being decoded by a reader holding the lock
+            return
+        with self.__lock.writing():
+            if self.__instances.get(key) is obj:
+                self.__before(key, name, previous)
+                self.__changes[key] = obj
+
+    def dirty(self):
+        """returns the objects changed since the last save
+
+        Returns:
+            dict: The objects by <class name>.id, None for deleted ones.
+        """
+        with self.__lock.reading():
+            return dict(self.__changes)
+
+    def save(self):
+        """appends the changed objects to the data file and the index
+
+        In a unit of work, see begin(), the save waits for commit().
+        """
+        if not self.__unit.defer():
+            self.__save()
+
+    def __save(self):
+        """appends the changed objects, see save()"""
+        with self.__lock.writing():
+            if not self.__changes:
+                return
+            # the keys held by a unit of work stay changed, the ones changed
+            # before the unit are appended as they were then
+            held = {
+                key: obj for key, obj in self.__changes.items()
+                if key in self.__holds
+            }
+            changes = {
+                key: obj for key, obj in self.__changes.items()
+                if key not in held
+            }
+            for key in held:
+                stored, attributes, changed, _ = self.__holds.get(key)
+                if changed:
+                    changes[key] = stored and unit_of_work.copy(
+                        stored, attributes
+                    )
+            if not changes:
+                return
+            with self.__locked(fcntl.LOCK_EX) as f:
+                self.__read_index(f)
+                self.__data.seek(0, os.SEEK_END)
+                offset = self.__data.tell()
+                records = []
+                entries = []
+                for key, obj in changes.items():
+                    record = b""
+                    if obj is not None:
+                        obj._dirty = False
+                        record = json.dumps(obj.to_dict()).encode("utf-8")
+                        records.append(record)
+                    entries.append((key, offset, len(record)))
+                    offset += len(record)
+                self.__data.write(b"".join(records))
+                self.__data.flush()
+                os.fsync(self.__data.fileno())
+                # drops what is left of an entry torn by a crash
+                f.seek(self.__index_read)
+                f.truncate()
+                data = b"".join(self.__entry(*entry) for entry in entries)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self.__changes = held
+                for entry in entries:
+                    self.__apply(*entry)
+                self.__index_read += len(data)
+                self.__remap()
+
+    def delete(self, obj=None):
+        """deletes obj from the storage"""
+        if obj is not None:
+            key = obj.__class__.__name__ + "." + obj.id
+            with self.__lock.writing():
+                self.__before(key)
+                self.__instances.pop(key, None)
+                self.__changes[key] = None
+            self.save()
+
+    def begin(self):
+        """opens a unit of work in the current thread
+
+        Until the unit is committed or rolled back, the save() calls of the
+        thread, and those of delete(), are deferred so that the changes of
+        the unit are appended at once. Each change is undone by rollback().
+        A unit opened in another one is a savepoint within it.
+        """
+        with self.__lock.writing():
+            changed = self.__unit.keys()
+            self.__unit.begin()
+            for key in changed:
+                self.__before(key)
+
+    def commit(self):
+        """closes the innermost unit of work, saving once if outermost
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        keys = self.__unit.keys()
+        saves, _ = self.__unit.commit()
+        with self.__lock.writing():
+            self.__holds.release(keys - self.__unit.keys())
+        if saves:
+            self.__save()
+
+    def rollback(self):
+        """closes the innermost unit of work, undoing its changes
+
+        Raises:
+            RuntimeError: If the thread has no unit of work open.
+        """
+        keys = self.__unit.keys()
+        undo, _ = self.__unit.rollback()
+        with self.__lock.writing():
+            for key, entry in undo.items():
+                self.__undo(key, *entry)
+            self.__holds.release(keys - self.__unit.keys())
+
+    def transaction(self):
+        """returns a context manager running its block in a unit of work
+
+        The unit is committed if the block completes and rolled back if it
+        raises, see begin().
+        """
+        return unit_of_work.transaction(self)
+
+    def __before(self, key, name=None, previous=None):
+        """records the undo entry of key before it changes, in a unit
+
+        A saved object is decoded first, so that its instance is restored.
+        """
+        if not self.__unit.tracks(key):
+            return
+        obj_name, _, obj_id = key.partition(".")
+        stored = self.__instances.get(key)
+        if stored is None and key not in self.__changes and \
+                obj_id in self.__offsets.get(obj_name, {}):
+            stored = self.__load(obj_name, obj_id)
+        attributes = None
+        if stored is not None:
+            attributes = unit_of_work.snapshot(stored, name, previous)
+        entry = (
+            stored, attributes, key in self.__changes,
+            self.__changes.get(key)
+        )
+        self.__unit.record(key, entry)
+        self.__holds.hold(key, entry)
+
+    def __undo(self, key, stored, attributes, changed, change):
+        """restores key as recorded by __before()"""
+        # appended since by the save() of another thread, to append again
+        written = key not in self.__changes
+        if stored is not None:
+            unit_of_work.restore(stored, attributes)
+            stored._dirty = changed
+            self.__instances[key] = stored
+        else:
+            self.__instances.pop(key, None)
+        if changed:
+            self.__changes[key] = change
+        elif written:
+            self.__changes[key] = stored
+        else:
+            self.__changes.pop(key, None)
+
+    def reload(self):
+        """reads the index entries written since the last reload
+
+        Objects saved by other processes are decoded again on their next
+        access.
+        """
+        with self.__lock.writing():
+            with self.__locked(fcntl.LOCK_SH) as f:
+                self.__read_index(f)
+
+    def compact(self):
+        """rewrites the live objects to a new data file and index
+
+        The new index is renamed over the old one, so a crash leaves one or
+        the other complete.
+        """
+        with self.__lock.writing():
+            with self.__locked(fcntl.LOCK_EX) as f:
+                self.__read_index(f)
+                generation = self.__generation + 1
+                tmp = self.__index_path + ".tmp"
+                with open(self.__data_path(generation), "wb") as data, \
+                        open(tmp, "wb") as index:
+                    index.write(self.HEADER.pack(self.MAGIC, generation))
+                    offset = 0
+                    for name, ids in self.__offsets.items():
+                        for obj_id, (start, length) in ids.items():
+                            key = name + "." + obj_id
+                            data.write(self.__map[start:start + length])
+                            index.write(self.__entry(key, offset, length))
+                            offset += length
+                    data.flush()
+                    os.fsync(data.fileno())
+                    index.flush()
+                    os.fsync(index.fileno())
+                os.replace(tmp, self.__index_path)
+                old = self.__data_path(self.__generation)
+                instances = list(self.__instances.items())
+            with self.__locked(fcntl.LOCK_SH) as f:
+                self.__read_index(f)
+            # the objects did not change, only where they are stored
+            self.__instances.update(instances)
+            os.remove(old)
+
+    def close(self):
+        """call reload() to see the objects saved by other processes"""
+        self.reload()
+
+    def get(self, cls, id, load=()):
+        """
+        Retrieve an object based on class name and id
+
+        Args:
+        -   cls (str | class): The class name.
+        -   id (str): The object id.
+        -   load (tuple): Ignored, see all().
+
+        Returns:
+        -   object: The object if found, otherwise None.
+        """
+        if (cls in classes.values() or cls in classes) and id:
+            name = self.__class_name(cls)
+            key = name + "." + str(id)
+            with self.__lock.reading():
+                if key in self.__changes:
+                    return self.__changes[key]
+                if id in self.__offsets.get(name, {}):
+                    return self.__load(name, id)
+
+    def count(self, cls=None):
+        """
+        Count the number of objects in storage
+        """
+        name = self.__class_name(cls) if cls is not None else None
+        with self.__lock.reading():
+            count = sum(
+                len(ids) for ids_name, ids in self.__offsets.items()
+                if name is None or ids_name == name
+            )
+            for key, obj in self.__changes.items():
+                key_name, _, obj_id = key.partition(".")
+                if name is None or key_name == name:
+                    saved = obj_id in self.__offsets.get(key_name, {})
+                    count += (obj is not None) - saved
+            return count
+
+    def paginate(self, cls, limit, cursor=None, **filters):
+        """
+        Retrieve a page of the objects of a class, by (created_at, id)
+
+        Args:
+        -   cls (str | class): The class name.
+        -   limit (int): The greatest number of objects of the page.
+        -   cursor (str): The cursor of the previous page, None for the
+            first one.
+        -   **filters: The values of the attributes of the objects.
+
+        The page starts at the cursor in the sorted positions of the saved
+        objects, merged with the objects changed and not saved yet, so
+        only the records of the page are decoded.
+
+        Returns:
+        -   tuple: The objects of the page, and the cursor of the next one
+            or None if it is the last page.
+
+        Raises:
+        -   ValueError: If cursor is not valid.
+        """
+        name = self.__class_name(cls)
+        after = pagination.decode_cursor(cursor) if cursor else None
+        positions = self.__sorted(name)
+        with self.__lock.reading():
+            prefix = name + "."
+            changed = sorted((
+                obj for key, obj in self.__changes.items()
+                if key.startswith(prefix) and obj is not None and
+                (after is None or pagination.sort_key(obj) > after)
+            ), key=pagination.sort_key)
+
+            def saved():
+                """yields the saved objects after the cursor, in order"""
+                start = 0 if after is None else \
+                    bisect.bisect_right(positions, after)
+                ids = self.__offsets.get(name, {})
+                for i in range(start, len(positions)):
+                    obj_id = positions[i][1]
+                    # the positions may be older than a reload
+                    if obj_id in ids and prefix + obj_id not in self.__changes:
+                        yield self.__load(name, obj_id)
+            return pagination.take(
+                heapq.merge(saved(), changed, key=pagination.sort_key),
+                limit, **filters
+            )
+
+    def export(self, cls, cursor=None, **filters):
+        """
+        Retrieve every object of a class after a cursor, by (created_at, id)
+
+        The objects are read page by page with paginate(), so that they are
+        not all decoded at once.
+
+        Args:
+        -   cls (str | class): The class name.
+        -   cursor (str): The cursor of a page, None for every object.
+        -   **filters: The values of the attributes of the objects.
+
+        Returns:
+        -   iterator: The objects after the cursor.
+
+        Raises:
+        -   ValueError: If cursor is not valid.
+        """
+        return pagination.pages(self.paginate, cls, cursor, **filters)
+
+    def find(self, cls, attribute, value):
+        """
+        Retrieve the objects of a class with a value of an attribute
+
+        Args:
+        -   cls (str | class): The class name.
+        -   attribute (str): The name of the attribute.
+        -   value: The value of the attribute, or one of the values of a
+            list attribute.
+
+        Returns:
+        -   list: The objects found, by creation.
+        """
+        objs = []
+        for obj in self.all(cls).values():
+            found = getattr(obj, attribute, None)
+            if found == value or isinstance(found, list) and value in found:
+                objs.append(obj)
+        return sorted(objs, key=pagination.sort_key)
+
+    def search_places(self, city_ids=None, amenity_ids=()):
+        """
+        Retrieve the places of some cities which have some amenities
+
+        The places are read from the map and matched with sets: the records
+        are not indexed by city or amenity, which would read them all.
+
+        Args:
+        -   city_ids (iterable): The ids of the cities, None for any city.
+        -   amenity_ids (iterable): The ids of the amenities every place
+            must have.
+
+        Returns:
+        -   list: The places found.
+        """
+        city_ids = set(city_ids) if city_ids is not None else None
+        amenity_ids = set(amenity_ids)
+        return [
+            place for place in self.all("Place").values()
+            if (city_ids is None or place.city_id in city_ids) and
+            amenity_ids.issubset(getattr(place, "amenity_ids", ()))
+        ]
@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""
+Contains the cursors of the pages of storage.paginate()
+
+The objects are ordered by (created_at, id), and a cursor is the position
+of the last object of a page, so that the next page starts after it even
+if objects were added or deleted in between.
+"""
+
+import base64
+from datetime import datetime
+import heapq
+
+# objects read at a time by the export() of the engines which page
+EXPORT_SIZE = 1000
+
+
+def sort_key(obj):
+    """returns the (created_at, id) position of obj"""
+    return (obj.created_at, obj.id)
+
+
+def record_key(record):
+    """returns the (created_at, id) position of the dictionary of an object"""
+    try:
+        created_at = datetime.fromisoformat(record["created_at"])
+    except (KeyError, TypeError, ValueError):
+        created_at = datetime.min
+    return (created_at, record["id"])
+
+
+def encode_cursor(obj):
+    """returns the cursor of the objects after obj"""
+    position = "{} {}".format(obj.created_at.isoformat(), obj.id)
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """returns the (created_at, id) position of cursor
+
+    Raises:
+        ValueError: If cursor was not made by encode_cursor().
+    """
+    try:
+        position = base64.urlsafe_b64decode(
+            cursor + "=" * (-len(cursor) % 4)
+        ).decode()
+        created_at, obj_id = position.split(" ", 1)
+        return (datetime.fromisoformat(created_at), obj_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("invalid cursor: {}".format(cursor)) from e
+
+
+def page(objs, limit, cursor=None, **filters):
+    """returns a page of objs, for the engines which keep them in memory
+
+    Args:
+        objs (iterable): The objects of the class.
+        limit (int): The greatest number of objects of the page.
+        cursor (str): The cursor of the previous page, None for the first.
+        **filters: The values of the attributes of the objects.
+
+    Returns:
+        tuple: The objects of the page, and the cursor of the next one or
+        None if it is the last page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    objs = [
+        obj for obj in objs
+        if (after is None or sort_key(obj) > after) and matches(obj, filters)
+    ]
+    return take(heapq.nsmallest(limit + 1, objs, key=sort_key), limit)
+
+
+def take(objs, limit, **filters):
+    """returns a page of objs, which are already sorted and after the cursor
+
+    Only the objects needed are read from objs, so it can be an iterator
+    over all the objects after the cursor. The return value is the one of
+    page().
+    """
+    found = []
+    for obj in objs:
+        if matches(obj, filters):
+            found.append(obj)
+            if len(found) > limit:
+                return found[:limit], encode_cursor(found[limit - 1])
+    return found, None
+
+
+def pages(paginate, cls, cursor=None, **filters):
+    """returns an iterator over the objects of cls after cursor
+
+    The objects are read EXPORT_SIZE at a time by paginate(), as the
+    iterator is consumed, for the engines which do not hold them all. The
+    first page is read at once, so an invalid cursor raises ValueError.
+    """
+    objs, cursor = paginate(cls, EXPORT_SIZE, cursor, **filters)
+
+    def chain(objs, cursor):
+        """yields the objects of each page"""
+        yield from objs
+        while cursor:
+            objs, cursor = paginate(cls, EXPORT_SIZE, cursor, **filters)
+            yield from objs
+    return chain(objs, cursor)
+
+
+def matches(obj, filters):
+    """returns True if obj has the values of the attributes of filters"""
+    return all(
+        getattr(obj, key, None) == value for key, value in filters.items()
+    )
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+"""
+Contains the TimedQueuePool class
+"""
+
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """a QueuePool which also counts checkouts and times their waits
+
+    The time of a checkout includes waiting for a connection to be checked
+    in, opening a new one and the pre-ping, all of which delay a request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Instantiate a TimedQueuePool with the arguments of QueuePool"""
+        super().__init__(*args, **kwargs)
+        self.__lock = threading.Lock()
+        self.__checkouts = 0
+        self.__timeouts = 0
+        self.__wait = 0.0
+        self.__max_wait = 0.0
+        self.__max_checked_out = 0
+
+    def connect(self):
+        """checks out a connection, counting the time it took"""
+        start = time.monotonic()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            with self.__lock:
+                self.__timeouts += 1
+            raise
+        waited = time.monotonic() - start
+        with self.__lock:
+            self.__checkouts += 1
+            self.__wait += waited
+            self.__max_wait = max(self.__max_wait, waited)
+            self.__max_checked_out = max(
+                self.__max_checked_out, self.checkedout()
+            )
+        return conn
+
+    def stats(self):
+        """returns the state of the pool and the counters of checkouts
+
+        Returns:
+            dict: The size of the pool, the connections checked in and out,
+            the overflow, then the checkouts since the pool was created,
+            how many timed out, and the total and longest wait in ms.
+        """
+        with self.__lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "max_checked_out": self.__max_checked_out,
+                "checkouts": self.__checkouts,
+                "timeouts": self.__timeouts,
+                "wait_ms": round(self.__wait * 1000, 3),
+                "max_wait_ms": round(self.__max_wait * 1000, 3),
+            }
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Contains the ReadWriteLock class
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class ReadWriteLock:
+    """lets many threads read at the same time, or a single thread write
+
+    Writers are preferred: once a writer waits, new readers wait too so that
+    writers are not starved. A thread holding the lock can acquire it again
+    in either mode, except for writing while it is only reading.
+    """
+
+    def __init__(self):
+        """Instantiate an unlocked ReadWriteLock"""
+        self.__cond = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting_writers = 0
+        self.__local = threading.local()
+
+    def acquire_read(self):
+        """blocks until the calling thread may read"""
+        local = self.__local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            local.counted = self.__writer != threading.get_ident()
+            if local.counted:
+                with self.__cond:
+                    while self.__writer is not None or self.__waiting_writers:
+                        self.__cond.wait()
+                    self.__readers += 1
+        local.depth = depth + 1
+
+    def release_read(self):
+        """releases a read acquired by the calling thread"""
+        local = self.__local
+        local.depth -= 1
+        if local.depth == 0 and local.counted:
+            with self.__cond:
+                self.__readers -= 1
+                if self.__readers == 0:
+                    self.__cond.notify_all()
+
+    def acquire_write(self):
+        """blocks until the calling thread may write"""
+        me = threading.get_ident()
+        if self.__writer == me:
+            self.__writes += 1
+            return
+        if getattr(self.__local, "depth", 0):
+            raise RuntimeError("cannot write while holding a read lock")
+        with self.__cond:
+            self.__waiting_writers += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__waiting_writers -= 1
+            self.__writer = me
+            self.__writes = 1
+
+    def release_write(self):
+        """releases a write acquired by the calling thread"""
+        self.__writes -= 1
+        if self.__writes == 0:
+            with self.__cond:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    @contextmanager
+    def reading(self):
+        """context manager holding the lock for reading"""
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def writing(self):
+        """context manager holding the lock for writing"""
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
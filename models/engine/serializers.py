@@ -0,0 +1,323 @@
+#!/usr/bin/python3
+"""
+Contains the formats FileStorage can write its objects in
+
+Usage: python3 -m models.engine.serializers <source> <destination> [format]
+
+converts a file written by FileStorage to format (json or binary, guessed
+from the extension of destination by default).
+"""
+
+from datetime import datetime, timedelta
+import io
+import json
+from models.engine.json_stream import iter_object
+import re
+import struct
+import sys
+import threading
+
+
+class JSONSerializer:
+    """writes the objects as a single JSON object, by <class name>.id"""
+
+    name = "json"
+    extension = ".json"
+
+    def encode(self, key, record):
+        """returns the "<key>": <record> member of the JSON object"""
+        return json.dumps(key) + ": " + json.dumps(record)
+
+    def join(self, fragments):
+        """returns the file made of the fragments returned by encode()"""
+        return ("{" + ", ".join(fragments) + "}").encode("utf-8")
+
+    def iter_records(self, f):
+        """yields the (key, record) read from the binary file f"""
+        text = io.TextIOWrapper(f, encoding="utf-8")
+        try:
+            yield from iter_object(text)
+        finally:
+            text.detach()
+
+
+class BinarySerializer:
+    """writes the objects as length-prefixed binary records
+
+    The file starts with MAGIC and the table of the field and class names,
+    which records refer to by their position. Each record is its length
+    then the class name, the id and the fields of the object. Values are
+    tagged, and the ISO datetimes written by to_dict() for TIME_FIELDS are
+    stored as integer microseconds since the epoch.
+    """
+
+    name = "binary"
+    extension = ".bin"
+    MAGIC = b"HBNB\x01"
+    EPOCH = datetime(1970, 1, 1)
+    NONE, FALSE, TRUE, INT, FLOAT, STR, LIST, DICT, TIME, BIGINT = range(10)
+    TIME_FIELDS = frozenset(("created_at", "updated_at"))
+    ISO_FORMAT = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d{6})?$")
+
+    def __init__(self):
+        """Instantiate a BinarySerializer with an empty name table"""
+        self.__names = []
+        self.__ids = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __varint(n):
+        """returns n, a positive integer, as a LEB128 varint"""
+        out = bytearray()
+        while n > 0x7f:
+            out.append(n & 0x7f | 0x80)
+            n >>= 7
+        out.append(n)
+        return bytes(out)
+
+    @staticmethod
+    def __read_varint(data, pos):
+        """returns the varint at pos in data and the position after it"""
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return n, pos
+            shift += 7
+
+    def __string(self, s):
+        """returns s as its length then its UTF-8 bytes"""
+        data = s.encode("utf-8")
+        return self.__varint(len(data)) + data
+
+    def __intern(self, name):
+        """returns the position of name in the name table, as a varint"""
+        name_id = self.__ids.get(name)
+        if name_id is None:
+            with self.__lock:
+                name_id = self.__ids.get(name)
+                if name_id is None:
+                    name_id = self.__varint(len(self.__names))
+                    self.__names.append(name)
+                    self.__ids[name] = name_id
+        return name_id
+
+    def __value(self, value):
+        """returns value tagged with its type"""
+        if type(value) is str:
+            data = value.encode("utf-8")
+            return bytes((self.STR,)) + self.__varint(len(data)) + data
+        if value is None:
+            return bytes((self.NONE,))
+        if value is True or value is False:
+            return bytes((self.TRUE if value else self.FALSE,))
+        if isinstance(value, int):
+            if -(1 << 63) <= value < (1 << 63):
+                return bytes((self.INT,)) + struct.pack("<q", value)
+            return bytes((self.BIGINT,)) + self.__string(str(value))
+        if isinstance(value, float):
+            return bytes((self.FLOAT,)) + struct.pack("<d", value)
+        if isinstance(value, str):
+            return bytes((self.STR,)) + self.__string(value)
+        if isinstance(value, (list, tuple)):
+            return bytes((self.LIST,)) + self.__varint(len(value)) + b"".join(
+                self.__value(item) for item in value
+            )
+        if isinstance(value, dict):
+            return bytes((self.DICT,)) + self.__varint(len(value)) + b"".join(
+                self.__string(str(k)) + self.__value(v)
+                for k, v in value.items()
+            )
+        raise TypeError("cannot encode {!r}".format(value))
+
+    def __micros(self, value):
+        """returns the microseconds since the epoch of an ISO datetime
+
+        None is returned when value is not a datetime as written by
+        isoformat(), so that it is decoded back to the same string.
+        """
+        if not isinstance(value, str) or len(value) not in (19, 26):
+            return None
+        if not self.ISO_FORMAT.match(value):
+            return None
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        if len(value) == 26 and not dt.microsecond:
+            return None
+        return (dt - self.EPOCH) // timedelta(microseconds=1)
+
+    def __read_value(self, data, pos):
+        """returns the value at pos in data and the position after it"""
+        tag = data[pos]
+        pos += 1
+        if tag == self.NONE:
+            return None, pos
+        if tag in (self.FALSE, self.TRUE):
+            return tag == self.TRUE, pos
+        if tag == self.INT:
+            return struct.unpack_from("<q", data, pos)[0], pos + 8
+        if tag == self.FLOAT:
+            return struct.unpack_from("<d", data, pos)[0], pos + 8
+        if tag in (self.STR, self.BIGINT):
+            s, pos = self.__read_string(data, pos)
+            return (int(s) if tag == self.BIGINT else s), pos
+        if tag == self.TIME:
+            micros = struct.unpack_from("<q", data, pos)[0]
+            dt = self.EPOCH + timedelta(microseconds=micros)
+            return dt.isoformat(), pos + 8
+        if tag == self.LIST:
+            n, pos = self.__read_varint(data, pos)
+            items = []
+            for _ in range(n):
+                item, pos = self.__read_value(data, pos)
+                items.append(item)
+            return items, pos
+        if tag == self.DICT:
+            n, pos = self.__read_varint(data, pos)
+            items = {}
+            for _ in range(n):
+                k, pos = self.__read_string(data, pos)
+                items[k], pos = self.__read_value(data, pos)
+            return items, pos
+        raise ValueError("unknown tag {} in binary record".format(tag))
+
+    def __read_string(self, data, pos):
+        """returns the string at pos in data and the position after it"""
+        n, pos = self.__read_varint(data, pos)
+        return data[pos:pos + n].decode("utf-8"), pos + n
+
+    def encode(self, key, record):
+        """returns the length-prefixed record of the object"""
+        name, _, obj_id = key.partition(".")
+        intern = self.__intern
+        value = self.__value
+        payload = [intern(name), self.__string(obj_id), self.__varint(
+            len(record))]
+        for field in record:
+            payload.append(intern(field))
+            if field in self.TIME_FIELDS:
+                micros = self.__micros(record[field])
+                if micros is not None:
+                    payload.append(bytes((self.TIME,)))
+                    payload.append(struct.pack("<q", micros))
+                    continue
+            payload.append(value(record[field]))
+        payload = b"".join(payload)
+        return struct.pack("<I", len(payload)) + payload
+
+    def join(self, fragments):
+        """returns the file made of the records returned by encode()"""
+        fragments = list(fragments)
+        with self.__lock:
+            names = list(self.__names)
+        header = [self.MAGIC, self.__varint(len(names))]
+        header.extend(self.__string(name) for name in names)
+        return b"".join(header + fragments)
+
+    def iter_records(self, f):
+        """yields the (key, record) read from the binary file f"""
+        if f.read(len(self.MAGIC)) != self.MAGIC:
+            raise ValueError("not a binary FileStorage file")
+        names = []
+        count = self.__read_file_varint(f)
+        for _ in range(count):
+            size = self.__read_file_varint(f)
+            names.append(f.read(size).decode("utf-8"))
+        while True:
+            prefix = f.read(4)
+            if not prefix:
+                return
+            if len(prefix) < 4:
+                raise ValueError("truncated binary record")
+            size = struct.unpack("<I", prefix)[0]
+            data = f.read(size)
+            if len(data) < size:
+                raise ValueError("truncated binary record")
+            yield self.__read_record(data, names)
+
+    def __read_record(self, data, names):
+        """returns the (key, record) encoded in data
+
+        Strings and datetimes, most of the values, are decoded inline.
+        """
+        read_varint = self.__read_varint
+        name_id, pos = read_varint(data, 0)
+        obj_id, pos = self.__read_string(data, pos)
+        n, pos = read_varint(data, pos)
+        record = {}
+        for _ in range(n):
+            field_id = data[pos]
+            if field_id < 0x80:
+                pos += 1
+            else:
+                field_id, pos = read_varint(data, pos)
+            tag = data[pos]
+            if tag == self.STR and data[pos + 1] < 0x80:
+                end = pos + 2 + data[pos + 1]
+                value = data[pos + 2:end].decode("utf-8")
+                pos = end
+            elif tag == self.TIME:
+                micros = struct.unpack_from("<q", data, pos + 1)[0]
+                value = self.EPOCH + timedelta(microseconds=micros)
+                value = value.isoformat()
+                pos += 9
+            else:
+                value, pos = self.__read_value(data, pos)
+            record[names[field_id]] = value
+        return names[name_id] + "." + obj_id, record
+
+    @staticmethod
+    def __read_file_varint(f):
+        """reads a varint from the binary file f"""
+        n = shift = 0
+        while True:
+            byte = f.read(1)
+            if not byte:
+                raise ValueError("truncated binary file")
+            n |= (byte[0] & 0x7f) << shift
+            if byte[0] < 0x80:
+                return n
+            shift += 7
+
+
+formats = {
+    "json": JSONSerializer(),
+    "binary": BinarySerializer(),
+}
+
+
+def iter_records(f):
+    """yields the (key, record) of a binary file f written in any format"""
+    fmt = formats["json"]
+    if f.peek(len(BinarySerializer.MAGIC)).startswith(BinarySerializer.MAGIC):
+        fmt = formats["binary"]
+    yield from fmt.iter_records(f)
+
+
+def convert(source, destination, fmt=None):
+    """writes the objects of the file source to destination in format fmt
+
+    Args:
+        source (str): The path of a file in any format.
+        destination (str): The path of the file to write.
+        fmt (str): A key of formats, guessed from destination by default.
+    """
+    if fmt is None:
+        fmt = "binary" if destination.endswith(".bin") else "json"
+    serializer = formats[fmt]
+    with open(source, "rb") as f:
+        fragments = [
+            serializer.encode(key, record) for key, record in iter_records(f)
+        ]
+    with open(destination, "wb") as f:
+        f.write(serializer.join(fragments))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        sys.exit(__doc__.strip().splitlines()[2])
+    convert(*sys.argv[1:])
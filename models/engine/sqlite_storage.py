@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""
+Contains the class SQLiteStorage
+"""
+
+from models.engine.db_storage import DBStorage
+from os import getenv
+from sqlalchemy import create_engine, event
+
+
+class SQLiteStorage(DBStorage):
+    """stores the models in an embedded SQLite database
+
+    The database is opened in WAL mode, so that readers never wait for the
+    writer, and each thread gets its own connection from the pool, as the
+    scoped session of DBStorage is already one per thread. Writers wait up
+    to HBNB_SQLITE_TIMEOUT milliseconds for each other instead of failing.
+    The pool is set by the HBNB_SQLITE_POOL_* variables, see _pool_options().
+    """
+
+    def _create_engine(self):
+        """returns the engine of the database file HBNB_SQLITE_PATH"""
+        path = getenv('HBNB_SQLITE_PATH', 'hbnb.db')
+        timeout = int(getenv('HBNB_SQLITE_TIMEOUT', '5000'))
+        engine = create_engine(
+            'sqlite:///{}'.format(path),
+            connect_args={'check_same_thread': False},
+            **self._pool_options('HBNB_SQLITE', size=16, overflow=-1,
+                                 recycle=-1, pre_ping='0')
+        )
+
+        @event.listens_for(engine, "connect")
+        def configure(dbapi_connection, connection_record):
+            """sets the pragmas of a new connection"""
+            cursor = dbapi_connection.cursor()
+            if path != ':memory:':
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA busy_timeout={:d}".format(timeout))
+            cursor.close()
+        return engine
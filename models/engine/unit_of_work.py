@@ -0,0 +1,197 @@
+#!/usr/bin/python3
+"""
+Contains the UnitOfWork and Holds classes
+"""
+
+from contextlib import contextmanager
+import threading
+
+
+class UnitOfWork(threading.local):
+    """the units of work open in a thread, the innermost last
+
+    While a unit is open the storage defers the save() calls of the thread
+    to the end of the outermost unit, which saves once if any was made.
+    Each unit keeps an undo log of the objects changed in it, as they were
+    before their first change, so that they are restored by a rollback
+    without reading the files again. A unit opened in another one is a
+    savepoint: its commit hands its undo log to the enclosing unit and its
+    rollback only undoes its own changes. The objects already changed in
+    the enclosing units are recorded when it opens, as they only report
+    their first change since they were saved, see BaseModel.__setattr__.
+    """
+
+    def __init__(self):
+        """Instantiate the UnitOfWork of a thread, with no unit open"""
+        self.saves = 0
+        # list - (undo log, savepoint) of each open unit
+        self.levels = []
+
+    @property
+    def active(self):
+        """True if a unit is open in the thread"""
+        return bool(self.levels)
+
+    def begin(self, savepoint=None):
+        """opens a unit, in the one already open if any
+
+        Args:
+            savepoint: What the storage needs to roll back to the start of
+                the unit, if it does not use the undo log.
+        """
+        if not self.levels:
+            self.saves = 0
+        self.levels.append(({}, savepoint))
+
+    def __close(self):
+        """closes the innermost unit, returns its undo log and savepoint"""
+        if not self.levels:
+            raise RuntimeError("no unit of work is open")
+        return self.levels.pop()
+
+    def commit(self):
+        """closes the innermost unit, keeping its changes
+
+        Returns:
+            tuple: The number of saves to make now, 0 unless the unit is
+            the outermost one, and the savepoint of the unit.
+
+        Raises:
+            RuntimeError: If no unit is open.
+        """
+        undo, savepoint = self.__close()
+        if self.levels:
+            outer = self.levels[-1][0]
+            for key, entry in undo.items():
+                outer.setdefault(key, entry)
+            return 0, savepoint
+        saves, self.saves = self.saves, 0
+        return saves, savepoint
+
+    def rollback(self):
+        """closes the innermost unit, dropping its changes
+
+        Returns:
+            tuple: The undo log of the unit, by key, and its savepoint.
+
+        Raises:
+            RuntimeError: If no unit is open.
+        """
+        undo, savepoint = self.__close()
+        if not self.levels:
+            self.saves = 0
+        return undo, savepoint
+
+    def keys(self):
+        """returns the keys with an undo entry in any open unit"""
+        return {key for undo, _ in self.levels for key in undo}
+
+    def defer(self):
+        """returns True if a save must wait for the end of the units"""
+        if self.levels:
+            self.saves += 1
+        return bool(self.levels)
+
+    def tracks(self, key):
+        """returns True if the innermost unit has no undo entry for key"""
+        return bool(self.levels) and key not in self.levels[-1][0]
+
+    def record(self, key, entry=None):
+        """records the undo entry of key, unless the unit already has one"""
+        if self.levels:
+            self.levels[-1][0].setdefault(key, entry)
+
+
+class Holds:
+    """the keys changed in the open units of work of every thread
+
+    Each key is held with the undo entry recorded by the first unit of
+    each thread which changed it, that is the key as it was before. The
+    storage writes the entry of the oldest one instead of the key, so that
+    the changes of a unit are not written by the save() of another thread
+    before the unit is committed. The storage guards it with its lock.
+    """
+
+    def __init__(self):
+        """Instantiate the Holds, with no key held"""
+        # dictionary - {key: {thread id: undo entry}}
+        self.entries = {}
+
+    def __contains__(self, key):
+        """returns True if key is held by a thread"""
+        return key in self.entries
+
+    def hold(self, key, entry):
+        """holds key for the current thread, unless it already does"""
+        self.entries.setdefault(key, {}).setdefault(
+            threading.get_ident(), entry
+        )
+
+    def get(self, key):
+        """returns the undo entry of the oldest thread holding key"""
+        return next(iter(self.entries[key].values()))
+
+    def release(self, keys):
+        """releases the keys held by the current thread"""
+        ident = threading.get_ident()
+        for key in keys:
+            owners = self.entries.get(key)
+            if owners is not None:
+                owners.pop(ident, None)
+                if not owners:
+                    del self.entries[key]
+
+
+def snapshot(obj, name=None, previous=None):
+    """returns the attributes of obj to restore on a rollback
+
+    Args:
+        obj (BaseModel): The object, already changed if name is given.
+        name (str): The attribute just changed, see BaseModel.__setattr__.
+        previous (dict): {name: value before the change}, empty if it had
+            no value.
+    """
+    attributes = {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in obj.__dict__.items()
+    }
+    if name is not None:
+        attributes.pop(name, None)
+        attributes.update(previous)
+    return attributes
+
+
+def restore(obj, attributes):
+    """gives back to obj the attributes returned by snapshot()"""
+    obj.__dict__.clear()
+    obj.__dict__.update(attributes)
+
+
+def copy(obj, attributes):
+    """returns a new instance of the class of obj with attributes
+
+    The instance is not built by __init__(), so the storage is not told.
+    """
+    other = obj.__class__.__new__(obj.__class__)
+    other.__dict__.update(attributes)
+    other._dirty = False
+    return other
+
+
+@contextmanager
+def transaction(storage):
+    """runs the block in a unit of work of storage
+
+    The unit is committed if the block completes and rolled back if it
+    raises.
+
+    Yields:
+        The storage.
+    """
+    storage.begin()
+    try:
+        yield storage
+    except BaseException:
+        storage.rollback()
+        raise
+    storage.commit()
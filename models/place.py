@@ -3,7 +3,7 @@
 from sqlalchemy.orm import relationship
 from sqlalchemy import Column, String, Integer, ForeignKey, Float, Table
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import db_loading, storage_type
 
 
 if storage_type == 'db':
@@ -21,6 +21,7 @@ if storage_type == 'db':
             String(60),
             ForeignKey('amenities.id', onupdate='CASCADE', ondelete='CASCADE'),
             primary_key=True,
+            index=True,
         ),
     )
 
@@ -30,8 +31,10 @@ class Place(BaseModel, Base):
 
     if storage_type == 'db':
         __tablename__ = 'places'
-        city_id = Column(String(60), ForeignKey('cities.id'), nullable=False)
-        user_id = Column(String(60), ForeignKey('users.id'), nullable=False)
+        city_id = Column(String(60), ForeignKey('cities.id'),
+                         nullable=False, index=True)
+        user_id = Column(String(60), ForeignKey('users.id'),
+                         nullable=False, index=True)
         name = Column(String(128), nullable=False)
         description = Column(String(1024))
         number_rooms = Column(Integer, default=0, nullable=False)
@@ -42,12 +45,14 @@ class Place(BaseModel, Base):
         longitude = Column(Float)
         # fmt: off
         reviews = relationship('Review',
-                               backref='place', cascade='all, delete')
+                               backref='place', cascade='all, delete',
+                               lazy=db_loading)
         amenities = relationship(
             "Amenity",
             secondary='place_amenity',
             backref="place_amenities",
             viewonly=False,
+            lazy=db_loading,
         )
 
     else:
@@ -63,17 +68,19 @@ class Place(BaseModel, Base):
         longitude = 0.0
         amenity_ids = []
 
+        def __init__(self, *args, **kwargs):
+            """Initializes a place with its own list of amenity ids"""
+            super().__init__(*args, **kwargs)
+            if "amenity_ids" not in self.__dict__:
+                self.amenity_ids = []
+
         @property
         def reviews(self):
             """getter attribute returns the list of Review instances"""
             from models import storage
             from models.review import Review
 
-            return [
-                review
-                for review in storage.all(Review).values()
-                if review.place_id == self.id
-            ]
+            return storage.find(Review, "place_id", self.id)
 
         @property
         def amenities(self):
@@ -81,8 +88,17 @@ class Place(BaseModel, Base):
             from models import storage
             from models.amenity import Amenity
 
-            return [
-                amenity
-                for amenity in storage.all(Amenity).values()
-                if amenity.place_id == self.id
-            ]
+            amenities = (
+                storage.get(Amenity, amenity_id)
+                for amenity_id in self.amenity_ids
+            )
+            return [amenity for amenity in amenities if amenity is not None]
+
+        @amenities.setter
+        def amenities(self, amenity):
+            """setter attribute adds the id of an Amenity to amenity_ids"""
+            from models.amenity import Amenity
+
+            if isinstance(amenity, Amenity) and \
+                    amenity.id not in self.amenity_ids:
+                self.amenity_ids = self.amenity_ids + [amenity.id]
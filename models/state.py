@@ -3,7 +3,7 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import db_loading, storage_type
 
 
 class State(BaseModel, Base):
@@ -12,18 +12,15 @@ class State(BaseModel, Base):
     if storage_type == 'db':
         __tablename__ = 'states'
         name = Column(String(128), nullable=False)
-        cities = relationship('City', backref='state', cascade='all, delete')
+        cities = relationship('City', backref='state', cascade='all, delete',
+                              lazy=db_loading)
     else:
         name = ""
 
         @property
         def cities(self):
             """getter for list of city instances related to the state"""
-            from models.__init__ import storage
+            from models import storage
             from models.city import City
 
-            return [
-                city
-                for city in storage.all(City).values()
-                if city.state_id == self.id
-            ]
+            return storage.find(City, "state_id", self.id)
@@ -3,7 +3,7 @@
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
 from models.base_model import BaseModel, Base
-from models import storage_type
+from models import db_loading, storage_type
 
 
 class User(BaseModel, Base):
@@ -15,10 +15,28 @@ class User(BaseModel, Base):
         password = Column(String(128), nullable=False)
         first_name = Column(String(128))
         last_name = Column(String(128))
-        places = relationship('Place', backref='user', cascade='all, delete')
-        reviews = relationship('Review', backref='user', cascade='all, delete')
+        places = relationship('Place', backref='user', cascade='all, delete',
+                              lazy=db_loading)
+        reviews = relationship('Review', backref='user',
+                               cascade='all, delete', lazy=db_loading)
     else:
         email = ""
         password = ""
         first_name = ""
         last_name = ""
+
+        @property
+        def places(self):
+            """getter for list of place instances of the user"""
+            from models import storage
+            from models.place import Place
+
+            return storage.find(Place, "user_id", self.id)
+
+        @property
+        def reviews(self):
+            """getter for list of review instances of the user"""
+            from models import storage
+            from models.review import Review
+
+            return storage.find(Review, "user_id", self.id)
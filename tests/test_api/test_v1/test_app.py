@@ -1,8 +1,13 @@
 #!/usr/bin/python3
 """Test module for api.v1.app.py"""
 import flask
+import json
+import threading
 import unittest
+from unittest import mock
 from api.v1.app import app
+from models import storage
+from models.state import State
 
 
 class AppTestCase(unittest.TestCase):
@@ -16,5 +21,101 @@ class AppTestCase(unittest.TestCase):
         self.assertIsInstance(self.client, flask.testing.FlaskClient)
 
 
+class ConcurrencyTestCase(unittest.TestCase):
+    """Stress the API views from many threads at once"""
+
+    threads = 16
+    rounds = 15
+
+    def test_concurrent_requests(self):
+        """Test that concurrent reads and writes all succeed"""
+        failures = []
+        prefix = '/api/v1'
+
+        def hammer(n):
+            client = app.test_client()
+            for i in range(self.rounds):
+                name = "State {} {}".format(n, i)
+                res = client.post(prefix + '/states', json={"name": name})
+                if res.status_code != 201:
+                    failures.append(("POST", res.status_code))
+                    continue
+                state_id = res.get_json()["id"]
+                res = client.post(prefix + '/states/{}/cities'.format(
+                    state_id), json={"name": name})
+                failures.extend(
+                    [("POST city", res.status_code)]
+                    if res.status_code != 201 else [])
+                for path in ('/states', '/states/' + state_id,
+                             '/states/{}/cities'.format(state_id), '/stats'):
+                    res = client.get(prefix + path)
+                    if res.status_code != 200:
+                        failures.append(("GET " + path, res.status_code))
+                res = client.put(prefix + '/states/' + state_id,
+                                 json={"name": name + " renamed"})
+                if res.status_code != 200:
+                    failures.append(("PUT", res.status_code))
+                if i % 2:
+                    res = client.delete(prefix + '/states/' + state_id)
+                    if res.status_code != 200:
+                        failures.append(("DELETE", res.status_code))
+        workers = [threading.Thread(target=hammer, args=(n,))
+                   for n in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(failures, [])
+        data = json.loads(app.test_client().get('/api/v1/states').data)
+        self.assertIsInstance(data, list)
+
+
+class UnitOfWorkTestCase(unittest.TestCase):
+    """Test the unit of work of each request"""
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.commit = mock.patch.object(storage, "commit",
+                                        wraps=storage.commit).start()
+        self.rollback = mock.patch.object(storage, "rollback",
+                                          wraps=storage.rollback).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_commit(self):
+        """Test that a successful request is committed once"""
+        res = self.client.post('/api/v1/states', json={"name": "Unit"})
+        self.assertEqual(res.status_code, 201)
+        state_id = res.get_json()["id"]
+        res = self.client.delete('/api/v1/states/' + state_id)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.commit.call_count, 2)
+        self.rollback.assert_not_called()
+        self.assertEqual(storage.dirty(), {})
+        self.assertIsNone(storage.get(State, state_id))
+
+    def test_rollback_on_error(self):
+        """Test that the changes of a failed request are undone"""
+        state = State(name="Before")
+        state.save()
+        get = storage.get
+
+        def fail(cls, obj_id, load=()):
+            obj = get(cls, obj_id)
+            obj.name = "After"
+            obj.save()
+            raise RuntimeError("failed")
+        with mock.patch.object(storage, "get", side_effect=fail):
+            res = self.client.get('/api/v1/states/' + state.id)
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(self.rollback.call_count, 1)
+        state = storage.get(State, state.id)
+        self.assertEqual(state.name, "Before")
+        res = self.client.get('/api/v1/states/nope')
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(self.rollback.call_count, 2)
+        self.commit.assert_not_called()
+        storage.delete(state)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+"""Test module for api/v1/views/batch.py"""
+import hashlib
+import unittest
+from unittest import mock
+from api.v1.app import app
+from api.v1.views import batch
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.state import State
+from models.user import User
+from models import storage
+
+
+class TestBatch(unittest.TestCase):
+    """Test class for the batch views"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup for the test"""
+        cls.prefix = '/api/v1'
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Teardown for the test"""
+        storage.close()
+
+    def test_create_states(self):
+        """Test creating states in a single save"""
+        names = ["Batch {}".format(i) for i in range(5)]
+        with mock.patch.object(storage, "save", wraps=storage.save) as save:
+            response = self.client.post(f'{self.prefix}/states/batch',
+                                        json=[{"name": n} for n in names])
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(response.status_code, 201)
+        results = response.get_json()
+        self.assertEqual([r["status"] for r in results], [201] * 5)
+        self.assertEqual([r["object"]["name"] for r in results], names)
+        for result in results:
+            state = storage.get(State, result["object"]["id"])
+            self.assertEqual(state.name, result["object"]["name"])
+
+    def test_create_partial(self):
+        """Test that the valid items are created and the others reported"""
+        state = State(name="Batch")
+        storage.new(state)
+        storage.save()
+        response = self.client.post(f'{self.prefix}/cities/batch', json=[
+            {"name": "Giza", "state_id": state.id},
+            {"name": "Nowhere", "state_id": "nope"},
+            {"state_id": state.id},
+            "Luxor",
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()
+        self.assertEqual([r["status"] for r in results],
+                         [201, 404, 400, 400])
+        self.assertEqual(results[2]["error"], "Missing name")
+        city = storage.get(City, results[0]["object"]["id"])
+        self.assertEqual((city.name, city.state_id), ("Giza", state.id))
+
+    def test_create_users_places_reviews(self):
+        """Test the resources referring to other objects"""
+        response = self.client.post(f'{self.prefix}/users/batch', json=[
+            {"email": "batch@hbnb.io", "password": "pwd"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        user = response.get_json()[0]["object"]
+        self.assertEqual(user["password"],
+                         hashlib.md5("pwd".encode()).hexdigest())
+        state = State(name="Batch")
+        city = City(name="Giza", state_id=state.id)
+        for obj in (state, city):
+            storage.new(obj)
+        storage.save()
+        response = self.client.post(f'{self.prefix}/places/batch', json=[
+            {"name": "P{}".format(i), "city_id": city.id,
+             "user_id": user["id"], "number_rooms": i}
+            for i in range(3)
+        ])
+        self.assertEqual(response.status_code, 201)
+        places = [r["object"] for r in response.get_json()]
+        self.assertEqual(storage.get(Place, places[2]["id"]).number_rooms, 2)
+        response = self.client.post(f'{self.prefix}/reviews/batch', json=[
+            {"text": "Nice", "place_id": places[0]["id"],
+             "user_id": user["id"]},
+            {"text": "Nice", "place_id": places[0]["id"], "user_id": "nope"},
+        ])
+        self.assertEqual(response.status_code, 207)
+        review = response.get_json()[0]["object"]
+        self.assertEqual(storage.get(Review, review["id"]).text, "Nice")
+
+    def test_invalid(self):
+        """Test the batches which create nothing"""
+        count = storage.count()
+        for body in ({}, "nope", [{}], [1, 2]):
+            response = self.client.post(f'{self.prefix}/states/batch',
+                                        json=body)
+            self.assertEqual(response.status_code, 400, body)
+        response = self.client.post(f'{self.prefix}/states/batch',
+                                    data="nope",
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        with mock.patch.object(batch, "MAX_BATCH_SIZE", 2):
+            response = self.client.post(f'{self.prefix}/states/batch',
+                                        json=[{"name": "A"}] * 3)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(f'{self.prefix}/nope/batch', json=[])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(storage.count(), count)
+
+    def test_dispatch(self):
+        """Test the requests of a batch, run in its unit of work"""
+        state = State(name="Batch")
+        storage.new(state)
+        storage.save()
+        cities = f'{self.prefix}/states/{state.id}/cities'
+        with mock.patch.object(storage, "close",
+                               wraps=storage.close) as close:
+            response = self.client.post(f'{self.prefix}/batch', json=[
+                {"path": f'{self.prefix}/states/{state.id}'},
+                {"method": "POST", "path": cities, "body": {"name": "A"}},
+                {"method": "POST", "path": cities, "body": {"name": "B"}},
+                {"path": cities + "?limit=1"},
+                {"method": "POST", "path": cities, "body": {}},
+                {"path": f'{self.prefix}/states/nope'},
+            ])
+            # once before the batch and once after, not for each request
+            self.assertEqual(close.call_count, 2)
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()
+        self.assertEqual([r["status"] for r in results],
+                         [200, 201, 201, 200, 400, 404])
+        self.assertEqual(results[0]["body"]["name"], "Batch")
+        self.assertEqual([city["name"] for city in results[3]["body"]],
+                         ["A"])
+        self.assertIn("X-Next-Cursor", results[3]["headers"])
+        self.assertEqual(results[5]["body"], {"error": "Not found"})
+        storage.close()
+        state = storage.get(State, state.id)
+        self.assertEqual(sorted(city.name for city in state.cities),
+                         ["A", "B"])
+
+    def test_dispatch_failure(self):
+        """Test that a failed request of a batch is rolled back alone"""
+        state = State(name="Batch")
+        storage.new(state)
+        storage.save()
+        with mock.patch("api.v1.views.states.jsonify",
+                        side_effect=RuntimeError("failed")):
+            response = self.client.post(f'{self.prefix}/batch', json=[
+                {"method": "PUT", "path": f'{self.prefix}/states/{state.id}',
+                 "body": {"name": "Renamed"}},
+                {"method": "DELETE",
+                 "path": f'{self.prefix}/states/{state.id}'},
+            ])
+        self.assertEqual([r["status"] for r in response.get_json()],
+                         [200, 500])
+        storage.close()
+        state = storage.get(State, state.id)
+        self.assertIsNotNone(state)
+        self.assertEqual(state.name, "Renamed")
+
+    def test_dispatch_invalid(self):
+        """Test the batches and requests which are refused"""
+        for body in ({}, "nope"):
+            response = self.client.post(f'{self.prefix}/batch', json=body)
+            self.assertEqual(response.status_code, 400, body)
+        response = self.client.post(f'{self.prefix}/batch', json=[
+            "nope", {"method": "GET"}, {"path": "/nope"},
+            {"path": f'{self.prefix}/batch'},
+            {"method": "PATCH", "path": f'{self.prefix}/states'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["status"] for r in response.get_json()],
+                         [400] * 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
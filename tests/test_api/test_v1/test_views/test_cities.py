@@ -2,8 +2,10 @@
 """Test module for api.v1.views.cities.py"""
 import json
 import unittest
+from unittest import mock
 from api.v1.app import app
-from models import storage
+from models import storage, storage_type
+from models.engine import pagination
 from models.city import City
 from models.state import State
 
@@ -164,6 +166,67 @@ class TestCities(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(data, {"error": "Not found"})
 
+    def test_get_pages(self):
+        """Test city GET route by pages of limit cities"""
+        s_id = self.create_state()
+        c_ids = [self.create_city(s_id) for _ in range(5)]
+        url = f'{self.prefix}/states/{s_id}/cities?limit=2'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([city["id"] for city in response.get_json()])
+            url = None
+            if "Link" in response.headers:
+                url, rel = response.headers["Link"].split("; ")
+                url = url.strip("<>")
+                self.assertEqual(rel, 'rel="next"')
+                self.assertIn(response.headers["X-Next-Cursor"], url)
+        self.assertEqual(pages, [c_ids[:2], c_ids[2:4], c_ids[4:]])
+
+    def test_get_pages_invalid(self):
+        """Test city GET route with an invalid limit or cursor"""
+        s_id = self.create_state()
+        url = f'{self.prefix}/states/{s_id}/cities'
+        for query in ("?limit=0", "?limit=two", "?limit=100000",
+                      "?cursor=nope"):
+            response = self.client.get(url + query)
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_get_all_streamed(self):
+        """Test city GET route streaming every city with limit=all"""
+        s_id = self.create_state()
+        c_ids = [self.create_city(s_id) for _ in range(5)]
+        url = f'{self.prefix}/states/{s_id}/cities?limit=all'
+        with mock.patch.object(pagination, "EXPORT_SIZE", 2):
+            response = self.client.get(url)
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertEqual([city["id"] for city in response.get_json()],
+                             c_ids)
+            self.assertNotIn("X-Next-Cursor", response.headers)
+        response = self.client.get(url + "&cursor=nope")
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_all_after_cursor(self):
+        """Test city GET route streaming the cities after a cursor"""
+        s_id = self.create_state()
+        c_ids = [self.create_city(s_id) for _ in range(5)]
+        url = f'{self.prefix}/states/{s_id}/cities'
+        cursor = self.client.get(url + "?limit=2").headers["X-Next-Cursor"]
+        with mock.patch.object(pagination, "EXPORT_SIZE", 2), \
+                mock.patch.object(storage, "paginate",
+                                  wraps=storage.paginate) as paginate, \
+                mock.patch.object(storage, "find",
+                                  wraps=storage.find) as find:
+            response = self.client.get(f'{url}?limit=all&cursor={cursor}')
+            self.assertEqual([city["id"] for city in response.get_json()],
+                             c_ids[2:])
+        # FileStorage takes the cities of the state from its index
+        paged = storage_type in ('db', 'mmap')
+        self.assertEqual(paginate.call_count, 2 if paged else 0)
+        self.assertEqual(find.call_count, 0 if paged else 1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -3,6 +3,7 @@
 import json
 import unittest
 from api.v1.app import app
+from models import storage, storage_type
 
 table_names = ('amenities', 'cities', 'places', 'reviews', 'states', 'users')
 
@@ -34,6 +35,27 @@ class TestIndex(unittest.TestCase):
             self.assertIsInstance(v, int)
             self.assertTrue(v >= 0)
 
+    @unittest.skipIf(storage_type in ('db', 'mmap'),
+                     "not testing file storage")
+    def test_stats_reloads_skipped(self):
+        """Test that stats reports the reloads skipped by file storage"""
+        storage.save()
+        self.client.get(f'{self.prefix}/status')
+        response = self.client.get(f'{self.prefix}/stats')
+        data = json.loads(response.data.decode('utf-8'))
+        self.assertIsInstance(data['reloads_skipped'], int)
+        self.assertGreaterEqual(data['reloads_skipped'], 1)
+
+    def test_metrics(self):
+        """Test API metrics"""
+        self.client.get(f'{self.prefix}/stats')
+        response = self.client.get(f'{self.prefix}/metrics')
+        data = json.loads(response.data.decode('utf-8'))
+        self.assertEqual(data['storage'], type(storage).__name__)
+        if storage_type == 'db':
+            self.assertGreaterEqual(data['pool']['checkouts'], 1)
+            self.assertEqual(data['pool']['timeouts'], 0)
+
     def test_404(self):
         """Test API 404 response"""
         response = self.client.get(f'{self.prefix}/invalid_route')
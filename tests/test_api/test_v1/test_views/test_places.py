@@ -3,6 +3,7 @@
 import json
 import unittest
 from api.v1.app import app
+from models.amenity import Amenity
 from models.city import City
 from models.user import User
 from models.place import Place
@@ -224,6 +225,52 @@ class TestPlaces(unittest.TestCase):
         data = json.loads(response.data.decode('utf-8'))
         self.assertEqual(data, {"error": "Not found"})
 
+    def test_places_search(self):
+        """Test places_search by states, cities and amenities"""
+        user_id = self.create_user()
+        s_id = self.create_state()
+        c_ids = [self.create_city(s_id), self.create_city(s_id)]
+        other_c_id = self.create_city(self.create_state())
+        p_ids = [self.create_place(user_id, c_id)
+                 for c_id in c_ids + [other_c_id]]
+        wifi = Amenity(name="Wifi")
+        storage.new(wifi)
+        for p_id in p_ids[1:]:
+            place = storage.get(Place, p_id)
+            if storage_type == 'db':
+                place.amenities.append(wifi)
+            else:
+                place.amenity_ids = [wifi.id]
+            storage.new(place)
+        storage.save()
+
+        def search(body):
+            """returns the sorted ids of the places found"""
+            response = self.client.post(f'{self.prefix}/places_search',
+                                        json=body)
+            self.assertEqual(response.status_code, 200)
+            return sorted(place["id"] for place in response.get_json())
+        self.assertEqual(search({"states": [s_id]}), sorted(p_ids[:2]))
+        self.assertEqual(search({"states": [s_id], "cities": [other_c_id]}),
+                         sorted(p_ids))
+        self.assertEqual(search({"cities": [c_ids[0]]}), p_ids[:1])
+        self.assertEqual(search({"states": [s_id], "amenities": [wifi.id]}),
+                         p_ids[1:2])
+        self.assertTrue(set(p_ids[1:]).issubset(
+            search({"amenities": [wifi.id]})
+        ))
+        self.assertTrue(set(p_ids).issubset(search({})))
+        self.assertEqual(search({"states": ["nope"]}), [])
+
+    def test_places_search_invalid(self):
+        """Test places_search with a body which is not a search"""
+        for data in ("nope", "[]", '{"states": "nope"}',
+                     '{"cities": [{}]}'):
+            response = self.client.post(f'{self.prefix}/places_search',
+                                        data=data,
+                                        content_type="application/json")
+            self.assertEqual(response.status_code, 400, data)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+"""Test module for api/v1/views/places_amenities.py"""
+import unittest
+from unittest import mock
+from api.v1.app import app
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+from models import storage
+
+
+class TestPlacesAmenities(unittest.TestCase):
+    """Test class for the amenities of a place"""
+
+    def setUp(self):
+        """Create a place and amenities"""
+        state = State(name="Cairo")
+        city = City(name="Giza", state_id=state.id)
+        user = User(email="abc@13", password="123")
+        self.place = Place(name="Pyramids Heights", city_id=city.id,
+                           user_id=user.id)
+        self.amenities = [Amenity(name=name)
+                          for name in ("Wifi", "Pool", "Gym")]
+        for obj in [state, city, user, self.place] + self.amenities:
+            storage.new(obj)
+        storage.save()
+        self.url = f'{self.prefix}/places/{self.place.id}/amenities'
+
+    @classmethod
+    def setUpClass(cls):
+        """Setup for the test"""
+        cls.prefix = '/api/v1'
+        cls.client = app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Teardown for the test"""
+        storage.close()
+
+    def linked_ids(self):
+        """returns the sorted ids of the amenities listed for the place"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return sorted(amenity["id"] for amenity in response.get_json())
+
+    def test_link_unlink(self):
+        """Test linking then unlinking a single amenity"""
+        amenity_id = self.amenities[0].id
+        self.assertEqual(self.linked_ids(), [])
+        response = self.client.post(f'{self.url}/{amenity_id}')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["id"], amenity_id)
+        response = self.client.post(f'{self.url}/{amenity_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.linked_ids(), [amenity_id])
+        response = self.client.delete(f'{self.url}/{amenity_id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.linked_ids(), [])
+        response = self.client.delete(f'{self.url}/{amenity_id}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_404(self):
+        """Test an unknown place or amenity"""
+        amenity_id = self.amenities[0].id
+        for response in (
+                self.client.get(f'{self.prefix}/places/nope/amenities'),
+                self.client.post(f'{self.prefix}/places/nope/amenities/'
+                                 f'{amenity_id}'),
+                self.client.post(f'{self.url}/nope'),
+                self.client.delete(f'{self.url}/nope')):
+            self.assertEqual(response.status_code, 404)
+
+    def test_bulk_link_unlink(self):
+        """Test linking and unlinking many amenities in a single save"""
+        ids = sorted(amenity.id for amenity in self.amenities)
+        with mock.patch.object(storage, "save", wraps=storage.save) as save:
+            response = self.client.post(self.url, json={"amenity_ids": ids})
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(amenity["id"] for amenity in response.get_json()), ids
+        )
+        self.assertEqual(self.linked_ids(), ids)
+        with mock.patch.object(storage, "save", wraps=storage.save) as save:
+            response = self.client.delete(self.url,
+                                          json={"amenity_ids": ids[1:]})
+            self.assertEqual(save.call_count, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.linked_ids(), ids[:1])
+
+    def test_bulk_invalid(self):
+        """Test linking many amenities with a bad request"""
+        response = self.client.post(self.url, json={
+            "amenity_ids": [self.amenities[0].id, "nope"]
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.linked_ids(), [])
+        for body in ([], {}, {"amenity_ids": "nope"},
+                     {"amenity_ids": [1]}):
+            response = self.client.post(self.url, json=body)
+            self.assertEqual(response.status_code, 400, body)
+        response = self.client.post(self.url, data="nope",
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -63,6 +63,16 @@ class TestStates(unittest.TestCase):
         self.assertEqual(data['name'], "Giza")
         self.assertEqual(response.status_code, 201)
 
+    @unittest.skipIf(storage_type == 'db', "the ids are VARCHAR(60)")
+    def test_create_with_long_id(self):
+        """Test state POST route with an id of any length"""
+        s_id = "x" * 200
+        response = self.client.post(f'{self.prefix}/states/',
+                                    json={"id": s_id, "name": "Giza"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(f'{self.prefix}/states/{s_id}')
+        self.assertEqual(response.get_json()["name"], "Giza")
+
     def test_create_with_no_json(self):
         """Test state POST route with no JSON data"""
         response = self.client.post(
@@ -1,5 +1,6 @@
 #!/usr/bin/python3
 """Test module for api/v1/views/users.py"""
+import hashlib
 import json
 import unittest
 from models import storage
@@ -105,7 +106,10 @@ class TestUsers(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data.decode('utf-8'))
         self.assertIn('password', data)
-        self.assertEqual(data['password'], "new_pass")
+        self.assertEqual(data['password'],
+                         hashlib.md5("new_pass".encode()).hexdigest())
+        storage.close()
+        self.assertEqual(storage.get(User, u_id).password, data['password'])
 
     def test_update_with_no_json(self):
         """Test user PUT route with no JSON"""
@@ -166,3 +166,14 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    def test_dirty_on_assignment(self):
+        """Test that assigning an attribute marks the instance as changed"""
+        inst = BaseModel()
+        self.assertTrue(inst.is_dirty())
+        inst._dirty = False
+        self.assertFalse(inst.is_dirty())
+        inst.name = "Holberton"
+        self.assertTrue(inst.is_dirty())
+        self.assertNotIn("_dirty", inst.__dict__)
+        self.assertNotIn("_dirty", inst.to_dict())
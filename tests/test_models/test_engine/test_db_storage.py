@@ -4,6 +4,7 @@ Contains the TestDBStorageDocs and TestDBStorage classes
 """
 
 from datetime import datetime
+import importlib
 import inspect
 import models
 from models import storage, storage_type
@@ -18,7 +19,9 @@ from models.user import User
 import json
 import os
 import pep8
+from sqlalchemy import event
 import unittest
+from unittest import mock
 
 DBStorage = db_storage.DBStorage
 classes = {
@@ -166,3 +169,224 @@ class TestFileStorage(unittest.TestCase):
         state = State(name='California')
         storage.new(state)
         self.assertEqual(storage.count(object), 0)
+
+    def count_queries(self, func):
+        """returns the number of statements run by func"""
+        engine = storage._DBStorage__engine
+        statements = []
+
+        def before(conn, cursor, statement, *args):
+            """records a statement"""
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", before)
+        try:
+            func()
+        finally:
+            event.remove(engine, "before_cursor_execute", before)
+        return len(statements)
+
+    def test_count_in_one_query(self):
+        """Test that count asks the database in a single query"""
+        storage.new(State(name='California'))
+        storage.save()
+        self.assertEqual(self.count_queries(storage.count), 1)
+        self.assertEqual(self.count_queries(lambda: storage.count(State)), 1)
+
+    def test_count_cache(self):
+        """Test that the counts are cached until new() or delete()"""
+        with mock.patch.object(storage, "_DBStorage__count_ttl", 60):
+            before = storage.count(State)
+            self.assertEqual(self.count_queries(storage.count), 0)
+            state = State(name='California')
+            storage.new(state)
+            storage.save()
+            self.assertEqual(storage.count(State), before + 1)
+            self.assertEqual(
+                self.count_queries(lambda: storage.count(State)), 0
+            )
+            storage.delete(state)
+            self.assertEqual(storage.count(State), before)
+
+    def add_states(self, number, places=1):
+        """adds number states of two cities with places and reviews"""
+        user = User(email="a@b.c", password="pwd", first_name="A")
+        storage.new(user)
+        amenity = Amenity(name="Wifi")
+        storage.new(amenity)
+        for i in range(number):
+            state = State(name="S{}".format(i))
+            storage.new(state)
+            for j in range(2):
+                city = City(name="C{}".format(j), state_id=state.id)
+                storage.new(city)
+                for k in range(places):
+                    place = Place(name="P", city_id=city.id,
+                                  user_id=user.id)
+                    place.amenities.append(amenity)
+                    storage.new(place)
+                    storage.new(Review(text="R", place_id=place.id,
+                                       user_id=user.id))
+        storage.save()
+        storage.close()
+        return city
+
+    def test_all_load(self):
+        """Test that all() loads the relationships of every object at once"""
+        def cities():
+            """goes through the cities of every state"""
+            for state in storage.all(State, load=("cities",)).values():
+                state.cities
+            storage.close()
+        self.add_states(3)
+        queries = self.count_queries(cities)
+        self.add_states(3)
+        self.assertEqual(self.count_queries(cities), queries)
+
+    def test_get_load(self):
+        """Test that get() loads a path of relationships"""
+        def reviews(city):
+            """goes through the users of the reviews of the city"""
+            city = storage.get(City, city.id, load=("places.reviews.user",))
+            for place in city.places:
+                for review in place.reviews:
+                    review.user
+            storage.close()
+        city = self.add_states(1)
+        queries = self.count_queries(lambda: reviews(city))
+        city = self.add_states(1, 3)
+        self.assertEqual(self.count_queries(lambda: reviews(city)), queries)
+
+    def test_to_dict_without_relationships(self):
+        """Test that to_dict() leaves out the loaded related objects"""
+        self.add_states(1)
+        state = storage.all(State, load=("cities",)).popitem()[1]
+        self.assertIn("cities", state.__dict__)
+        self.assertNotIn("cities", state.to_dict())
+        json.dumps(state.to_dict(), default=str)
+
+    def test_pages_bounded_queries(self):
+        """Test that the pages run the same queries for more objects"""
+        for module, url in (("8-cities_by_states", "/cities_by_states"),
+                            ("100-hbnb", "/hbnb")):
+            app = importlib.import_module("web_flask." + module).app
+            self.add_states(2)
+            queries = self.count_queries(
+                lambda: app.test_client().get(url)
+            )
+            self.add_states(4)
+            self.assertEqual(self.count_queries(
+                lambda: app.test_client().get(url)
+            ), queries, url)
+
+    def test_get_identity_map(self):
+        """Test that getting an object again does not query the database"""
+        state = State(name='California')
+        storage.new(state)
+        storage.save()
+        storage.close()
+        self.assertEqual(
+            self.count_queries(lambda: storage.get(State, state.id)), 1
+        )
+        self.assertEqual(
+            self.count_queries(lambda: storage.get("State", state.id)), 0
+        )
+        storage.close()
+        self.assertEqual(
+            self.count_queries(lambda: storage.get(State, state.id)), 1
+        )
+
+    def test_get_after_delete(self):
+        """Test that get() forgets the deleted objects"""
+        state = State(name='California')
+        storage.new(state)
+        storage.save()
+        self.assertIs(storage.get(State, state.id), state)
+        storage.delete(state)
+        self.assertIsNone(storage.get(State, state.id))
+
+    def test_get_after_rollback(self):
+        """Test that get() forgets the objects of a rolled back session"""
+        state = State(name='California')
+        storage.new(state)
+        self.assertIs(storage.get(State, state.id), state)
+        storage._DBStorage__session.rollback()
+        self.assertIsNone(storage.get(State, state.id))
+
+    def test_unit_of_work(self):
+        """Test that the saves of a unit wait for its commit or rollback"""
+        state = State(name='California')
+        storage.begin()
+        state.save()
+        storage.rollback()
+        self.assertIsNone(storage.get(State, state.id))
+        storage.begin()
+        state = State(name='Nevada')
+        state.save()
+        storage.delete(state)
+        other = State(name='Oregon')
+        other.save()
+        storage.commit()
+        storage.close()
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertEqual(storage.get(State, other.id).name, 'Oregon')
+
+    def test_savepoint_and_transaction(self):
+        """Test that a nested unit is a savepoint of the session"""
+        state = State(name='Outer')
+        with storage.transaction():
+            state.save()
+            with self.assertRaises(ValueError):
+                with storage.transaction():
+                    inner = State(name='Inner')
+                    inner.save()
+                    raise ValueError("failed")
+            self.assertIsNone(storage.get(State, inner.id))
+        storage.close()
+        self.assertEqual(storage.get(State, state.id).name, 'Outer')
+        self.assertIsNone(storage.get(State, inner.id))
+
+    def test_paginate(self):
+        """Test that the pages are in creation order and use the filters"""
+        state = State(name='California')
+        storage.new(state)
+        cities = []
+        for i in range(5):
+            cities.append(City(name="C{}".format(i), state_id=state.id))
+            storage.new(cities[-1])
+        storage.save()
+        storage.close()
+        objs, cursor = storage.paginate(City, 3, state_id=state.id)
+        self.assertEqual([obj.id for obj in objs],
+                         [city.id for city in cities[:3]])
+        self.assertEqual(self.count_queries(
+            lambda: storage.paginate("City", 3, cursor, state_id=state.id)
+        ), 1)
+        objs, cursor = storage.paginate("City", 3, cursor, state_id=state.id)
+        self.assertEqual([obj.id for obj in objs],
+                         [city.id for city in cities[3:]])
+        self.assertIsNone(cursor)
+        self.assertEqual(storage.paginate(object, 3), ([], None))
+        with self.assertRaises(ValueError):
+            storage.paginate(City, 3, "nope")
+
+    def test_search_places(self):
+        """Test the places found by city and amenities in one query"""
+        city = storage.get(City, self.add_states(1, 2).id)
+        places = sorted(city.places, key=lambda place: place.id)
+        pool = Amenity(name="Pool")
+        places[0].amenities.append(pool)
+        storage.save()
+        wifi = places[0].amenities[0]
+        storage.close()
+
+        def search(*args):
+            """returns the sorted ids of the places found"""
+            return sorted(place.id for place in storage.search_places(*args))
+        self.assertEqual(search([city.id]), [place.id for place in places])
+        self.assertEqual(search([city.id], [wifi.id, pool.id]),
+                         [places[0].id])
+        self.assertIn(places[0].id, search(None, [pool.id]))
+        self.assertEqual(search([]), [])
+        self.assertEqual(self.count_queries(
+            lambda: storage.search_places([city.id], [wifi.id, pool.id])
+        ), 1)
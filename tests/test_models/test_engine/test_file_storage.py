@@ -7,7 +7,10 @@ from datetime import datetime
 import inspect
 import models
 from models import storage, storage_type
-from models.engine import file_storage
+from models.engine import file_storage, pagination
+from models.engine.rwlock import ReadWriteLock
+from models.engine.serializers import formats
+from models.engine.unit_of_work import Holds, UnitOfWork
 from models.amenity import Amenity
 from models.base_model import BaseModel
 from models.city import City
@@ -16,9 +19,13 @@ from models.review import Review
 from models.state import State
 from models.user import User
 import json
+import multiprocessing
 import os
 import pep8
+import threading
+import time
 import unittest
+from unittest import mock
 
 FileStorage = file_storage.FileStorage
 classes = {
@@ -93,7 +100,7 @@ test_file_storage.py'
             )
 
 
-@unittest.skipIf(storage_type == 'db', "not testing file storage")
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
 class TestFileStorage(unittest.TestCase):
     """Test the FileStorage class"""
 
@@ -202,3 +209,860 @@ class TestFileStorage(unittest.TestCase):
         obj = BaseModel()
         obj.save()
         self.assertEqual(storage.count(object), 0)
+
+    def test_all_with_class(self):
+        """Test that all(cls) only returns objects of that class"""
+        state = State(name="Alexandria")
+        storage.new(state)
+        city = City(name="Giza", state_id=state.id)
+        storage.new(city)
+        states = storage.all(State)
+        self.assertIn("State." + state.id, states)
+        self.assertNotIn("City." + city.id, states)
+        self.assertEqual(states, storage.all("State"))
+        for obj in states.values():
+            self.assertIs(type(obj), State)
+
+    def test_get_after_delete(self):
+        """Test that a deleted object is no longer returned by get"""
+        state = State(name="Aswan")
+        state.save()
+        self.assertIs(storage.get(State, state.id), state)
+        storage.delete(state)
+        self.assertIsNone(storage.get(State, state.id))
+        self.assertNotIn("State." + state.id, storage.all(State))
+
+    def test_reload_skipped_when_unchanged(self):
+        """Test that reload does not parse a file it just wrote"""
+        storage.save()
+        skipped = storage.skipped_reloads()
+        storage.close()
+        self.assertEqual(storage.skipped_reloads(), skipped + 1)
+
+    def test_reload_when_file_changed(self):
+        """Test that reload parses the file again after it changed"""
+        state = State(name="Luxor")
+        storage.new(state)
+        storage.save()
+        with open("file.json", "r") as f:
+            data = json.load(f)
+        data["State." + state.id]["name"] = "Thebes"
+        with open("file.json", "w") as f:
+            json.dump(data, f)
+            f.write(" ")
+        skipped = storage.skipped_reloads()
+        storage.reload()
+        self.assertEqual(storage.skipped_reloads(), skipped)
+        self.assertEqual(storage.get(State, state.id).name, "Thebes")
+
+    def test_dirty(self):
+        """Test that dirty lists the objects changed since the last save"""
+        state = State(name="Sinai")
+        storage.new(state)
+        self.assertIs(storage.dirty()["State." + state.id], state)
+        storage.save()
+        self.assertEqual(storage.dirty(), {})
+        self.assertFalse(state.is_dirty())
+        state.name = "South Sinai"
+        self.assertTrue(state.is_dirty())
+        self.assertIs(storage.dirty()["State." + state.id], state)
+        storage.delete(state)
+        self.assertEqual(storage.dirty(), {})
+
+    def test_touch_unstored(self):
+        """Test that the objects not stored do not take the write lock"""
+        with mock.patch.object(ReadWriteLock, "acquire_write",
+                               side_effect=AssertionError("writing")):
+            city = City(name="Giza", state_id="nope")
+            city.name = "Luxor"
+        self.assertNotIn("City." + city.id, storage.dirty())
+
+    def test_save_writes_changed_objects(self):
+        """Test that save writes the objects changed after a first save"""
+        state = State(name="Faiyum")
+        storage.new(state)
+        storage.save()
+        state.name = "Fayoum"
+        storage.save()
+        with open("file.json", "r") as f:
+            data = json.load(f)
+        self.assertEqual(data["State." + state.id]["name"], "Fayoum")
+        self.assertEqual(
+            data, {k: v.to_dict() for k, v in storage.all().items()}
+        )
+
+    def test_save_is_atomic(self):
+        """Test that a failed save leaves the previous file untouched"""
+        storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        storage.new(State(name="Qena"))
+        with mock.patch.object(os, "replace", side_effect=OSError):
+            with self.assertRaises(OSError):
+                storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(f.read(), before)
+        storage.save()
+        self.assertFalse(os.path.exists("file.json.tmp"))
+
+    def test_concurrent_saves_are_grouped(self):
+        """Test that saves made at the same time share a single write"""
+        states = [State(name="State {}".format(i)) for i in range(8)]
+        writes = FileStorage._FileStorage__disk_writes
+
+        def create(state):
+            storage.new(state)
+            storage.save()
+        threads = [threading.Thread(target=create, args=(state,))
+                   for state in states]
+        with mock.patch.object(
+            FileStorage, "_FileStorage__commit_window", 0.05
+        ):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLess(
+            FileStorage._FileStorage__disk_writes - writes, len(states)
+        )
+        with open("file.json", "r") as f:
+            data = json.load(f)
+        for state in states:
+            self.assertIn("State." + state.id, data)
+
+
+class IsolatedFileStorageTestCase(unittest.TestCase):
+    """Base class of the tests run on an empty storage with its own files"""
+
+    path = "file_test.json"
+    options = {}
+
+    def setUp(self):
+        """Set options on an empty storage with its own files"""
+        values = {
+            "file_path": self.path,
+            "objects": {},
+            "index": {},
+            "raw": {},
+            "changes": {},
+            "unwritten": {},
+            "serialized": {},
+            "file_stat": None,
+            "journal_entries": 0,
+            "journal_offset": 0,
+            "refs": {},
+            "ref_values": {},
+            "order": {},
+            "unit": UnitOfWork(),
+            "holds": Holds(),
+        }
+        values.update(self.options)
+        self.patches = [
+            mock.patch.object(FileStorage, "_FileStorage__" + name, value)
+            for name, value in values.items()
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restore the storage and remove its files"""
+        for patch in self.patches:
+            patch.stop()
+        for suffix in ("", ".tmp", ".journal", ".journal.old", ".lock"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def forget(self):
+        """Drop the objects in memory so that reload reads them back"""
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__index = {}
+        FileStorage._FileStorage__raw = {}
+        FileStorage._FileStorage__refs = {}
+        FileStorage._FileStorage__ref_values = {}
+        FileStorage._FileStorage__order = {}
+        FileStorage._FileStorage__file_stat = None
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageJournal(IsolatedFileStorageTestCase):
+    """Test the journal written by FileStorage when it is enabled"""
+
+    options = {"journal": True}
+
+    def test_save_appends_changes(self):
+        """Test that save only appends the objects changed since last save"""
+        state = State(name="Cairo")
+        self.storage.new(state)
+        self.storage.new(City(name="Giza", state_id=state.id))
+        self.storage.save()
+        state.name = "Al Qahirah"
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.save()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".journal", "r") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[2]["op"], "set")
+        self.assertEqual(entries[2]["key"], "State." + state.id)
+        self.assertEqual(entries[2]["obj"]["name"], "Al Qahirah")
+
+    def test_reload_replays_journal(self):
+        """Test that reload applies the journal entries in order"""
+        kept = State(name="Cairo")
+        gone = State(name="Giza")
+        self.storage.new(kept)
+        self.storage.new(gone)
+        self.storage.save()
+        self.storage.delete(gone)
+        kept.name = "Al Qahirah"
+        self.storage.new(kept)
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(self.storage.get(State, kept.id).name, "Al Qahirah")
+        self.assertIsNone(self.storage.get(State, gone.id))
+
+    def test_reload_ignores_truncated_entry(self):
+        """Test that an entry cut short by a crash is ignored"""
+        state = State(name="Cairo")
+        self.storage.new(state)
+        self.storage.save()
+        with open(self.path + ".journal", "a") as f:
+            f.write('{"op": "delete", "key": "State.')
+        self.forget()
+        self.storage.reload()
+        self.assertIsNotNone(self.storage.get(State, state.id))
+
+    def test_compact(self):
+        """Test that compact folds the journal into the JSON file"""
+        state = State(name="Cairo")
+        self.storage.new(state)
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        with open(self.path, "r") as f:
+            self.assertIn("State." + state.id, json.load(f))
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "Cairo")
+
+    def test_reload_during_compaction(self):
+        """Test that the objects saved while compacting are kept"""
+        stop = threading.Event()
+
+        def reload():
+            """reloads until the saves are done"""
+            while not stop.is_set():
+                self.storage.close()
+        reader = threading.Thread(target=reload)
+        reader.start()
+        states = [State(name="S{}".format(i)) for i in range(300)]
+        with mock.patch.object(FileStorage, "_FileStorage__compact_every",
+                               5), \
+                mock.patch.object(FileStorage, "_FileStorage__fsync",
+                                  "never"):
+            for state in states:
+                self.storage.new(state)
+                self.storage.save()
+            stop.set()
+            reader.join()
+            with FileStorage._FileStorage__compacting:
+                pass
+        self.assertEqual(self.storage.count(State), len(states))
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), len(states))
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageFsync(IsolatedFileStorageTestCase):
+    """Test the fsync of FileStorage with an interval"""
+
+    options = {"fsync": "50", "journal": False}
+
+    def test_replace_syncs_before_rename(self):
+        """Test that the file is on disk before it is renamed over"""
+        calls = []
+        fsync, replace = os.fsync, os.replace
+
+        def record(name, func):
+            """returns func recording its calls as name"""
+            def wrapper(*args):
+                calls.append(name)
+                return func(*args)
+            return wrapper
+        self.storage.new(State(name="Cairo"))
+        with mock.patch.object(FileStorage, "_FileStorage__synced_at",
+                               time.monotonic()), \
+                mock.patch.object(os, "fsync", record("fsync", fsync)), \
+                mock.patch.object(os, "replace", record("replace", replace)):
+            self.storage.save()
+        self.assertEqual(calls, ["fsync", "replace"])
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageLazy(IsolatedFileStorageTestCase):
+    """Test FileStorage instantiating objects on first access"""
+
+    options = {"lazy": True}
+
+    def setUp(self):
+        """Save some objects and forget them"""
+        super().setUp()
+        self.states = [State(name="State {}".format(i)) for i in range(3)]
+        self.city = City(name="Giza", state_id=self.states[0].id)
+        for obj in self.states + [self.city]:
+            self.storage.new(obj)
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+
+    def test_reload_does_not_instantiate(self):
+        """Test that reload only indexes the records"""
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(State), 3)
+
+    def test_get_instantiates_one(self):
+        """Test that get only instantiates the requested object"""
+        state = self.storage.get(State, self.states[1].id)
+        self.assertIsInstance(state, State)
+        self.assertEqual(state.name, "State 1")
+        self.assertIs(self.storage.get(State, self.states[1].id), state)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertIsNone(self.storage.get(State, "nonexistent_id"))
+
+    def test_all_instantiates_class(self):
+        """Test that all(cls) instantiates the objects of that class only"""
+        states = self.storage.all(State)
+        self.assertEqual(len(states), 3)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 3)
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_save_keeps_records(self):
+        """Test that save writes the records that were not instantiated"""
+        state = self.storage.get(State, self.states[0].id)
+        state.name = "Cairo"
+        self.storage.delete(self.storage.get(City, self.city.id))
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.get(State, state.id).name, "Cairo")
+        self.assertEqual(
+            self.storage.get(State, self.states[2].id).name, "State 2"
+        )
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageBinary(IsolatedFileStorageTestCase):
+    """Test FileStorage writing the binary format"""
+
+    options = {"format": formats["binary"]}
+
+    def test_save_reload(self):
+        """Test that objects saved in the binary format are read back"""
+        state = State(name="Cairo")
+        place = Place(name="Nile view", number_rooms=3, latitude=30.04,
+                      amenity_ids=["wifi"])
+        self.storage.new(state)
+        self.storage.new(place)
+        self.storage.save()
+        with open(self.path, "rb") as f:
+            self.assertTrue(f.read().startswith(b"HBNB"))
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, state.id).name, "Cairo")
+        loaded = self.storage.get(Place, place.id)
+        self.assertEqual(loaded.number_rooms, 3)
+        self.assertEqual(loaded.latitude, 30.04)
+        self.assertEqual(loaded.amenity_ids, ["wifi"])
+
+
+def save_in_other_process(func):
+    """runs func then save() in a forked process and waits for it"""
+    def run():
+        func()
+        FileStorage().save()
+    process = multiprocessing.get_context("fork").Process(target=run)
+    process.start()
+    process.join()
+    return process.exitcode
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageShared(IsolatedFileStorageTestCase):
+    """Test FileStorage sharing its files with other processes"""
+
+    options = {"shared": True}
+
+    def setUp(self):
+        """Save two states"""
+        super().setUp()
+        self.kept = State(name="Cairo")
+        self.gone = State(name="Giza")
+        self.storage.new(self.kept)
+        self.storage.new(self.gone)
+        self.storage.save()
+
+    def test_reload_sees_other_process(self):
+        """Test that reload reads what another process saved"""
+        added = State(name="Luxor")
+        unsaved = State(name="Aswan")
+
+        def change():
+            storage = FileStorage()
+            storage.get(State, self.kept.id).name = "Al Qahirah"
+            storage.delete(storage.get(State, self.gone.id))
+            storage.new(added)
+        self.assertEqual(save_in_other_process(change), 0)
+        self.storage.new(unsaved)
+        self.storage.reload()
+        self.assertEqual(
+            self.storage.get(State, self.kept.id).name, "Al Qahirah"
+        )
+        self.assertIsNone(self.storage.get(State, self.gone.id))
+        self.assertEqual(self.storage.get(State, added.id).name, "Luxor")
+        self.assertIs(self.storage.get(State, unsaved.id), unsaved)
+        self.storage.reload()
+        self.assertGreater(FileStorage._FileStorage__skipped_reloads, 0)
+
+    def test_save_keeps_other_process(self):
+        """Test that save does not overwrite what another process saved"""
+        added = State(name="Luxor")
+        self.assertEqual(
+            save_in_other_process(lambda: FileStorage().new(added)), 0
+        )
+        self.kept.name = "Al Qahirah"
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 3)
+        self.assertEqual(self.storage.get(State, added.id).name, "Luxor")
+        self.assertEqual(
+            self.storage.get(State, self.kept.id).name, "Al Qahirah"
+        )
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageSharedJournal(TestFileStorageShared):
+    """Test FileStorage sharing its journal with other processes"""
+
+    options = {"shared": True, "journal": True}
+
+    def test_reload_reads_new_entries(self):
+        """Test that reload only reads the entries appended since"""
+        kept = self.storage.get(State, self.kept.id)
+
+        def change():
+            FileStorage().get(State, self.gone.id).name = "Al Jizah"
+        self.assertEqual(save_in_other_process(change), 0)
+        self.storage.reload()
+        self.assertIs(self.storage.get(State, self.kept.id), kept)
+        self.assertEqual(self.storage.get(State, self.gone.id).name,
+                         "Al Jizah")
+        self.assertEqual(FileStorage._FileStorage__journal_offset,
+                         os.path.getsize(self.path + ".journal"))
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStoragePaginate(IsolatedFileStorageTestCase):
+    """Test the pages of FileStorage"""
+
+    def test_paginate_after_reload(self):
+        """Test that the pages keep their order once read back"""
+        state = State(name="Cairo")
+        self.storage.new(state)
+        cities = []
+        for i in range(5):
+            cities.append(City(name="C{}".format(i), state_id=state.id))
+            self.storage.new(cities[-1])
+        self.storage.new(City(name="Other", state_id="other"))
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        ids = []
+        objs, cursor = self.storage.paginate(City, 2, state_id=state.id)
+        while cursor:
+            ids.extend(obj.id for obj in objs)
+            objs, cursor = self.storage.paginate(
+                "City", 2, cursor, state_id=state.id
+            )
+        ids.extend(obj.id for obj in objs)
+        self.assertEqual(ids, [city.id for city in cities])
+        self.assertEqual(self.storage.get(City, ids[0]).created_at,
+                         cities[0].created_at)
+        with self.assertRaises(ValueError):
+            self.storage.paginate(City, 2, "nope")
+
+    def test_export(self):
+        """Test the objects after a cursor, from the index or the order"""
+        state = State(name="Cairo")
+        self.storage.new(state)
+        cities = [City(name="C{}".format(i), state_id=state.id)
+                  for i in range(5)]
+        for city in cities + [City(name="Other", state_id="other")]:
+            self.storage.new(city)
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        cursor = pagination.encode_cursor(cities[1])
+        with mock.patch.object(self.storage, "find",
+                               wraps=self.storage.find) as find:
+            objs = self.storage.export(City, cursor, state_id=state.id)
+            self.assertEqual([obj.id for obj in objs],
+                             [city.id for city in cities[2:]])
+            self.assertEqual(find.call_count, 1)
+        with mock.patch.object(pagination, "EXPORT_SIZE", 2):
+            objs = self.storage.export("City", cursor, name="C3")
+            self.assertEqual([obj.id for obj in objs], [cities[3].id])
+            objs = self.storage.export(City)
+            self.assertEqual(len(list(objs)), 6)
+        with self.assertRaises(ValueError):
+            self.storage.export(City, "nope")
+
+    def test_paginate_from_cursor(self):
+        """Test that a page starts at its cursor and sees the changes"""
+        states = [State(name="S{}".format(i)) for i in range(6)]
+        for state in states:
+            self.storage.new(state)
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+
+        def ids(*args, **filters):
+            """returns the ids of a page and its cursor"""
+            objs, cursor = self.storage.paginate(State, *args, **filters)
+            return [obj.id for obj in objs], cursor
+        page, cursor = ids(2)
+        self.assertEqual(page, [state.id for state in states[:2]])
+        self.storage.delete(self.storage.get(State, states[2].id))
+        self.storage.get(State, states[3].id).created_at = datetime.min
+        added = State(name="S6")
+        self.storage.new(added)
+        gets = []
+        get = self.storage.get
+
+        def counted(cls, obj_id):
+            """records the objects read"""
+            gets.append(obj_id)
+            return get(cls, obj_id)
+        with mock.patch.object(self.storage, "get", counted):
+            page, cursor = ids(2, cursor)
+        self.assertEqual(page, [states[4].id, states[5].id])
+        self.assertEqual(gets, page + [added.id])
+        self.assertEqual(ids(2, cursor), ([added.id], None))
+        self.assertEqual(ids(2, name="S3"), ([states[3].id], None))
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageSearch(IsolatedFileStorageTestCase):
+    """Test the places found by FileStorage in its indexes"""
+
+    def setUp(self):
+        """Add places in two cities with some amenities"""
+        super().setUp()
+        self.wifi = Amenity(name="Wifi")
+        self.pool = Amenity(name="Pool")
+        self.places = {}
+        for name, city_id, amenities in (
+                ("a", "c1", [self.wifi.id]),
+                ("b", "c1", [self.wifi.id, self.pool.id]),
+                ("c", "c2", [self.pool.id, self.wifi.id]),
+                ("d", "c2", [])):
+            place = Place(name=name, city_id=city_id, amenity_ids=amenities)
+            self.places[name] = place
+            self.storage.new(place)
+        self.storage.save()
+
+    def search(self, city_ids=None, amenity_ids=()):
+        """returns the sorted names of the places found"""
+        return sorted(place.name for place in
+                      self.storage.search_places(city_ids, amenity_ids))
+
+    def test_search_places(self):
+        """Test the places found by city and amenities"""
+        self.assertEqual(self.search(), ["a", "b", "c", "d"])
+        self.assertEqual(self.search(["c1"]), ["a", "b"])
+        self.assertEqual(self.search(["c1", "c3"]), ["a", "b"])
+        self.assertEqual(self.search([]), [])
+        self.assertEqual(self.search(None, [self.pool.id]), ["b", "c"])
+        self.assertEqual(self.search(["c1"], [self.pool.id, self.wifi.id]),
+                         ["b"])
+        self.assertEqual(self.search(["c2"], ["nope"]), [])
+
+    def test_search_places_changed(self):
+        """Test that the places are found by their current values"""
+        self.places["a"].city_id = "c2"
+        self.places["d"].amenity_ids = [self.pool.id]
+        self.storage.new(self.places["d"])
+        self.storage.delete(self.places["c"])
+        self.assertEqual(self.search(["c2"]), ["a", "d"])
+        self.assertEqual(self.search(None, [self.pool.id]), ["b", "d"])
+
+    def test_search_places_after_reload(self):
+        """Test that the places read back are indexed"""
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.search(["c2"], [self.wifi.id]), ["c"])
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageSearchLazy(TestFileStorageSearch):
+    """Test the places found in the records not instantiated yet"""
+
+    options = {"lazy": True}
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageFind(IsolatedFileStorageTestCase):
+    """Test the relationships found in the indexes of FileStorage"""
+
+    def setUp(self):
+        """Add two states with cities, places and reviews"""
+        super().setUp()
+        self.user = User(email="a@b.c", password="pwd")
+        self.states = [State(name="S0"), State(name="S1")]
+        self.cities = [City(name="C{}".format(i),
+                            state_id=self.states[i % 2].id)
+                       for i in range(4)]
+        self.place = Place(name="P", city_id=self.cities[0].id,
+                           user_id=self.user.id)
+        self.review = Review(text="R", place_id=self.place.id,
+                             user_id=self.user.id)
+        for obj in [self.user, self.place, self.review] + self.states + \
+                self.cities:
+            self.storage.new(obj)
+        self.storage.save()
+
+    def test_relationships(self):
+        """Test the relationships of the models without a scan"""
+        with mock.patch.object(FileStorage, "all",
+                               side_effect=AssertionError("scan")):
+            self.assertEqual(self.states[0].cities,
+                             [self.cities[0], self.cities[2]])
+            self.assertEqual(self.cities[0].places, [self.place])
+            self.assertEqual(self.cities[1].places, [])
+            self.assertEqual(self.place.reviews, [self.review])
+            self.assertEqual(self.user.places, [self.place])
+            self.assertEqual(self.user.reviews, [self.review])
+            objs, cursor = self.storage.paginate(
+                City, 10, state_id=self.states[1].id
+            )
+            self.assertEqual(objs, [self.cities[1], self.cities[3]])
+        self.assertEqual(self.storage.find(City, "name", "C1"),
+                         [self.cities[1]])
+
+    def test_relationships_changed(self):
+        """Test that the indexes follow new, changed and deleted objects"""
+        self.cities[0].state_id = self.states[1].id
+        self.cities[0].name = "Renamed"
+        self.cities[1].state_id = self.states[0].id
+        city = City(name="C4", state_id=self.states[0].id)
+        self.storage.new(city)
+        self.assertEqual(self.states[0].cities,
+                         [self.cities[1], self.cities[2], city])
+        self.storage.delete(self.cities[2])
+        self.assertEqual(self.states[0].cities, [self.cities[1], city])
+        self.assertEqual(self.states[1].cities,
+                         [self.cities[0], self.cities[3]])
+        city.state_id = self.states[1].id
+        self.assertEqual(self.states[0].cities, [self.cities[1]])
+
+    def test_relationships_after_reload(self):
+        """Test that the objects read back are indexed"""
+        self.forget()
+        self.storage.reload()
+        self.assertEqual([city.name for city in self.states[1].cities],
+                         ["C1", "C3"])
+        self.assertEqual(self.place.reviews[0].id, self.review.id)
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageUnitOfWork(IsolatedFileStorageTestCase):
+    """Test the units of work of FileStorage"""
+
+    def setUp(self):
+        """Save two states"""
+        super().setUp()
+        self.states = [State(name="S0"), State(name="S1")]
+        for state in self.states:
+            self.storage.new(state)
+        self.storage.save()
+
+    def test_commit_writes_once(self):
+        """Test that the saves of a unit are written once by commit"""
+        writes = FileStorage._FileStorage__disk_writes
+        with self.assertRaises(RuntimeError):
+            self.storage.commit()
+        self.storage.begin()
+        self.states[0].save()
+        self.storage.delete(self.states[1])
+        city = City(name="C", state_id=self.states[0].id)
+        city.save()
+        self.assertEqual(FileStorage._FileStorage__disk_writes, writes)
+        self.storage.commit()
+        self.assertEqual(FileStorage._FileStorage__disk_writes, writes + 1)
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(sorted(self.storage.all()), sorted([
+            "State." + self.states[0].id, "City." + city.id
+        ]))
+
+    def test_commit_without_save(self):
+        """Test that a unit which did not save writes nothing"""
+        writes = FileStorage._FileStorage__disk_writes
+        self.storage.begin()
+        self.storage.commit()
+        self.assertEqual(FileStorage._FileStorage__disk_writes, writes)
+
+    def test_rollback(self):
+        """Test that rollback undoes the changes of the unit"""
+        self.storage.begin()
+        self.states[0].name = "Renamed"
+        self.states[0].save()
+        self.storage.delete(self.states[1])
+        city = City(name="C", state_id=self.states[0].id)
+        city.save()
+        with mock.patch.object(FileStorage, "_FileStorage__records",
+                               side_effect=AssertionError("read")):
+            self.storage.rollback()
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertIsNone(self.storage.get(City, city.id))
+        self.assertIs(self.storage.get(State, self.states[0].id),
+                      self.states[0])
+        self.assertEqual(self.states[0].name, "S0")
+        self.assertFalse(self.states[0].is_dirty())
+        self.assertIsNotNone(self.storage.get(State, self.states[1].id))
+        self.assertEqual(self.storage.find(City, "state_id",
+                                           self.states[0].id), [])
+        self.storage.save()
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(sorted(self.storage.all()), sorted(
+            "State." + state.id for state in self.states
+        ))
+
+    def test_savepoint(self):
+        """Test that a nested unit only undoes its own changes"""
+        writes = FileStorage._FileStorage__disk_writes
+        self.storage.begin()
+        self.states[0].name = "Outer"
+        self.storage.begin()
+        self.states[0].name = "Inner"
+        city = City(name="C", state_id=self.states[0].id)
+        city.save()
+        self.storage.rollback()
+        self.assertEqual(self.states[0].name, "Outer")
+        self.assertIsNone(self.storage.get(City, city.id))
+        self.storage.begin()
+        self.states[1].name = "Kept"
+        self.states[1].save()
+        self.storage.commit()
+        self.assertEqual(FileStorage._FileStorage__disk_writes, writes)
+        self.storage.rollback()
+        self.assertEqual([state.name for state in self.states],
+                         ["S0", "S1"])
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertEqual(FileStorage._FileStorage__disk_writes, writes)
+
+    def test_transaction(self):
+        """Test the context manager of the units of work"""
+        with self.assertRaises(ValueError):
+            with self.storage.transaction():
+                self.states[0].name = "Renamed"
+                self.storage.delete(self.states[1])
+                raise ValueError("failed")
+        self.assertEqual(self.states[0].name, "S0")
+        self.assertIsNotNone(self.storage.get(State, self.states[1].id))
+        with self.storage.transaction() as storage:
+            City(name="C", state_id=self.states[0].id).save()
+            storage.delete(self.states[1])
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(State), 1)
+        self.assertEqual(self.storage.count(City), 1)
+
+    def on_disk(self):
+        """returns the records of the files, as reload() would read them"""
+        records = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                records.update(json.load(f))
+        for suffix in (".journal.old", ".journal"):
+            if os.path.exists(self.path + suffix):
+                with open(self.path + suffix, "r") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        if entry.get("obj") is None:
+                            records.pop(entry["key"], None)
+                        else:
+                            records[entry["key"]] = entry["obj"]
+        return records
+
+    def test_rollback_after_other_save(self):
+        """Test that another thread does not write the changes of a unit"""
+        self.storage.begin()
+        self.states[0].name = "Renamed"
+        self.states[0].save()
+        self.storage.delete(self.states[1])
+        city = City(name="C", state_id=self.states[0].id)
+        city.save()
+        other = State(name="Other")
+
+        def save():
+            """saves an object of its own, in a unit of work"""
+            with self.storage.transaction():
+                self.storage.new(other)
+                self.storage.save()
+        saver = threading.Thread(target=save)
+        saver.start()
+        saver.join()
+        records = self.on_disk()
+        self.assertEqual(records["State." + self.states[0].id]["name"], "S0")
+        self.assertIn("State." + self.states[1].id, records)
+        self.assertNotIn("City." + city.id, records)
+        self.assertIn("State." + other.id, records)
+        self.storage.rollback()
+        self.assertEqual(self.states[0].name, "S0")
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertEqual(self.on_disk(), records)
+        with self.storage.transaction():
+            self.states[0].name = "Committed"
+            self.states[0].save()
+        self.assertEqual(
+            self.on_disk()["State." + self.states[0].id]["name"], "Committed"
+        )
+
+    def test_rollback_after_compact(self):
+        """Test that a compaction does not write the changes of a unit"""
+        self.storage.begin()
+        self.states[0].name = "Renamed"
+        self.storage.delete(self.states[1])
+        city = City(name="C", state_id=self.states[0].id)
+        city.save()
+        self.storage.compact()
+        records = self.on_disk()
+        self.assertEqual(sorted(records), sorted(
+            "State." + state.id for state in self.states
+        ))
+        self.assertEqual(records["State." + self.states[0].id]["name"], "S0")
+        self.storage.rollback()
+        self.assertEqual(self.states[0].name, "S0")
+        self.assertEqual(self.storage.dirty(), {})
+        self.forget()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(State, self.states[0].id).name,
+                         "S0")
+        self.assertIsNotNone(self.storage.get(State, self.states[1].id))
+        self.assertIsNone(self.storage.get(City, city.id))
+
+
+@unittest.skipIf(storage_type in ('db', 'mmap'), "not testing file storage")
+class TestFileStorageUnitOfWorkJournal(TestFileStorageUnitOfWork):
+    """Test the units of work of FileStorage with the journal and lazy"""
+
+    options = {"journal": True, "lazy": True}
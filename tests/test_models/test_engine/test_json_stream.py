@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Contains the TestIterObject class
+"""
+
+import io
+import json
+from models.engine.json_stream import iter_object
+import unittest
+
+
+class TestIterObject(unittest.TestCase):
+    """Test the iter_object function"""
+
+    document = {
+        "State.1": {"name": "Café \"quoted\" }", "n": [1, 2.5, None]},
+        "Place.2": {"price_by_night": 1234567, "latitude": -12.75e3},
+        "User.3": {"nested": {"a": {"b": [{}, []]}}, "ok": True},
+        "Count": 9876543210,
+    }
+
+    def test_same_as_json_load(self):
+        """Test that every chunk size gives the members of json.load"""
+        text = json.dumps(self.document, indent=2)
+        for chunk_size in (1, 2, 7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                members = list(iter_object(io.StringIO(text), chunk_size))
+                self.assertEqual(dict(members), self.document)
+                self.assertEqual(
+                    [key for key, _ in members], list(self.document)
+                )
+
+    def test_empty_object(self):
+        """Test that an empty object yields nothing"""
+        self.assertEqual(list(iter_object(io.StringIO(" { } "))), [])
+
+    def test_invalid(self):
+        """Test that invalid documents raise ValueError"""
+        for text in ("", "[]", '{"a" 1}', '{"a": 1 "b": 2}', '{"a": {'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_object(io.StringIO(text), 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
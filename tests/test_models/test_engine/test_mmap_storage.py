@@ -0,0 +1,318 @@
+#!/usr/bin/python3
+"""
+Contains the TestMmapStorage classes
+"""
+
+import gc
+import inspect
+import models
+from models.engine import mmap_storage
+from models.engine.rwlock import ReadWriteLock
+from models.city import City
+from models.place import Place
+from models.state import State
+import os
+import pep8
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import weakref
+
+MmapStorage = mmap_storage.MmapStorage
+
+
+class TestMmapStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of MmapStorage class"""
+
+    def test_pep8_conformance_mmap_storage(self):
+        """Test that models/engine/mmap_storage.py conforms to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/mmap_storage.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_mmap_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_mmap_storage_module_docstring(self):
+        """Test for the mmap_storage.py module docstring"""
+        self.assertTrue(len(mmap_storage.__doc__) >= 1)
+
+    def test_mmap_storage_func_docstrings(self):
+        """Test for the presence of docstrings in MmapStorage methods"""
+        for name, func in inspect.getmembers(MmapStorage, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} method needs a docstring".format(name))
+
+
+class TestMmapStorage(unittest.TestCase):
+    """Test the MmapStorage class"""
+
+    def setUp(self):
+        """Opens a storage in a temporary directory"""
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "file.mmap")
+        self.storage = self.open()
+        # the instances report their changes to models.storage
+        patcher = mock.patch.object(models, "storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Removes the files of the storage"""
+        shutil.rmtree(self.dir)
+
+    def open(self):
+        """returns a new storage reading the files of the test"""
+        storage = MmapStorage(self.path)
+        storage.reload()
+        return storage
+
+    def add(self, obj):
+        """saves obj to the storage of the test"""
+        self.storage.new(obj)
+        self.storage.save()
+        return obj
+
+    def test_get_after_save(self):
+        """Test that get returns the saved objects from another storage"""
+        state = self.add(State(name="California"))
+        self.assertIs(self.storage.get(State, state.id), state)
+        other = self.open().get("State", state.id)
+        self.assertIsNot(other, state)
+        self.assertEqual((other.id, other.name), (state.id, state.name))
+        self.assertIsNone(self.storage.get(City, state.id))
+        self.assertIsNone(self.storage.get("Nope", state.id))
+
+    def test_all_and_count(self):
+        """Test all and count by class"""
+        state = self.add(State(name="California"))
+        city = self.add(City(name="San Francisco", state_id=state.id))
+        other = self.open()
+        self.assertEqual(other.count(), 2)
+        self.assertEqual(other.count(City), 1)
+        self.assertEqual(list(other.all(City)), ["City." + city.id])
+        self.assertEqual(len(other.all()), 2)
+
+    def test_updates_and_reload(self):
+        """Test that reload sees the objects saved by another storage"""
+        state = self.add(State(name="California"))
+        other = self.open()
+        self.assertEqual(other.get(State, state.id).name, "California")
+        state.name = "Nevada"
+        self.assertEqual(list(self.storage.dirty()), ["State." + state.id])
+        self.storage.save()
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertEqual(other.get(State, state.id).name, "California")
+        other.reload()
+        self.assertEqual(other.get(State, state.id).name, "Nevada")
+        self.assertEqual(other.count(), 1)
+
+    def test_delete(self):
+        """Test that a deleted object is gone after a reload"""
+        state = self.add(State(name="California"))
+        other = self.open()
+        self.storage.delete(state)
+        self.assertIsNone(self.storage.get(State, state.id))
+        other.reload()
+        self.assertIsNone(other.get(State, state.id))
+        self.assertEqual(other.count(), 0)
+        self.assertEqual(self.open().all(), {})
+
+    def test_compact(self):
+        """Test that compact drops the old versions of the objects"""
+        state = self.add(State(name="California"))
+        for i in range(10):
+            state.name = "State {}".format(i)
+            self.storage.save()
+        dropped = self.add(State(name="Dropped"))
+        self.storage.delete(dropped)
+        other = self.open()
+        size = os.path.getsize(self.path + ".0")
+        self.storage.compact()
+        self.assertFalse(os.path.exists(self.path + ".0"))
+        self.assertLess(os.path.getsize(self.path + ".1"), size / 5)
+        self.assertIs(self.storage.get(State, state.id), state)
+        other.reload()
+        self.assertEqual(other.get(State, state.id).name, "State 9")
+        self.assertEqual(other.count(), 1)
+        state.name = "Nevada"
+        self.storage.save()
+        self.assertEqual(self.open().get(State, state.id).name, "Nevada")
+
+    def test_partial_index_entry_ignored(self):
+        """Test that a torn write at the end of the index is ignored"""
+        state = self.add(State(name="California"))
+        with open(self.path + ".idx", "ab") as f:
+            f.write(MmapStorage.ENTRY.pack(0, 10, 50) + b"State.")
+        other = self.open()
+        self.assertEqual(other.count(), 1)
+        self.assertEqual(other.get(State, state.id).name, "California")
+        city = City(name="San Francisco", state_id=state.id)
+        other.new(city)
+        other.save()
+        self.assertEqual(self.open().get(City, city.id).name, "San Francisco")
+
+    def test_instances_not_held(self):
+        """Test that only the changed instances are held by the storage"""
+        state = self.add(State(name="California"))
+        state_id, ref = state.id, weakref.ref(state)
+        del state
+        gc.collect()
+        self.assertIsNone(ref())
+        state = self.storage.get(State, state_id)
+        self.assertIs(self.storage.get(State, state_id), state)
+        state.name = "Nevada"
+        ref = weakref.ref(state)
+        del state
+        gc.collect()
+        self.assertIsNotNone(ref())
+        self.storage.save()
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(self.storage.get(State, state_id).name, "Nevada")
+
+    def test_readers_do_not_write(self):
+        """Test that reading does not take the lock for writing"""
+        state = self.add(State(name="California"))
+        other = self.open()
+        with mock.patch.object(ReadWriteLock, "acquire_write",
+                               side_effect=AssertionError("writing")):
+            self.assertEqual(other.get(State, state.id).name, "California")
+            self.assertEqual(len(other.all(State)), 1)
+            self.assertEqual(other.count(State), 1)
+
+    def test_long_key(self):
+        """Test that the keys of any length are stored in the index"""
+        state = self.add(State(id="x" * 200, name="California"))
+        self.assertEqual(self.open().get(State, state.id).name, "California")
+        self.storage.compact()
+        self.assertEqual(self.open().get(State, state.id).name, "California")
+
+    def test_paginate(self):
+        """Test that the pages of another storage are in creation order"""
+        states = [self.add(State(name="S{}".format(i))) for i in range(5)]
+        other = self.open()
+        objs, cursor = other.paginate(State, 3)
+        self.assertEqual([obj.id for obj in objs],
+                         [state.id for state in states[:3]])
+        objs, cursor = other.paginate("State", 3, cursor)
+        self.assertEqual([obj.id for obj in objs],
+                         [state.id for state in states[3:]])
+        self.assertIsNone(cursor)
+        objs, cursor = other.paginate(State, 3, name="S1")
+        self.assertEqual([obj.id for obj in objs], [states[1].id])
+
+    def test_paginate_from_cursor(self):
+        """Test that a page only decodes its records and sees the changes"""
+        ids = [self.add(State(name="S{}".format(i))).id for i in range(6)]
+        self.storage.paginate(State, 1)
+        other = self.open()
+        other.new(State(name="S6"))
+        other.save()
+        self.storage.reload()
+        objs, cursor = self.storage.paginate(State, 2)
+        with mock.patch.object(mmap_storage.json, "loads",
+                               wraps=mmap_storage.json.loads) as loads:
+            objs, cursor = self.storage.paginate(State, 2, cursor)
+            self.assertEqual(loads.call_count, 3)
+        self.assertEqual([obj.name for obj in objs], ["S2", "S3"])
+        self.storage.begin()
+        self.storage.delete(self.storage.get(State, ids[4]))
+        self.storage.get(State, ids[5]).name = "Renamed"
+        self.storage.new(State(name="S7"))
+        objs, cursor = self.storage.paginate(State, 3, cursor)
+        self.assertEqual([obj.name for obj in objs], ["Renamed", "S6", "S7"])
+        self.assertIsNone(cursor)
+        self.storage.rollback()
+
+    def test_search_places(self):
+        """Test the places found by city and amenities"""
+        places = [
+            self.add(Place(name="a", city_id="c1", amenity_ids=["wifi"])),
+            self.add(Place(name="b", city_id="c2",
+                           amenity_ids=["wifi", "pool"])),
+            self.add(Place(name="c", city_id="c2")),
+        ]
+        other = self.open()
+
+        def search(*args):
+            """returns the sorted names of the places found"""
+            return sorted(place.name for place in other.search_places(*args))
+        self.assertEqual(search(), ["a", "b", "c"])
+        self.assertEqual(search(["c2"]), ["b", "c"])
+        self.assertEqual(search(None, ["wifi"]), ["a", "b"])
+        self.assertEqual(search(["c2", "c3"], ["pool", "wifi"]), ["b"])
+
+    def test_unit_of_work(self):
+        """Test that a unit is appended by commit, or undone by rollback"""
+        states = [self.add(State(name="S{}".format(i))) for i in range(2)]
+        self.storage.begin()
+        states[0].name = "Renamed"
+        states[0].save()
+        self.storage.delete(states[1])
+        self.assertEqual(self.open().count(), 2)
+        self.storage.commit()
+        other = self.open()
+        self.assertEqual(other.get(State, states[0].id).name, "Renamed")
+        self.assertIsNone(other.get(State, states[1].id))
+
+        self.storage.begin()
+        states[0].name = "Again"
+        city = City(name="C", state_id=states[0].id)
+        city.save()
+        self.storage.rollback()
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertEqual(self.storage.get(State, states[0].id).name,
+                         "Renamed")
+        self.assertIsNone(self.storage.get(City, city.id))
+
+    def test_savepoint_and_transaction(self):
+        """Test nested units and the context manager"""
+        state = self.add(State(name="S0"))
+        with self.storage.transaction():
+            state.name = "Outer"
+            with self.assertRaises(ValueError):
+                with self.storage.transaction():
+                    state.name = "Inner"
+                    self.storage.delete(state)
+                    raise ValueError("failed")
+            self.assertIs(self.storage.get(State, state.id), state)
+            self.assertEqual(state.name, "Outer")
+            state.save()
+        self.assertEqual(self.open().get(State, state.id).name, "Outer")
+
+    def test_rollback_after_other_save(self):
+        """Test that another thread does not append the changes of a unit"""
+        states = [self.add(State(name="S{}".format(i))) for i in range(2)]
+        self.storage.begin()
+        states[0].name = "Renamed"
+        states[0].save()
+        self.storage.delete(states[1])
+        other = State(name="Other")
+
+        def save():
+            """saves an object of its own, in a unit of work"""
+            with self.storage.transaction():
+                self.storage.new(other)
+                self.storage.save()
+        saver = threading.Thread(target=save)
+        saver.start()
+        saver.join()
+        reader = self.open()
+        self.assertEqual(reader.get(State, states[0].id).name, "S0")
+        self.assertIsNotNone(reader.get(State, states[1].id))
+        self.assertIsNotNone(reader.get(State, other.id))
+        self.storage.rollback()
+        self.assertEqual(self.storage.dirty(), {})
+        self.assertEqual(self.open().get(State, states[0].id).name, "S0")
+        with self.storage.transaction():
+            states[0].name = "Committed"
+            states[0].save()
+        self.assertEqual(self.open().get(State, states[0].id).name,
+                         "Committed")
+
+
+if __name__ == '__main__':
+    unittest.main()
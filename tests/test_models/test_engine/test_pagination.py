@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""
+Contains the tests of the cursors of the pages of storage.paginate()
+"""
+
+from datetime import datetime, timedelta
+import inspect
+from models.engine import pagination
+from models.state import State
+import pep8
+import unittest
+from unittest import mock
+
+
+class TestPaginationDocs(unittest.TestCase):
+    """Tests to check the documentation and style of pagination.py"""
+
+    def test_pep8_conformance_pagination(self):
+        """Test that pagination.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pagination.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_pagination.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_pagination_docstrings(self):
+        """Test for the docstrings of the module and functions"""
+        self.assertTrue(len(pagination.__doc__) >= 1)
+        for name, func in inspect.getmembers(pagination, inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} function needs a docstring".format(name))
+
+
+class TestPagination(unittest.TestCase):
+    """Test the cursors and pages"""
+
+    def setUp(self):
+        """Create states in the order of their names"""
+        start = datetime(2024, 1, 1)
+        self.states = [
+            State(name="S{}".format(i), id="{:02d}".format(i),
+                  created_at=start + timedelta(seconds=i // 2))
+            for i in range(7)
+        ]
+
+    def test_cursor(self):
+        """Test that a cursor is the position of an object"""
+        cursor = pagination.encode_cursor(self.states[3])
+        self.assertEqual(pagination.decode_cursor(cursor),
+                         pagination.sort_key(self.states[3]))
+        for cursor in ("", "abc", "!!!", "bm90IGEgZGF0ZQ"):
+            with self.assertRaises(ValueError):
+                pagination.decode_cursor(cursor)
+
+    def test_pages(self):
+        """Test that the pages return each object once, in order"""
+        names = []
+        cursor = None
+        for _ in range(4):
+            objs, cursor = pagination.page(reversed(self.states), 3, cursor)
+            names.append([obj.name for obj in objs])
+            if cursor is None:
+                break
+        self.assertEqual(names, [["S0", "S1", "S2"], ["S3", "S4", "S5"],
+                                 ["S6"]])
+
+    def test_filters(self):
+        """Test that the pages only return the objects of the filters"""
+        objs, cursor = pagination.page(self.states, 10, name="S4")
+        self.assertEqual([obj.id for obj in objs], ["04"])
+        self.assertIsNone(cursor)
+        self.assertEqual(pagination.page(self.states, 10, name="X"),
+                         ([], None))
+
+    def test_export_pages(self):
+        """Test that pages() chains the pages after a cursor"""
+        def paginate(cls, limit, cursor=None, **filters):
+            """pages the states of the test"""
+            return pagination.page(self.states, limit, cursor, **filters)
+        paginate = mock.Mock(wraps=paginate)
+        cursor = pagination.encode_cursor(self.states[1])
+        with mock.patch.object(pagination, "EXPORT_SIZE", 2):
+            objs = pagination.pages(paginate, State, cursor)
+            self.assertEqual(paginate.call_count, 1)
+            self.assertEqual([obj.name for obj in objs],
+                             ["S2", "S3", "S4", "S5", "S6"])
+        self.assertEqual(paginate.call_count, 3)
+        with self.assertRaises(ValueError):
+            pagination.pages(paginate, State, "nope")
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""
+Contains the TestTimedQueuePool class
+"""
+
+from models.engine import pool
+from models.engine.db_storage import DBStorage
+import os
+import pep8
+import shutil
+from sqlalchemy import create_engine, exc, text
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+TimedQueuePool = pool.TimedQueuePool
+
+
+class TestTimedQueuePool(unittest.TestCase):
+    """Test the pool of DBStorage on a SQLite database standing for MySQL"""
+
+    def setUp(self):
+        """Create a database in a temporary directory"""
+        self.dir = tempfile.mkdtemp()
+        self.url = 'sqlite:///' + os.path.join(self.dir, 'test.db')
+
+    def tearDown(self):
+        """Remove the database"""
+        shutil.rmtree(self.dir)
+
+    def engine(self, **kwargs):
+        """returns an engine of the test database using TimedQueuePool"""
+        engine = create_engine(self.url, poolclass=TimedQueuePool,
+                               connect_args={'check_same_thread': False},
+                               **kwargs)
+        self.addCleanup(engine.dispose)
+        return engine
+
+    def test_pep8_conformance_pool(self):
+        """Test that pool.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/pool.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_pool.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_load(self):
+        """Test the statistics of many threads sharing a small pool"""
+        engine = self.engine(pool_size=2, max_overflow=0, pool_timeout=10)
+        errors = []
+
+        def work():
+            """runs queries holding a connection for a while"""
+            for _ in range(10):
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                        time.sleep(0.002)
+                except Exception as e:
+                    errors.append(e)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = engine.pool.stats()
+        self.assertEqual(errors, [])
+        self.assertEqual(stats['checkouts'], 80)
+        self.assertEqual(stats['max_checked_out'], 2)
+        self.assertEqual(stats['checked_out'], 0)
+        self.assertEqual(stats['timeouts'], 0)
+        self.assertGreater(stats['wait_ms'], 0)
+        self.assertGreaterEqual(stats['wait_ms'], stats['max_wait_ms'])
+
+    def test_timeout(self):
+        """Test that checkouts timing out are counted"""
+        engine = self.engine(pool_size=1, max_overflow=0, pool_timeout=0.05)
+        with engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+            stats = engine.pool.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['checkouts'], 1)
+        self.assertEqual(stats['size'], 1)
+
+    def test_stats_survive_recreate(self):
+        """Test that a pool recreated by dispose() is a TimedQueuePool"""
+        engine = self.engine(pool_size=3)
+        engine.dispose()
+        self.assertIsInstance(engine.pool, TimedQueuePool)
+        self.assertEqual(engine.pool.stats()['size'], 3)
+
+    def test_pool_options(self):
+        """Test that the pool is configured by environment variables"""
+        env = {
+            'HBNB_TEST_POOL_SIZE': '7',
+            'HBNB_TEST_MAX_OVERFLOW': '3',
+            'HBNB_TEST_POOL_TIMEOUT': '2.5',
+            'HBNB_TEST_POOL_RECYCLE': '60',
+            'HBNB_TEST_POOL_PRE_PING': '0',
+        }
+        with mock.patch.dict(os.environ, env):
+            options = DBStorage._pool_options('HBNB_TEST')
+        self.assertEqual(options, {
+            'poolclass': TimedQueuePool,
+            'pool_size': 7,
+            'max_overflow': 3,
+            'pool_timeout': 2.5,
+            'pool_recycle': 60,
+            'pool_pre_ping': False,
+        })
+        defaults = DBStorage._pool_options('HBNB_UNSET')
+        self.assertEqual(defaults['pool_size'], 5)
+        self.assertTrue(defaults['pool_pre_ping'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Contains the TestReadWriteLock class
+"""
+
+from models.engine.rwlock import ReadWriteLock
+import threading
+import time
+import unittest
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """Test the ReadWriteLock class"""
+
+    def test_readers_share_the_lock(self):
+        """Test that several threads can read at the same time"""
+        lock = ReadWriteLock()
+        inside = []
+        barrier = threading.Barrier(4, timeout=5)
+
+        def read():
+            with lock.reading():
+                inside.append(1)
+                barrier.wait()
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(inside), 4)
+
+    def test_writer_excludes_readers(self):
+        """Test that nobody reads while a thread writes"""
+        lock = ReadWriteLock()
+        events = []
+
+        def read():
+            with lock.reading():
+                events.append("read")
+        with lock.writing():
+            reader = threading.Thread(target=read)
+            reader.start()
+            time.sleep(0.05)
+            events.append("write done")
+        reader.join()
+        self.assertEqual(events, ["write done", "read"])
+
+    def test_reentrant(self):
+        """Test that the writing thread can lock again in either mode"""
+        lock = ReadWriteLock()
+        with lock.writing():
+            with lock.writing():
+                with lock.reading():
+                    pass
+        with lock.reading():
+            with lock.reading():
+                pass
+        with lock.writing():
+            pass
+
+    def test_no_upgrade(self):
+        """Test that a reading thread cannot start writing"""
+        lock = ReadWriteLock()
+        with lock.reading():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+
+    def test_counter(self):
+        """Test that writes are not lost between many threads"""
+        lock = ReadWriteLock()
+        counter = [0]
+
+        def increment():
+            for _ in range(1000):
+                with lock.writing():
+                    value = counter[0]
+                    counter[0] = value + 1
+        threads = [threading.Thread(target=increment) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter[0], 8000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+"""
+Contains the TestSerializers class
+"""
+
+from datetime import datetime
+import io
+import json
+from models.engine import serializers
+import os
+import unittest
+
+
+class TestSerializers(unittest.TestCase):
+    """Test the formats of FileStorage and the converter"""
+
+    records = {
+        "Place.1": {
+            "__class__": "Place",
+            "id": "1",
+            "created_at": datetime(2017, 9, 28, 21, 3, 54, 52298).isoformat(),
+            "updated_at": datetime(2017, 9, 28, 21, 3, 54).isoformat(),
+            "name": "Tiny house",
+            "number_rooms": 4,
+            "latitude": 37.77,
+            "amenity_ids": ["a", "b"],
+            "big": 1 << 70,
+            "negative": -12,
+            "flags": {"wifi": True, "pets": False, "pool": None},
+        },
+        "State.2": {
+            "__class__": "State",
+            "id": "2",
+            "name": "2017-09-28T21:03:54",
+            "note": "2017-09-28 21:03:54.052298",
+        },
+    }
+
+    def dump(self, fmt):
+        """returns the records encoded in format fmt"""
+        serializer = serializers.formats[fmt]
+        return serializer.join(
+            serializer.encode(key, record)
+            for key, record in self.records.items()
+        )
+
+    def load(self, data):
+        """returns the records read from data"""
+        return dict(serializers.iter_records(io.BufferedReader(
+            io.BytesIO(data)
+        )))
+
+    def test_round_trip(self):
+        """Test that every format reads back the records it wrote"""
+        for fmt in serializers.formats:
+            with self.subTest(fmt=fmt):
+                self.assertEqual(self.load(self.dump(fmt)), self.records)
+
+    def test_json_format(self):
+        """Test that the json format is plain JSON"""
+        self.assertEqual(json.loads(self.dump("json")), self.records)
+
+    def test_binary_is_smaller(self):
+        """Test that the binary format is more compact than JSON"""
+        self.assertLess(len(self.dump("binary")), len(self.dump("json")))
+
+    def test_truncated_binary(self):
+        """Test that a truncated binary file raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.load(self.dump("binary")[:-3])
+
+    def test_convert(self):
+        """Test converting a file from JSON to binary and back"""
+        paths = ["convert_test.json", "convert_test.bin", "convert_2.json"]
+        with open(paths[0], "wb") as f:
+            f.write(self.dump("json"))
+        try:
+            serializers.convert(paths[0], paths[1])
+            serializers.convert(paths[1], paths[2])
+            with open(paths[1], "rb") as f:
+                self.assertTrue(f.read().startswith(b"HBNB"))
+            with open(paths[2], "r") as f:
+                self.assertEqual(json.load(f), self.records)
+        finally:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+"""
+Contains the TestSQLiteStorageDocs and TestSQLiteStorage classes
+"""
+
+import inspect
+from models import storage
+from models.engine import sqlite_storage
+from models.city import City
+from models.state import State
+import pep8
+import threading
+import unittest
+
+SQLiteStorage = sqlite_storage.SQLiteStorage
+
+
+class TestSQLiteStorageDocs(unittest.TestCase):
+    """Tests to check the documentation and style of SQLiteStorage class"""
+
+    def test_pep8_conformance_sqlite_storage(self):
+        """Test that sqlite_storage.py and its tests conform to PEP8."""
+        pep8s = pep8.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/sqlite_storage.py',
+                                    'tests/test_models/test_engine/'
+                                    'test_sqlite_storage.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_sqlite_storage_docstrings(self):
+        """Test for the docstrings of the module, class and methods"""
+        self.assertTrue(len(sqlite_storage.__doc__) >= 1)
+        self.assertTrue(len(SQLiteStorage.__doc__) >= 1)
+        for name, func in inspect.getmembers(SQLiteStorage,
+                                             inspect.isfunction):
+            self.assertTrue(len(func.__doc__) >= 1,
+                            "{:s} method needs a docstring".format(name))
+
+
+@unittest.skipIf(not isinstance(storage, SQLiteStorage),
+                 "not testing sqlite storage")
+class TestSQLiteStorage(unittest.TestCase):
+    """Test the SQLiteStorage class"""
+
+    def setUp(self):
+        """Get the engine of the storage"""
+        self.engine = storage._DBStorage__engine
+
+    def test_pragmas(self):
+        """Test that connections use WAL and enforce foreign keys"""
+        with self.engine.connect() as conn:
+            mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            keys = conn.exec_driver_sql("PRAGMA foreign_keys").scalar()
+        self.assertEqual(mode, "wal")
+        self.assertEqual(keys, 1)
+
+    def test_foreign_keys_indexed(self):
+        """Test that the foreign key columns are indexed"""
+        with self.engine.connect() as conn:
+            indexes = {
+                row[0] for row in conn.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+        for index in ("ix_cities_state_id", "ix_places_city_id",
+                      "ix_places_user_id", "ix_reviews_place_id",
+                      "ix_reviews_user_id", "ix_place_amenity_amenity_id"):
+            self.assertIn(index, indexes)
+
+    def test_reader_not_blocked_by_writer(self):
+        """Test that a thread reads while another one is writing"""
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        written = threading.Event()
+        done = threading.Event()
+        counts = []
+
+        def write():
+            """adds a city and waits before committing it"""
+            storage.new(City(name="San Francisco", state_id=state.id))
+            storage._DBStorage__session.flush()
+            written.set()
+            done.wait(5)
+            storage.save()
+            storage.close()
+
+        def read():
+            """counts the cities while the write is not committed"""
+            written.wait(5)
+            counts.append(storage.count(City))
+            storage.close()
+            done.set()
+        before = storage.count(City)
+        threads = [threading.Thread(target=f) for f in (write, read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counts, [before])
+        self.assertEqual(storage.count(City), before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
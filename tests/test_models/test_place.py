@@ -180,6 +180,22 @@ class TestPlace(unittest.TestCase):
         self.assertEqual(type(place.amenity_ids), list)
         self.assertEqual(len(place.amenity_ids), 0)
 
+    @unittest.skipIf(storage_type == 'db', "not testing File Storage")
+    def test_amenities_setter(self):
+        """Test that each place has its own list of amenity ids"""
+        from models.amenity import Amenity
+        amenity = Amenity(name="Wifi")
+        models.storage.new(amenity)
+        place, other = Place(), Place()
+        place.amenities = amenity
+        place.amenities = amenity
+        place.amenities = "not an amenity"
+        self.assertEqual(place.amenity_ids, [amenity.id])
+        self.assertEqual(place.amenities, [amenity])
+        self.assertEqual(other.amenity_ids, [])
+        self.assertEqual(Place.amenity_ids, [])
+        models.storage.delete(amenity)
+
     def test_to_dict_creates_dict(self):
         """test to_dict method creates a dictionary with proper attrs"""
         p = Place()
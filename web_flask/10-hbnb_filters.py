@@ -18,7 +18,7 @@ def teardown(exception):
 @app.route('/hbnb_filters', strict_slashes=False)
 def hbnb_filters():
     """Displays a list of all States, Cities and Amenities"""
-    states = storage.all("State").values()
+    states = storage.all("State", load=("cities",)).values()
     amenities = storage.all("Amenity").values()
     return render_template(
         '10-hbnb_filters.html',
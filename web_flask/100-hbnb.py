@@ -29,8 +29,10 @@ def teardown(exception):
 @app.route('/hbnb', strict_slashes=False)
 def hbnb_filters():
     """Displays a list of all States, Cities and Amenities"""
-    states = list(storage.all("State").values())
-    places = list(storage.all("Place").values())
+    states = list(storage.all("State", load=("cities",)).values())
+    places = list(storage.all(
+        "Place", load=("user", "amenities", "reviews.user")
+    ).values())
     amenities = list(storage.all("Amenity").values())
     return render_template(
         '100-hbnb.html',
@@ -18,7 +18,7 @@ def teardown(exception):
 @app.route('/cities_by_states', strict_slashes=False)
 def cities_by_states():
     """Displays a list of all City objects by State"""
-    states = storage.all("State").values()
+    states = storage.all("State", load=("cities",)).values()
     return render_template('8-cities_by_states.html', states=states)
 
 